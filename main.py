@@ -1,75 +1,215 @@
 import sys
+import os
+import signal
+import time
+import threading
 import argparse
 from src.utils.config_loader import load_config, get_node_addresses, get_neighbors
+from src.utils.topology_cache import open_compiled_topology
+from src.utils.metrics import METRICS_INTERVAL
+from src.utils.logger import configure_logging, DATA_LOG_RATE
+from src.utils.codec import BinaryCodec, topology_names
+from src.utils.helpers import ready_line
+from src.transport.xmpp_client import XMPP_ADDRESS
 from src.network.node import Node
+from src.network.async_node import AsyncNode, run_nodes
 from src.algorithms.flooding import Flooding
 from src.algorithms.dijkstra import Dijkstra
 from src.algorithms.link_state import LinkStateRouter
+from src.algorithms.distance_vector import DistanceVectorRouter, topology_infinity, config_infinity
+
+TOPO_PATH = 'config/topo-ejemplo.json'
+NAMES_PATH = 'config/names-ejemplo.json'
 
 def main():
     parser = argparse.ArgumentParser(description='Nodo de red con algoritmo de enrutamiento')
-    parser.add_argument('node_id', help='ID del nodo (ej: A, B, C)')
+    parser.add_argument('node_ids', nargs='+', metavar='node_id',
+                        help='ID del nodo (ej: A, B, C); con varios, todos corren en este mismo proceso')
     parser.add_argument('--algorithm', '-a', default='flooding', 
                         choices=['flooding', 'dijkstra', 'lsr', 'dvr'],
                         help='Algoritmo de enrutamiento a usar')
+    parser.add_argument('--engine', '-e', default='threads',
+                        choices=['threads', 'asyncio'],
+                        help='Motor del nodo: un hilo por conexión o un único event loop')
+    parser.add_argument('--dedup', default='lru', choices=['lru', 'bloom'],
+                        help='Cache de duplicados: LRU con expiración o Bloom rotativo')
+    parser.add_argument('--metrics-dir',
+                        help='Directorio donde escribir snapshots periódicos de métricas (<nodo>.json)')
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL,
+                        help='Segundos entre snapshots de métricas')
+    parser.add_argument('--log-mode', default='queue', choices=['queue', 'sync'],
+                        help='queue: los logs se escriben en un hilo aparte; sync: directo en cada llamada')
+    parser.add_argument('--log-json', help='Archivo donde escribir además los logs como JSON lines')
+    parser.add_argument('--log-rate', type=float, default=DATA_LOG_RATE,
+                        help='Máximo por segundo de cada evento del plano de datos (0 = sin límite)')
+    parser.add_argument('--log-sample', type=int, default=1,
+                        help='Escribir solo 1 de cada N eventos del plano de datos')
+    parser.add_argument('--codec', default='binary', choices=['binary', 'json'],
+                        help='binary: ofrecer el codec binario a los vecinos en el hello; json: solo JSON')
+    parser.add_argument('--transport', default='tcp', choices=['tcp', 'udp', 'xmpp'],
+                        help='tcp: todo por las conexiones TCP; udp: hellos, LSAs y vectores por datagramas UDP; '
+                             'xmpp: todo por un stream XMPP (solo con --engine threads)')
+    parser.add_argument('--xmpp-server', default=XMPP_ADDRESS,
+                        help='host:puerto del servidor XMPP (tests/xmpp_server.py levanta uno local)')
+    parser.add_argument('--dynamic-costs', action='store_true',
+                        help='Ajustar el costo de cada enlace con el RTT medido por los hellos y re-anunciarlo')
+    parser.add_argument('--topo', default=TOPO_PATH, help='Archivo de topología')
+    parser.add_argument('--names', default=NAMES_PATH, help='Archivo de nombres')
+    parser.add_argument('--ready', action='store_true',
+                        help='Escribir en stdout READY <nodo> cuando cada nodo acepta conexiones (run_network)')
     args = parser.parse_args()
+    if args.transport == 'xmpp' and args.engine != 'threads':
+        parser.error("--transport xmpp solo funciona con --engine threads")
+
+    # Antes de crear nodos y algoritmos, que configuran sus loggers al construirse
+    configure_logging(args.log_mode, args.log_json, args.log_rate, args.log_sample)
     
-    node_id = args.node_id
+    node_ids = args.node_ids
     algorithm_name = args.algorithm
     
-    # Cargar configuraciones
-    try:
-        topo_config = load_config('config/topo-ejemplo.json')
-        names_config = load_config('config/names-ejemplo.json')
-    except Exception as e:
-        print(f"Error cargando configuración: {e}")
-        return
-    
-    # Obtener información del nodo
-    neighbors = get_neighbors(topo_config, node_id)
-    node_addresses = get_node_addresses(names_config)
+    # La topología compilada (tests/compile_topology.py) evita parsear el JSON
+    # completo en cada proceso; si falta o quedó vieja se usan los JSON
+    compiled = open_compiled_topology(args.topo, args.names)
+    topo_config = None
+    if compiled is not None:
+        neighbors_of = {node_id: compiled.neighbors(node_id) for node_id in node_ids}
+        wanted = set(node_ids)
+        for neighbors in neighbors_of.values():
+            wanted.update(neighbors)
+        node_addresses = compiled.addresses_for(sorted(wanted))
+    else:
+        try:
+            topo_config = load_config(args.topo)
+            names_config = load_config(args.names)
+        except Exception as e:
+            print(f"Error cargando configuración: {e}")
+            return
+
+        # Obtener información del nodo
+        neighbors_of = {node_id: get_neighbors(topo_config, node_id) for node_id in node_ids}
+        node_addresses = get_node_addresses(names_config)
     
-    if node_id not in node_addresses:
-        print(f"Error: Nodo {node_id} no encontrado en la configuración")
+    # El codec binario numera los nodos según la lista ordenada de toda la
+    # topología; los vecinos con la misma lista lo aceptan en el hello
+    codec = None
+    if args.codec == 'binary':
+        if compiled is not None:
+            # La tabla y su digest se leen del archivo a demanda
+            codec = BinaryCodec(*compiled.codec_names())
+        else:
+            codec = BinaryCodec(topology_names(topo_config['config'], names_config['config']))
+
+    # Dijkstra no modifica el grafo compilado: los nodos del proceso lo comparten
+    graph = compiled.graph() if compiled is not None and algorithm_name == 'dijkstra' else None
+    on_ready = ready_reporter() if args.ready else None
+
+    nodes = []
+    for node_id in node_ids:
+        if node_id not in node_addresses:
+            print(f"Error: Nodo {node_id} no encontrado en la configuración")
+            if on_ready is not None:
+                on_ready(node_id, "no está en la configuración")
+            continue
+        node = build_node(node_id, neighbors_of[node_id], node_addresses[node_id], args,
+                          compiled, topo_config, graph)
+        node.codec = codec
+        node.transport = args.transport
+        node.xmpp_server = args.xmpp_server
+        node.link_costs.enabled = args.dynamic_costs
+        if on_ready is not None:
+            node.on_ready = lambda node, error: on_ready(node.node_id, error)
+        if algorithm_name == 'dijkstra':
+            node.routing_algorithm.calculate_routes()
+        nodes.append(node)
+    if not nodes:
         return
-        
-    node_address = node_addresses[node_id]
-    host, port_str = node_address.split(':')
+
+    # run_network detiene los nodos con SIGTERM: salir ordenado escribe las
+    # métricas finales y vacía la cola de logs
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        start_nodes(nodes, node_addresses, args.engine)
+    except KeyboardInterrupt:
+        print("Interrupción recibida, cerrando nodo")
+    except Exception as e:
+        print(f"Error iniciando nodo: {e}")
+    finally:
+        for node in nodes:
+            node.shutdown()
+
+def build_node(node_id, neighbors, address, args, compiled, topo_config, graph=None):
+    host, port_str = address.split(':')
     port = int(port_str)
+    algorithm_name = args.algorithm
     
     # Aqui es donde se verifica el tipo de algoritmo, hay que poner otro if para cada
     # algoritmo que vayamos a implementar
     ########################################################################################################
     # AQUI es donde se agregan algoritmos posibles
     if algorithm_name == 'flooding':
-        routing_algorithm = Flooding()
+        routing_algorithm = Flooding(dedup_mode=args.dedup)
     elif algorithm_name == 'dijkstra':
         routing_algorithm = Dijkstra()
-        routing_algorithm.build_topology_from_config(topo_config)
         # Para Dijkstra, cargamos la topología completa
+        if graph is not None:
+            routing_algorithm.load_graph(graph)
+        else:
+            routing_algorithm.build_topology_from_config(topo_config)
     elif algorithm_name == "lsr":
-        routing_algorithm = LinkStateRouter()
-        dijkstra = Dijkstra()
-        routing_algorithm.topology = dijkstra.build_topology_from_config(topo_config)
+        # Arranca solo con sus enlaces: el resto de la topología llega por LSAs
+        # (y por la LSDB que le manda cada vecino al conectarse), así un origen
+        # que nunca levanta no queda en la SPF
+        routing_algorithm = LinkStateRouter(dedup_mode=args.dedup)
+    elif algorithm_name == "dvr":
+        # Vector de distancias: solo necesita los costos de sus vecinos directos y,
+        # para acotar el infinito, el tamaño de la red y el costo máximo
+        if compiled is not None:
+            infinity = topology_infinity(len(compiled), compiled.max_cost)
+        else:
+            infinity = config_infinity(topo_config['config'])
+        routing_algorithm = DistanceVectorRouter(infinity=infinity)
     else:
         # Para otros algoritmos 
         print(f"Algoritmo {algorithm_name} no implementado aún, usando flooding")
         routing_algorithm = Flooding()
     
-    # Crear e iniciar el nodo
-    node = Node(node_id, neighbors, host, port, routing_algorithm)
-    
-    if algorithm_name == 'dijkstra':
-        routing_algorithm.calculate_routes()
+    # Crear el nodo
+    node_class = AsyncNode if args.engine == 'asyncio' else Node
+    node = node_class(node_id, neighbors, host, port, routing_algorithm)
+    if args.metrics_dir:
+        node.metrics_path = os.path.join(args.metrics_dir, f"{node_id}.json")
+        node.metrics_interval = args.metrics_interval
+    return node
 
-    try:
-        node.start(node_addresses)
-    except KeyboardInterrupt:
-        print("Interrupción recibida, cerrando nodo")
-    except Exception as e:
-        print(f"Error iniciando nodo: {e}")
-    finally:
-        node.shutdown()
+def ready_reporter():
+    """Escribe una línea READY/FAILED por nodo; los hilos de los nodos no deben intercalarlas"""
+    lock = threading.Lock()
+
+    def report(node_id, error=None):
+        with lock:
+            sys.stdout.write(ready_line(node_id, error) + "\n")
+            sys.stdout.flush()
+    return report
+
+def start_nodes(nodes, node_addresses, engine):
+    """Bloquea mientras corren los nodos del proceso"""
+    if len(nodes) == 1:
+        nodes[0].start(node_addresses)
+    elif engine == 'asyncio':
+        # Un solo event loop para todos los nodos del worker
+        run_nodes(nodes, node_addresses)
+    else:
+        for node in nodes:
+            node.launch(node_addresses)
+        try:
+            while any(node.running for node in nodes):
+                time.sleep(1)
+        finally:
+            # Con SIGTERM o Ctrl+C: cerrar sockets y liberar los hilos de cada nodo
+            for node in nodes:
+                if node.running:
+                    node.shutdown()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
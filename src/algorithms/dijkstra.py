@@ -1,98 +1,107 @@
-import heapq
 import json
-from src.utils.logger import setup_logger
+import time
+import logging
+from src.utils.logger import setup_logger, data_logger
+from src.network.routing import Graph
+from src.network.forwarding import ForwardingTable, message_flow, DATA_TYPES
 
 class Dijkstra:
     def __init__(self):
         self.node = None
         self.logger = setup_logger("Dijkstra-Init")
         self.routing_table = {}
+        self.fib = ForwardingTable(self.logger)
         self.topology = {}
+        self.graph = None
+        self.spf = None
+        # Enlaces propios caídos; se sacan del grafo en la SPF (reparación local)
+        self.down_links = set()
         self.running = True
         
     def set_node(self, node):
         self.node = node
         # Actualizar logger con ID del nodo una vez que tenemos la referencia
         self.logger = setup_logger(f"Dijkstra-{self.node.node_id}")
-        self.logger.info("Logger configurado con ID de nodo")
+        self.data_logger = data_logger(self.logger)
+        self.fib.logger = self.logger
+        self.fib.set_seed(node.node_id)
+        self.logger.debug("Logger configurado con ID de nodo")
         
     def build_topology_from_config(self, topo_config):
         """Construye la topología completa desde el archivo de configuración"""
         if "config" in topo_config:
             self.topology = topo_config["config"]
-            self.logger.info(f"Topología cargada con {len(self.topology)} nodos")
-            self.logger.debug(f"Topología detallada: {self.topology}")
+            self.graph = None
+            self.logger.info("Topología cargada con %s nodos", len(self.topology))
+            self.logger.debug("Topología detallada: %s", self.topology)
         else:
             self.logger.error("Formato de topología inválido - falta clave 'config'")
 
         return self.topology
-            
+
+    def load_graph(self, graph):
+        """Usa un Graph ya armado (p. ej. de la topología compilada) sin pasar por el dict"""
+        self.graph = graph
+        self.logger.info("Grafo cargado con %s nodos", len(graph))
+
     def calculate_routes(self):
         """Calcula las rutas más cortas usando Dijkstra"""
-        if not self.topology:
+        if not self.topology and self.graph is None:
             self.logger.error("No hay topología para calcular rutas")
             return False
             
         start_node = self.node.node_id
-        self.logger.info(f"Calculando rutas desde nodo {start_node}")
-        
-        distances = {node: float('inf') for node in self.topology}
-        distances[start_node] = 0
-        previous = {node: None for node in self.topology}
-        
-        # Cola de prioridad
-        pq = [(0, start_node)]
-        
-        while pq:
-            current_distance, current_node = heapq.heappop(pq)
-            
-            # Si encontramos una distancia mejor, la ignoramos
-            if current_distance > distances[current_node]:
-                continue
-                
-            # Explorar vecinos
-            for neighbor, weight in self.topology[current_node].items():
-                distance = current_distance + weight
-                
-                # Si encontramos un camino más corto
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    previous[neighbor] = current_node
-                    heapq.heappush(pq, (distance, neighbor))
-        
-        # Construir tabla de routing
-        self.routing_table = {}
-        for node in self.topology:
-            if node != start_node:
-                # Reconstruir el camino
-                path = []
-                current = node
-                while current is not None:
-                    path.append(current)
-                    current = previous[current]
-                path.reverse()
-                
-                # El next hop es el primer nodo en el camino
-                if len(path) > 1:
-                    next_hop = path[1]
-                    self.routing_table[node] = {
-                        'next_hop': next_hop,
-                        'cost': distances[node],
-                        'path': path
-                    }
+        self.logger.info("Calculando rutas desde nodo %s", start_node)
+
+        start = time.perf_counter()
+        self.spf = self.spf_graph().shortest_paths(start_node)
+        self.node.metrics.observe("spf_duration", time.perf_counter() - start)
+        self.routing_table = self.spf.routes()
+        self.fib.publish(self.routing_table)
         
-        self.logger.info(f"Tabla de routing calculada para {len(self.routing_table)} destinos")
-        for dest, info in self.routing_table.items():
-            self.logger.debug(f"Ruta a {dest}: {info['path']} (costo: {info['cost']})")
+        self.logger.info("Tabla de routing calculada para %s destinos (%s con ECMP)", len(self.routing_table), len(self.fib.multipath))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            for dest, info in self.routing_table.items():
+                self.logger.debug("Ruta a %s: %s (costo: %s)", dest, self.spf.path(dest), info['cost'])
         
         return self.routing_table
+
+    def spf_graph(self):
+        """Grafo de la configuración sin los enlaces propios que están caídos"""
+        if self.graph is None:
+            self.graph = Graph.from_topology(self.topology)
+        if not self.down_links:
+            return self.graph
+
+        node_id = self.node.node_id
+        topology = self.graph.to_topology()
+        for neighbor in self.down_links:
+            topology.get(node_id, {}).pop(neighbor, None)
+            topology.get(neighbor, {}).pop(node_id, None)
+        return Graph.from_topology(topology)
+
+    def link_down(self, neighbor_id):
+        """
+        Dijkstra no intercambia topología con nadie: solo este nodo se entera
+        de la caída y recalcula esquivando el enlace.
+        """
+        self.down_links.add(neighbor_id)
+        self.logger.info("Enlace con %s caído, recalculando rutas", neighbor_id)
+        self.calculate_routes()
+
+    def link_up(self, neighbor_id):
+        if neighbor_id in self.down_links:
+            self.down_links.discard(neighbor_id)
+            self.logger.info("Enlace con %s restablecido, recalculando rutas", neighbor_id)
+            self.calculate_routes()
+
+    def get_path(self, destination):
+        """Camino completo hacia un destino, reconstruido solo cuando se pide"""
+        return self.spf.path(destination) if self.spf else []
         
-    def get_next_hop(self, destination):
-        """Obtiene el próximo salto para un destino"""
-        if destination in self.routing_table:
-            return self.routing_table[destination]['next_hop']
-        self.logger.warning(f"No hay ruta conocida para {destination}")
-        return None
+    def get_next_hop(self, destination, source=None, flow=None):
+        """Obtiene el próximo salto para un destino desde la FIB (ECMP por flujo)"""
+        return self.fib.lookup(destination, source, flow)
         
     def handle_message(self, message):
         """Maneja mensajes entrantes (para Dijkstra puro, solo forward)"""
@@ -100,23 +109,35 @@ class Dijkstra:
         destination = message.get("to", "")
         message_id = message.get("id", "unknown")
         
-        self.logger.debug(f"Mensaje recibido [ID: {message_id}, Type: {message_type}, To: {destination}]")
+        self.logger.debug("Mensaje recibido [ID: %s, Type: %s, To: %s]", message_id, message_type, destination)
         
-        if message_type == "message":
+        if message_type in DATA_TYPES:
             if destination == self.node.node_id:
-                self.logger.info(f"✓ Mensaje destinado a nosotros: {message.get('payload', '')}")
+                self.data_logger.info("✓ Mensaje destinado a nosotros: %s", message.get('payload', ''))
+                self.node.deliver_local(message)
             else:
-                next_hop = self.get_next_hop(destination)
+                next_hop = self.get_next_hop(destination, message.get("from"), message_flow(message))
                 if next_hop:
                     if self.node.send_message(message, next_hop):
-                        self.logger.info(f"✓ Mensaje forwardeado a {next_hop} para {destination}")
+                        self.data_logger.info("✓ Mensaje forwardeado a %s para %s", next_hop, destination)
                     else:
-                        self.logger.error(f"✗ No se pudo enviar a {next_hop}")
+                        self.logger.error("✗ No se pudo enviar a %s", next_hop)
                 else:
-                    self.logger.error(f"✗ No hay ruta para {destination}")
+                    self.logger.debug("✗ No hay ruta para %s", destination)
         else:
-            self.logger.debug(f"Mensaje tipo '{message_type}' ignorado por Dijkstra")
+            self.logger.debug("Mensaje tipo '%s' ignorado por Dijkstra", message_type)
         
+    def forward_frame(self, frame, body, source, destination, ttl):
+        """Camino rápido de tránsito: reenvía el frame binario tal cual al próximo salto"""
+        next_hop = self.get_next_hop(destination, source)
+        if not next_hop:
+            return False
+        if self.node.forward_frame(frame, next_hop):
+            self.data_logger.info("✓ Mensaje forwardeado a %s para %s", next_hop, destination)
+        else:
+            self.logger.error("✗ No se pudo enviar a %s", next_hop)
+        return True
+
     def start(self):
         """Inicia el algoritmo (para Dijkstra es estático)"""
         self.logger.info("Algoritmo Dijkstra iniciado (modo estático)")
@@ -125,5 +146,6 @@ class Dijkstra:
     def update_topology(self, new_topology):
         """Actualiza la topología y recalcula rutas"""
         self.topology = new_topology
+        self.graph = None
         self.logger.info("Topología actualizada, recalculando rutas...")
         self.calculate_routes()
\ No newline at end of file
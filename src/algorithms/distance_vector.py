@@ -0,0 +1,359 @@
+import threading
+import time
+from src.utils.logger import setup_logger, data_logger
+from src.utils.helpers import new_message_id
+from src.utils.codec import patch_ttl
+from src.network.forwarding import ForwardingTable, message_flow, DATA_TYPES
+
+# Costo "inalcanzable" si no se conoce la topología; con ella se usa topology_infinity
+DV_INFINITY = 1000000
+DV_PERIODIC_INTERVAL = 30.0
+DV_STARTUP_UPDATE = 5.0
+DV_TRIGGERED_MIN_INTERVAL = 1.0
+DV_PERIODIC_JITTER = 0.1
+# Segundos que una ruta perdida no acepta caminos más caros (deja llegar el veneno)
+DV_HOLD_DOWN = 10.0
+# Segundos que una ruta retirada se sigue anunciando como infinita antes de borrarla
+DV_FLUSH_INTERVAL = 60.0
+
+
+def topology_infinity(node_count, max_cost):
+    """
+    Infinito más chico posible: ningún camino simple cuesta más que
+    (V-1) * costo máximo, así el conteo a infinito termina en pocas rondas.
+    """
+    return max(1, node_count - 1) * max_cost + 1
+
+
+def config_infinity(topology):
+    """topology_infinity para una topología {nodo: {vecino: costo}}"""
+    max_cost = max((cost for neighbors in topology.values() for cost in neighbors.values()), default=1)
+    return topology_infinity(len(topology), max_cost)
+
+
+class DistanceVectorRouter:
+    """
+    Routing por vector de distancias (Bellman-Ford distribuido).
+    Usa split horizon con poisoned reverse, updates disparados que solo llevan
+    las entradas que cambiaron y updates completos periódicos con jitter.
+    Contra el conteo a infinito en lazos de tres o más nodos: un infinito
+    acotado por la topología y, cuando se pierde la ruta por el próximo
+    salto, hold-down (por hold_down segundos solo se acepta un camino que no
+    sea más caro que el perdido). Las rutas retiradas se anuncian como
+    infinitas por flush_interval segundos y después se borran.
+    """
+
+    def __init__(self, periodic_interval=DV_PERIODIC_INTERVAL, triggered_interval=DV_TRIGGERED_MIN_INTERVAL,
+                 infinity=DV_INFINITY, hold_down=DV_HOLD_DOWN, flush_interval=DV_FLUSH_INTERVAL):
+        self.node = None
+        self.logger = setup_logger("DVR")
+        self.running = False
+        self.periodic_interval = periodic_interval
+        self.triggered_interval = triggered_interval
+        self.infinity = infinity
+        self.hold_down = hold_down
+        self.flush_interval = flush_interval
+        self.link_costs = {}
+        # Último vector recibido de cada vecino: {vecino: {destino: costo}}
+        self.neighbor_vectors = {}
+        self.routing_table = {}
+        self.fib = ForwardingTable(self.logger)
+        self.pending_changes = set()
+        self.hold_downs = {}  # destino -> (hasta cuándo, costo antes de perderla)
+        self.withdrawn = {}  # destino -> cuándo se retiró
+        self.last_triggered_at = None
+        self.lock = threading.Lock()
+        self.timers = {}
+
+    def set_node(self, node):
+        self.node = node
+        self.logger = setup_logger(f"DVR-{self.node.node_id}")
+        self.data_logger = data_logger(self.logger)
+        self.fib.logger = self.logger
+        self.fib.set_seed(node.node_id)
+        self.link_costs = dict(node.neighbors)
+        # Un vecino directo es alcanzable por su enlace antes de oír su vector
+        self.neighbor_vectors = {neighbor: {neighbor: 0} for neighbor in self.link_costs}
+
+    def start(self):
+        self.running = True
+        with self.lock:
+            self.recompute(self.known_destinations())
+        self.send_full_update()
+        self.timers['periodic'] = self.node.call_later(
+            min(DV_STARTUP_UPDATE, self.periodic_interval), self.periodic_update)
+        self.logger.info("Distance Vector Routing iniciado")
+
+    def shutdown(self):
+        self.running = False
+        for timer in list(self.timers.values()):
+            timer.cancel()
+        self.timers = {}
+
+    def handle_message(self, message):
+        msg_type = message.get("type", "")
+
+        if msg_type == "dv":
+            self.handle_vector(message)
+        elif msg_type in DATA_TYPES:
+            self.handle_forwarding(message)
+        else:
+            self.logger.debug("Ignorando mensaje de tipo %s", msg_type)
+
+    def handle_vector(self, message):
+        neighbor = message.get("from")
+        if neighbor not in self.link_costs:
+            self.logger.debug("Vector de %s ignorado: no es vecino directo", neighbor)
+            return
+
+        vector = message.get("payload", {})
+        with self.lock:
+            previous = self.neighbor_vectors.get(neighbor, {})
+            # Solo se recalculan los destinos cuyo costo anunciado por este vecino cambió
+            affected = {destination for destination, cost in vector.items() if previous.get(destination) != cost}
+            if message.get("full"):
+                affected.update(destination for destination in previous if destination not in vector)
+                self.neighbor_vectors[neighbor] = dict(vector)
+            else:
+                self.neighbor_vectors.setdefault(neighbor, {}).update(vector)
+            changed = self.recompute(affected) if affected else set()
+
+        if changed:
+            self.logger.debug("Vector de %s cambió %s rutas", neighbor, len(changed))
+            self.schedule_triggered_update()
+
+    def known_destinations(self):
+        destinations = set(self.routing_table)
+        for vector in self.neighbor_vectors.values():
+            destinations.update(vector)
+        return destinations
+
+    def recompute(self, destinations):
+        """Bellman-Ford solo sobre los destinos afectados; devuelve los que cambiaron"""
+        start = time.perf_counter()
+        changed = set()
+        node_id = self.node.node_id
+        now = self.node.now()
+        for destination in destinations:
+            if destination == node_id:
+                continue
+
+            best_cost = self.infinity
+            best_hop = None
+            for neighbor in self.link_costs:
+                cost = self.cost_via(neighbor, destination)
+                if cost < best_cost:
+                    best_cost = cost
+                    best_hop = neighbor
+
+            current = self.routing_table.get(destination)
+            held = self.hold_downs.get(destination)
+            if held is not None:
+                # Un camino más caro que el perdido puede ser un lazo que todavía pasa por acá
+                if best_cost <= held[1]:
+                    del self.hold_downs[destination]
+                else:
+                    best_cost, best_hop = self.infinity, None
+            elif (current is not None and current["next_hop"] is not None and best_cost > current["cost"]
+                  and self.cost_via(current["next_hop"], destination) >= self.infinity):
+                self.hold_downs[destination] = (now + self.hold_down, current["cost"])
+                self.schedule_sweep(self.hold_down)
+                best_cost, best_hop = self.infinity, None
+
+            if current is None and best_hop is None:
+                continue
+            if best_hop is None:
+                if current["next_hop"] is not None:
+                    self.withdrawn[destination] = now
+                    self.schedule_sweep(self.flush_interval)
+            else:
+                self.withdrawn.pop(destination, None)
+            if current is None or current["cost"] != best_cost or current["next_hop"] != best_hop:
+                self.routing_table[destination] = {"next_hop": best_hop, "cost": best_cost}
+                changed.add(destination)
+
+        self.pending_changes |= changed
+        if changed:
+            self.fib.publish_next_hops({
+                destination: route["next_hop"]
+                for destination, route in self.routing_table.items()
+                if route["cost"] < self.infinity
+            })
+        self.node.metrics.observe("dv_recompute_duration", time.perf_counter() - start)
+        return changed
+
+    def cost_via(self, neighbor, destination):
+        """Costo hacia un destino pasando por un vecino, infinito si no hay enlace o ruta"""
+        link_cost = self.link_costs.get(neighbor)
+        if link_cost is None:
+            return self.infinity
+        advertised = self.neighbor_vectors.get(neighbor, {}).get(destination, self.infinity)
+        return min(link_cost + advertised, self.infinity)
+
+    def schedule_sweep(self, delay):
+        """Programa el vencimiento de hold-downs y rutas retiradas (con el lock tomado)"""
+        if not self.running or 'sweep' in self.timers:
+            return
+        self.timers['sweep'] = self.node.call_later(delay, self.sweep)
+
+    def sweep(self):
+        """Libera los hold-downs vencidos y borra las rutas retiradas hace flush_interval"""
+        with self.lock:
+            self.timers.pop('sweep', None)
+            if not self.running:
+                return
+            now = self.node.now()
+            released = [destination for destination, (until, _) in self.hold_downs.items() if until <= now]
+            for destination in released:
+                del self.hold_downs[destination]
+            changed = self.recompute(released) if released else set()
+
+            for destination, withdrawn_at in list(self.withdrawn.items()):
+                if now - withdrawn_at >= self.flush_interval:
+                    del self.withdrawn[destination]
+                    route = self.routing_table.get(destination)
+                    if route is not None and route["next_hop"] is None:
+                        del self.routing_table[destination]
+                        self.pending_changes.discard(destination)
+
+            deadlines = [until for until, _ in self.hold_downs.values()]
+            deadlines += [withdrawn_at + self.flush_interval for withdrawn_at in self.withdrawn.values()]
+            if deadlines:
+                self.schedule_sweep(max(0, min(deadlines) - now))
+        if changed:
+            self.schedule_triggered_update()
+
+    def update_link_cost(self, neighbor, cost):
+        """Cambia el costo de un enlace directo (infinity lo da por caído)"""
+        with self.lock:
+            if cost >= self.infinity:
+                self.link_costs.pop(neighbor, None)
+                self.neighbor_vectors.pop(neighbor, None)
+            else:
+                self.link_costs[neighbor] = cost
+                self.neighbor_vectors.setdefault(neighbor, {neighbor: 0})
+            changed = self.recompute(self.known_destinations())
+        if changed:
+            self.schedule_triggered_update()
+
+    def link_down(self, neighbor_id):
+        """Liveness dio al vecino por caído: el enlace pasa a costo infinito"""
+        self.update_link_cost(neighbor_id, self.infinity)
+
+    def link_up(self, neighbor_id):
+        cost = self.node.neighbors.get(neighbor_id)
+        if cost is None:
+            return
+        self.update_link_cost(neighbor_id, cost)
+        # El vecino que vuelve no tiene nuestro vector
+        self.send_full_update()
+
+    def vector_for(self, neighbor, destinations):
+        """Vector a anunciarle a un vecino, con poisoned reverse"""
+        vector = {self.node.node_id: 0}
+        for destination in destinations:
+            route = self.routing_table.get(destination)
+            if route is None:
+                continue
+            if route["next_hop"] == neighbor:
+                # Split horizon con poisoned reverse: no le ofrecemos una ruta que pasa por él
+                vector[destination] = self.infinity
+            else:
+                vector[destination] = route["cost"]
+        return vector
+
+    def send_vectors(self, destinations, full):
+        for neighbor in list(self.link_costs):
+            update = {
+                "proto": "dvr",
+                "type": "dv",
+                "id": new_message_id(self.node.node_id),
+                "from": self.node.node_id,
+                "to": neighbor,
+                "ttl": 1,
+                "headers": [],
+                "full": full,
+                "payload": self.vector_for(neighbor, destinations)
+            }
+            self.node.send_message(update, neighbor)
+
+    def send_full_update(self):
+        with self.lock:
+            self.pending_changes.clear()
+            # Las rutas retiradas van como infinitas hasta que sweep las borre
+            self.send_vectors(list(self.routing_table), full=True)
+
+    def schedule_triggered_update(self):
+        with self.lock:
+            if not self.running or 'triggered' in self.timers:
+                return
+            now = self.node.now()
+            delay = 0
+            if self.last_triggered_at is not None:
+                delay = max(0, self.last_triggered_at + self.triggered_interval - now)
+            self.timers['triggered'] = self.node.call_later(delay, self.send_triggered_update)
+
+    def send_triggered_update(self):
+        with self.lock:
+            self.timers.pop('triggered', None)
+            if not self.running or not self.pending_changes:
+                return
+            changed = list(self.pending_changes)
+            self.pending_changes.clear()
+            self.last_triggered_at = self.node.now()
+            self.send_vectors(changed, full=False)
+        self.logger.debug("Update disparado con %s rutas", len(changed))
+
+    def periodic_update(self):
+        if not self.running:
+            return
+        self.send_full_update()
+        jitter = self.node.random.uniform(-DV_PERIODIC_JITTER, DV_PERIODIC_JITTER) * self.periodic_interval
+        self.timers['periodic'] = self.node.call_later(self.periodic_interval + jitter, self.periodic_update)
+
+    def get_next_hop(self, destination, source=None, flow=None):
+        """Obtiene el próximo salto para un destino desde la FIB (ECMP por flujo)"""
+        return self.fib.lookup(destination, source, flow)
+
+    def handle_forwarding(self, message):
+        destination = message.get("to")
+
+        if destination == self.node.node_id:
+            self.data_logger.info("✓ Mensaje destinado a nosotros: %s", message.get('payload', ''))
+            self.node.deliver_local(message)
+            return
+
+        # DV puede tener lazos transitorios mientras converge: el TTL los corta
+        ttl = message.get("ttl", 5) - 1
+        if ttl <= 0:
+            self.node.metrics.inc("ttl_expired")
+            self.logger.debug("TTL agotado")
+            return
+        message["ttl"] = ttl
+
+        next_hop = self.get_next_hop(destination, message.get("from"), message_flow(message))
+        if next_hop:
+            if self.node.send_message(message, next_hop):
+                self.data_logger.info("✓ Mensaje forwardeado a %s para %s", next_hop, destination)
+            else:
+                self.logger.error("✗ No se pudo enviar a %s", next_hop)
+        else:
+            self.logger.debug("✗ No hay ruta para %s", destination)
+
+    def forward_frame(self, frame, body, source, destination, ttl):
+        """Camino rápido de tránsito: baja el TTL en el frame binario y lo reenvía"""
+        ttl -= 1
+        if ttl <= 0:
+            self.node.metrics.inc("ttl_expired")
+            self.logger.debug("TTL agotado")
+            return True
+
+        next_hop = self.get_next_hop(destination, source)
+        if not next_hop:
+            return False
+        patch_ttl(body, ttl)
+        if self.node.forward_frame(frame, next_hop):
+            self.data_logger.info("✓ Mensaje forwardeado a %s para %s", next_hop, destination)
+        else:
+            self.logger.error("✗ No se pudo enviar a %s", next_hop)
+        return True
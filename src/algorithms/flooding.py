@@ -1,46 +1,89 @@
-import threading
-import time
+from src.utils.helpers import new_message_id
+from src.utils.codec import patch_ttl
+from src.utils.message_cache import make_duplicate_cache
 
 class Flooding:
-    def __init__(self):
+    def __init__(self, dedup_mode="lru"):
         self.node = None
-        self.seen_messages = set()
+        # IDs ya vistos, acotado en tamaño y con expiración
+        self.seen_messages = make_duplicate_cache(dedup_mode)
         self.running = False
 
     def set_node(self, node):
         self.node = node
+        self.seen_messages.clock = node.now
 
     def handle_message(self, message):
-        # Usar campos estándar del protocolo
-        message_id = f"{message.get('from', '')}_{message.get('payload', '')}"
-        
-        if message_id in self.seen_messages:
-            self.node.logger.info(f"Mensaje ya recibido: {message.get('payload')}, no se propaga")
+        # Un mensaje inyectado sin ID recibe uno en el primer nodo que lo ve
+        message_id = message.get('id')
+        if message_id is None:
+            message_id = message['id'] = new_message_id(self.node.node_id)
+
+        if self.seen_messages.check_and_add(message_id):
+            self.node.metrics.inc("duplicates_dropped")
+            self.node.data_logger.info("Mensaje ya recibido: %s, no se propaga", message.get('payload'))
             return
-            
-        self.seen_messages.add(message_id)
-        
+
         # Manejar TTL según protocolo
         ttl = message.get('ttl', 5) - 1
         if ttl <= 0:
+            self.node.metrics.inc("ttl_expired")
             self.node.logger.debug("TTL agotado")
             return
-            
+
         message['ttl'] = ttl
-        
+
         # Verificar si es para este nodo
         if message.get('to') == self.node.node_id:
-            self.node.logger.info(f"Mensaje ha llegado al destino: {message.get('payload')}")
+            self.node.data_logger.info("Mensaje ha llegado al destino: %s", message.get('payload'))
+            self.node.deliver_local(message)
         else:
             # Reenviar a todos los vecinos excepto al remitente
             self.node.flood_message(message, exclude_neighbor=message.get('from'))
 
+    def forward_frame(self, frame, body, source, destination, ttl):
+        """Camino rápido de tránsito: lo mismo que handle_message sin decodificar el payload"""
+        message_id = self.node.codec.message_id(body)
+        if message_id is None:
+            return False
+
+        # Los duplicados son la mayor parte del tráfico al inundar: se descartan
+        # antes de tocar el TTL o armar frames (check_and_add cuenta el hit)
+        if message_id in self.seen_messages:
+            self.seen_messages.check_and_add(message_id)
+            self.node.metrics.inc("duplicates_dropped")
+            self.node.data_logger.info("Mensaje ya recibido: %s, no se propaga", message_id)
+            return True
+
+        # Lo que puede fallar (ValueError: vuelve al camino normal) va antes de
+        # registrar el id; si no, el camino normal lo descartaría como duplicado
+        ttl -= 1
+        frames = None
+        if ttl > 0:
+            patch_ttl(body, ttl)
+            frames = self.node.flood_frames(frame, exclude_neighbor=source)
+
+        if self.seen_messages.check_and_add(message_id):
+            # Otro hilo lo registró mientras se armaban los frames
+            self.node.metrics.inc("duplicates_dropped")
+            return True
+
+        if ttl <= 0:
+            self.node.metrics.inc("ttl_expired")
+            self.node.logger.debug("TTL agotado")
+            return True
+
+        self.node.send_frames(frames)
+        return True
+
+    def dedup_stats(self):
+        """Contadores de hits/misses/evictions del cache de duplicados"""
+        return self.seen_messages.stats()
+
     def start(self):
+        # No bloquea: el nodo puede llamarlo desde su event loop
         self.running = True
         self.node.logger.info("Nodo inicializandose")
-        
-        while self.running:
-            time.sleep(1)
 
     def shutdown(self):
-        self.running = False
\ No newline at end of file
+        self.running = False
@@ -1,32 +1,180 @@
-import heapq
+import threading
 import time
 from src.utils.logger import setup_logger
-from src.algorithms.dijkstra import Dijkstra
+from src.utils.message_cache import make_duplicate_cache
+from src.network.routing import Graph
+from src.network.forwarding import ForwardingTable, message_flow, DATA_TYPES
+
+LSA_REFRESH_INTERVAL = 300.0
+LSA_STARTUP_REFRESH = 5.0
+LSA_MAX_AGE = 900.0
+LSDB_AGE_CHECK_INTERVAL = 30.0
+SPF_INITIAL_DELAY = 0.05
+SPF_MAX_HOLD = 5.0
+
+
+def lsa_message(origin, seq, neighbors):
+    """LSA de un origen; el id depende solo de origen y secuencia, así una copia reenviada se descarta como duplicada"""
+    return {
+        "proto": "lsr",
+        "type": "lsa",
+        "from": origin,
+        "seq": seq,
+        "neighbors": neighbors,
+        "timestamp": int(time.time()),
+        "id": f"{origin}-{seq}"
+    }
+
+
+class LinkStateDatabase:
+    """Última LSA conocida de cada origen, con su número de secuencia y edad"""
+
+    def __init__(self, max_age=LSA_MAX_AGE, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def install(self, origin, seq, neighbors):
+        """
+        Instala una LSA si es más nueva que la guardada.
+        Devuelve (aceptada, cambió_la_topología).
+        """
+        with self.lock:
+            entry = self.entries.get(origin)
+            if entry is not None and seq <= entry["seq"]:
+                return False, False
+
+            changed = entry is None or entry["neighbors"] != neighbors
+            self.entries[origin] = {
+                "seq": seq,
+                "neighbors": neighbors,
+                "installed_at": self.clock()
+            }
+            return True, changed
+
+    def expire(self):
+        """Elimina y devuelve los orígenes cuya LSA superó max_age sin refrescarse"""
+        deadline = self.clock() - self.max_age
+        with self.lock:
+            expired = [origin for origin, entry in self.entries.items() if entry["installed_at"] < deadline]
+            for origin in expired:
+                del self.entries[origin]
+        return expired
+
+    def lsas(self):
+        """Copia de las LSAs instaladas, para poner al día a un vecino"""
+        with self.lock:
+            return [lsa_message(origin, entry["seq"], entry["neighbors"]) for origin, entry in self.entries.items()]
+
+    def sequence_of(self, origin):
+        entry = self.entries.get(origin)
+        return entry["seq"] if entry else None
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SpfThrottle:
+    """
+    Hold-down exponencial para la SPF: los pedidos que llegan mientras hay una
+    corrida programada se juntan en ella, y si los cambios siguen llegando la
+    espera entre corridas se duplica hasta max_hold.
+    """
+
+    def __init__(self, node, run_spf, initial_delay=SPF_INITIAL_DELAY, max_hold=SPF_MAX_HOLD):
+        self.node = node
+        self.run_spf = run_spf
+        self.initial_delay = initial_delay
+        self.max_hold = max_hold
+        self.hold = initial_delay
+        self.last_run_at = None
+        self.timer = None
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.runs = 0
+
+    def request(self):
+        with self.lock:
+            self.requests += 1
+            if self.timer is not None:
+                return
+
+            now = self.node.now()
+            if self.last_run_at is None or now - self.last_run_at > self.max_hold:
+                # Red estable desde hace rato: volver a la espera mínima
+                self.hold = self.initial_delay
+                delay = self.initial_delay
+            else:
+                delay = max(self.initial_delay, self.last_run_at + self.hold - now)
+            self.timer = self.node.call_later(delay, self._fire)
+
+    def _fire(self):
+        with self.lock:
+            self.timer = None
+            self.last_run_at = self.node.now()
+            self.hold = min(self.hold * 2, self.max_hold)
+            self.runs += 1
+        self.run_spf()
+
+    def cancel(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
 
 class LinkStateRouter:
-    def __init__(self):
+    def __init__(self, dedup_mode="lru", refresh_interval=LSA_REFRESH_INTERVAL, max_age=LSA_MAX_AGE):
         self.node = None
-        self.lsa_seen = set()
+        self.lsa_seen = make_duplicate_cache(dedup_mode)
+        self.lsdb = LinkStateDatabase(max_age)
+        self.refresh_interval = refresh_interval
+        # Secuencia inicial basada en el reloj para que un nodo reiniciado
+        # no quede por debajo de las LSAs que originó antes
+        self.sequence = int(time.time())
         self.topology = {}
         self.routing_table = {}
+        self.spf = None
+        # La SPF solo corre cuando cambia la base de link state (dirty flag)
+        self.topology_version = 0
+        self.routes_version = -1
+        self.spf_lock = threading.Lock()
+        # Los LSAs llegan en los hilos de recepción y la SPF corre en el timer del
+        # throttle: la topología se cambia y se copia bajo este lock
+        self.topology_lock = threading.Lock()
+        self.spf_throttle = None
+        self.timers = {}
+        # Vecinos que liveness dio por caídos; no se anuncian en la LSA propia
+        self.down_links = set()
+        # Costos de enlaces propios que cambiaron respecto de la configuración (RTT medido)
+        self.cost_overrides = {}
         self.logger = setup_logger("LSR")
+        self.fib = ForwardingTable(self.logger)
         self.running = True
-        self.dijkstra = Dijkstra()
 
     def set_node(self, node):
         self.node = node
+        self.lsa_seen.clock = node.now
+        self.lsdb.clock = node.now
+        self.spf_throttle = SpfThrottle(node, self.calculate_routes)
+        # Un logger por nodo: run_network puede alojar varios en el mismo proceso
+        self.logger = setup_logger(f"LSR-{node.node_id}")
+        self.fib.logger = self.logger
+        self.fib.set_seed(node.node_id)
 
     def send_lsa(self):
-        """Enviar LSA de este nodo a todos los vecinos"""
-        lsa = {
-            "type": "lsa",
-            "from": self.node.node_id,
-            "neighbors": self.node.neighbors,
-            "timestamp": int(time.time()),
-            "id": f"{self.node.node_id}_{int(time.time())}"
+        """Origina una LSA nueva de este nodo y la envía a todos los vecinos"""
+        self.sequence += 1
+        neighbors = {
+            neighbor: self.cost_overrides.get(neighbor, cost) for neighbor, cost in self.node.neighbors.items()
+            if neighbor not in self.down_links
         }
+        lsa = lsa_message(self.node.node_id, self.sequence, neighbors)
         self.lsa_seen.add(lsa["id"])
-        self.logger.info(lsa)
+        if self.update_link_state(self.node.node_id, neighbors):
+            self.spf_throttle.request()
+        self.logger.debug("LSA originada: %s", lsa)
         self.node.flood_message(lsa)
 
     def handle_message(self, message):
@@ -34,93 +182,206 @@ class LinkStateRouter:
 
         if msg_type == "lsa":
             self.handle_lsa(message)
-        elif msg_type == "message":
+        elif msg_type in DATA_TYPES:
             self.handle_forwarding(message)
         else:
-            self.node.logger.debug(f"Ignorando mensaje de tipo {msg_type}")
+            self.node.logger.debug("Ignorando mensaje de tipo %s", msg_type)
 
     def handle_lsa(self, lsa):
         lsa_id = lsa.get("id")
-        if lsa_id in self.lsa_seen:
+        if self.lsa_seen.check_and_add(lsa_id):
+            self.node.metrics.inc("duplicates_dropped")
             return
 
-        self.lsa_seen.add(lsa_id)
-        sender = lsa["from"]
+        origin = lsa["from"]
+        seq = lsa.get("seq", 0)
         neighbors = lsa["neighbors"]
 
-        self.topology[sender] = neighbors
-        self.node.logger.info(f"LSA recibida de {sender}: {neighbors}")
+        if origin == self.node.node_id:
+            # Una LSA propia de antes de reiniciar: saltar por encima y reoriginar
+            if seq >= self.sequence:
+                self.sequence = seq
+                self.send_lsa()
+            return
 
-        self.calculate_routes()
+        accepted, changed = self.lsdb.install(origin, seq, neighbors)
+        if not accepted:
+            self.logger.debug("LSA vieja de %s (seq %s) descartada", origin, seq)
+            return
+
+        self.node.data_logger.info("LSA recibida de %s (seq %s): %s", origin, seq, neighbors)
+        if changed and self.update_link_state(origin, neighbors):
+            # Una ráfaga de LSAs produce una sola SPF
+            self.spf_throttle.request()
         self.node.flood_message(lsa, exclude_neighbor=lsa.get("from"))
 
+    def link_down(self, neighbor_id):
+        """Un vecino dejó de responder: reoriginar la LSA sin ese enlace"""
+        if neighbor_id in self.down_links:
+            return
+        self.down_links.add(neighbor_id)
+        # Al volver se anuncia con el costo configurado hasta medirlo de nuevo
+        self.cost_overrides.pop(neighbor_id, None)
+        self.send_lsa()
+
+    def link_up(self, neighbor_id):
+        if neighbor_id not in self.down_links:
+            return
+        self.down_links.discard(neighbor_id)
+        self.send_lsa()
+        # Mientras el enlace estuvo caído el vecino pudo perderse LSAs de este lado
+        self.sync_lsdb(neighbor_id)
+
+    def neighbor_connected(self, neighbor_id):
+        """Conexión nueva hacia un vecino (arranque o reconexión): ponerlo al día"""
+        self.sync_lsdb(neighbor_id)
+
+    def sync_lsdb(self, neighbor_id):
+        """
+        Le manda a un vecino la LSA propia y todas las de la LSDB. La topología
+        no se precarga de la configuración: un nodo que arranca tarde la
+        aprende así, sin esperar el refresco de cada origen.
+        """
+        own = self.topology.get(self.node.node_id)
+        lsas = self.lsdb.lsas()
+        if own is not None:
+            lsas.append(lsa_message(self.node.node_id, self.sequence, own))
+        for lsa in lsas:
+            self.node.send_message(lsa, neighbor_id)
+        self.logger.debug("LSDB enviada a %s (%s LSAs)", neighbor_id, len(lsas))
+
+    def update_link_cost(self, neighbor_id, cost):
+        """Cambió el costo de un enlace propio: reoriginar la LSA con el nuevo (la SPF la amortigua el throttle)"""
+        self.cost_overrides[neighbor_id] = cost
+        if neighbor_id not in self.down_links:
+            self.send_lsa()
+
+    def refresh_lsa(self):
+        """Reorigina la LSA propia periódicamente para que no expire en los demás"""
+        if not self.running:
+            return
+        self.send_lsa()
+        self.timers['refresh'] = self.node.call_later(self.refresh_interval, self.refresh_lsa)
+
+    def age_lsdb(self):
+        """Saca de la topología los orígenes que dejaron de refrescar su LSA"""
+        if not self.running:
+            return
+        expired = self.lsdb.expire()
+        for origin in expired:
+            self.node.logger.info("LSA de %s expiró, se elimina de la topología", origin)
+            self.remove_link_state(origin)
+        if expired:
+            self.spf_throttle.request()
+        self.timers['age'] = self.node.call_later(LSDB_AGE_CHECK_INTERVAL, self.age_lsdb)
+
+    def update_link_state(self, origin, neighbors):
+        """Instala los enlaces de un origen; True si la topología cambió"""
+        with self.topology_lock:
+            if self.topology.get(origin) == neighbors:
+                return False
+            self.topology[origin] = neighbors
+            self.topology_version += 1
+            return True
+
+    def remove_link_state(self, origin):
+        with self.topology_lock:
+            if self.topology.pop(origin, None) is not None:
+                self.topology_version += 1
+
+    def topology_snapshot(self):
+        """
+        Copia de la topología y su versión, tomadas juntas. Alcanza con copiar
+        el primer nivel: los dicts de vecinos de cada origen se reemplazan
+        enteros, nunca se modifican.
+        """
+        with self.topology_lock:
+            return dict(self.topology), self.topology_version
+
+    def routes_are_stale(self):
+        return self.routes_version != self.topology_version
+
     def calculate_routes(self):
         if not self.topology:
             return
 
-        start_node = self.node.node_id
+        with self.spf_lock:
+            if not self.routes_are_stale():
+                return
+            topology, version = self.topology_snapshot()
+            start = time.perf_counter()
+            routing_table = self._run_spf(topology)
+            self.node.metrics.observe("spf_duration", time.perf_counter() - start)
+            # Se publica la tabla nueva de una sola vez; los lectores nunca ven una a medias
+            self.routing_table = routing_table
+            self.fib.publish(routing_table)
+            self.routes_version = version
 
-        distances = {n: float('inf') for n in self.topology}
-        previous = {n: None for n in self.topology}
-        distances[start_node] = 0
+        self.node.logger.info("Tabla de routing recalculada para %s destinos (%s con ECMP)", len(routing_table), len(self.fib.multipath))
+        self.node.logger.debug("Tabla de routing: %s", routing_table)
 
-        pq = [(0, start_node)]
+    def _run_spf(self, topology):
+        graph = Graph.from_topology(topology)
+        if self.node.node_id not in graph:
+            return {}
+        self.spf = graph.shortest_paths(self.node.node_id)
+        return self.spf.routes()
 
-        while pq:
-            dist, current = heapq.heappop(pq)
-            if dist > distances[current]:
-                continue
+    def get_path(self, destination):
+        """Camino completo hacia un destino, reconstruido solo cuando se pide"""
+        return self.spf.path(destination) if self.spf else []
 
-            for neighbor, cost in self.topology.get(current, {}).items():
-                d = dist + cost
-                if d < distances[neighbor]:
-                    distances[neighbor] = d
-                    previous[neighbor] = current
-                    heapq.heappush(pq, (d, neighbor))
-
-        self.routing_table = {}
-        for node in self.topology:
-            if node == start_node:
-                continue
-
-            path = []
-            cur = node
-            while cur is not None:
-                path.append(cur)
-                cur = previous[cur]
-            path.reverse()
-
-            if len(path) > 1:
-                self.routing_table[node] = {
-                    "next_hop": path[1],
-                    "cost": distances[node],
-                    "path": path
-                }
-
-        self.node.logger.info(f"Tabla de routing recalculada: {self.routing_table}")
-
-    def get_next_hop(self, destination):
-        """Obtiene el próximo salto para un destino"""
-        if destination in self.routing_table:
-            return self.routing_table[destination]['next_hop']
-
-        self.logger.warning(f"No hay ruta conocida para {destination}")
-        return None
+    def get_next_hop(self, destination, source=None, flow=None):
+        """Obtiene el próximo salto para un destino desde la FIB (ECMP por flujo)"""
+        return self.fib.lookup(destination, source, flow)
 
     def handle_forwarding(self, message):
         destination = message.get("to")
-        self.calculate_routes()
+        # La SPF la programa el throttle; aquí solo si nunca se calculó
+        if self.routes_version < 0:
+            self.calculate_routes()
 
         if destination == self.node.node_id:
-            self.node.logger.info(f"Mensaje recibido: {message.get('payload')}")
+            self.node.data_logger.info("Mensaje recibido: %s", message.get('payload'))
+            self.node.deliver_local(message)
         else:
-            next_hop = self.get_next_hop(destination)
+            next_hop = self.get_next_hop(destination, message.get("from"), message_flow(message))
             if next_hop:
-                self.node.send_message(message, next_hop)
-                self.node.logger.info(f"Forwardeando mensaje a {next_hop} para {destination}")
+                if self.node.send_message(message, next_hop):
+                    self.node.data_logger.info("Forwardeando mensaje a %s para %s", next_hop, destination)
+                else:
+                    self.node.metrics.inc("forward_errors", label=next_hop)
+                    self.node.logger.error("No se pudo enviar a %s", next_hop)
             else:
-                self.node.logger.warning(f"No hay ruta para {destination}")
+                self.node.logger.debug("No hay ruta para %s", destination)
+
+    def forward_frame(self, frame, body, source, destination, ttl):
+        """Camino rápido de tránsito: reenvía el frame binario tal cual al próximo salto"""
+        if self.routes_version < 0:
+            self.calculate_routes()
+        next_hop = self.get_next_hop(destination, source)
+        if not next_hop:
+            return False
+        if not self.node.forward_frame(frame, next_hop):
+            # El camino normal vuelve a intentarlo (o lo descarta) con el mensaje decodificado
+            self.node.metrics.inc("forward_errors", label=next_hop)
+            self.node.logger.error("No se pudo enviar a %s", next_hop)
+            return False
+        self.node.data_logger.info("Forwardeando mensaje a %s para %s", next_hop, destination)
+        return True
 
     def start(self):
+        self.calculate_routes()
         self.send_lsa()
+        # El primer refresco es temprano porque al arrancar los vecinos aún no están conectados
+        self.timers['refresh'] = self.node.call_later(min(LSA_STARTUP_REFRESH, self.refresh_interval), self.refresh_lsa)
+        self.timers['age'] = self.node.call_later(LSDB_AGE_CHECK_INTERVAL, self.age_lsdb)
         self.node.logger.info("Link State Routing iniciado")
+
+    def shutdown(self):
+        self.running = False
+        if self.spf_throttle:
+            self.spf_throttle.cancel()
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers = {}
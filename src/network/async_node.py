@@ -0,0 +1,305 @@
+import asyncio
+import signal
+import threading
+from src.network.node import Node
+from src.network.liveness import Backoff, PeriodicTimer
+from src.utils.helpers import FrameDecoder, FrameError, RECV_BUFFER_SIZE
+
+# Bytes pendientes por vecino antes de descartar; el transporte de asyncio ya
+# junta en un solo write lo que se acumula mientras el socket está ocupado
+MAX_WRITE_BUFFER = 4 * 1024 * 1024
+# Segundos para abrir la conexión hacia el reply_to de un echo
+ECHO_CONNECT_TIMEOUT = 5.0
+
+
+class ThreadsafeTimer:
+    """Handle de un call_later pedido desde otro hilo; cancel() vale antes o después de programarlo"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.handle = None
+        self.cancelled = False
+
+    def schedule(self, delay, callback, args):
+        if not self.cancelled:
+            self.handle = self.loop.call_later(delay, callback, *args)
+
+    def cancel(self):
+        self.cancelled = True
+        try:
+            self.loop.call_soon_threadsafe(self._cancel)
+        except RuntimeError:
+            pass
+
+    def _cancel(self):
+        if self.handle is not None:
+            self.handle.cancel()
+
+
+class AsyncNode(Node):
+    """
+    Nodo que corre todo en un único event loop de asyncio: aceptar conexiones,
+    recibir, enviar, timers y callbacks del algoritmo de routing.
+    Expone el mismo contrato que Node hacia los algoritmos.
+    """
+
+    def __init__(self, node_id, neighbors, host, port, routing_algorithm):
+        # now() se usa ya en el constructor de Node, antes de que exista el loop
+        self.loop = None
+        self.loop_thread_id = None
+        super().__init__(node_id, neighbors, host, port, routing_algorithm)
+        self.server = None
+        self.writers = {}
+        self.stopped = None
+        # Tarea de conexión (ya resuelta o en curso) hacia cada reply_to de echo
+        self.echo_connections = {}
+        self.echo_tasks = set()
+
+    def now(self):
+        return self.loop.time() if self.loop else super().now()
+
+    def call_later(self, delay, callback, *args):
+        if self.in_loop() and not self.loop.is_closed():
+            return self.loop.call_later(delay, callback, *args)
+        # Desde otro hilo se programa con call_soon_threadsafe sin esperar al
+        # loop: si ya se detuvo (shutdown, SIGTERM) el timer simplemente no corre
+        timer = ThreadsafeTimer(self.loop)
+        try:
+            self.loop.call_soon_threadsafe(timer.schedule, delay, callback, args)
+        except RuntimeError:
+            # El loop ya terminó
+            pass
+        return timer
+
+    def every(self, interval, callback):
+        return PeriodicTimer(self, interval, callback)
+
+    def in_loop(self):
+        return self.loop is not None and threading.get_ident() == self.loop_thread_id
+
+    def start(self, node_addresses):
+        try:
+            asyncio.run(self.run(node_addresses))
+        except KeyboardInterrupt:
+            self.logger.info("Cerrando nodo")
+
+    async def run(self, node_addresses, handle_signals=True):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.stopped = asyncio.Event()
+        # SIGTERM (run_network) cierra el loop ordenadamente en vez de cortar
+        # las tareas a mitad de camino con SystemExit. Con varios nodos en el
+        # mismo loop la señal la atiende run_nodes
+        if handle_signals:
+            try:
+                self.loop.add_signal_handler(signal.SIGTERM, self.stopped.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        try:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        except OSError as e:
+            self.logger.error("Error iniciando servidor: %s", e)
+            self.report_ready(e)
+            return
+        self.logger.info("Escuchando en %s:%s (asyncio)", self.host, self.port)
+        if self.transport == "udp":
+            self.datagram = self.open_datagram(node_addresses)
+            if self.datagram is not None:
+                self.datagram.attach(self.loop)
+        self.report_ready()
+
+        connect_tasks = [
+            self.loop.create_task(self.connect_loop(neighbor_id, node_addresses[neighbor_id]))
+            for neighbor_id in self.neighbors
+            if neighbor_id in node_addresses
+        ]
+
+        # El algoritmo arranca dentro del loop; start() no debe bloquear
+        self.routing_algorithm.start()
+        self.liveness.start()
+        self.schedule_metrics()
+        self.logger.info("Nodo %s iniciado", self.node_id)
+
+        await self.stopped.wait()
+
+        for task in connect_tasks:
+            task.cancel()
+        if self.datagram is not None:
+            self.datagram.close()
+            self.datagram = None
+        for writer in list(self.writers.values()):
+            writer.close()
+        self.writers.clear()
+        for connection in list(self.echo_connections.values()):
+            if connection.done() and not connection.cancelled() and connection.exception() is None:
+                connection.result().close()
+            else:
+                connection.cancel()
+        self.echo_connections.clear()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        decoder = FrameDecoder(with_header=True)
+        peer = None
+        try:
+            while self.running:
+                data = await reader.read(RECV_BUFFER_SIZE)
+                if not data:
+                    break
+
+                for frame in decoder.feed(data):
+                    peer = self.handle_frame(frame, peer)
+
+        except FrameError as e:
+            self.logger.error("Stream corrupto, cerrando conexión: %s", e)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.logger.debug("Conexión cerrada por el otro extremo: %s", e)
+        except asyncio.CancelledError:
+            # Al cerrar el loop; si se propaga, start_server lo loguea como error
+            pass
+        finally:
+            writer.close()
+
+    # Mantiene una conexión de salida hacia el vecino, reconectando con backoff exponencial
+    async def connect_loop(self, neighbor_id, address):
+        host, port_str = address.split(':')
+        port = int(port_str)
+        backoff = Backoff(rng=self.random)
+
+        while self.running:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError as e:
+                delay = backoff.next()
+                self.logger.debug("No se pudo conectar a %s: %s (reintento en %.1f s)", neighbor_id, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            backoff.reset()
+            self.writers[neighbor_id] = writer
+            self.record_connect(neighbor_id)
+            self.logger.info("Conectado a %s en %s:%s", neighbor_id, host, port)
+            self.send_frame(self.hello_frame(neighbor_id), neighbor_id)
+            self.on_neighbor_connected(neighbor_id)
+
+            # El vecino nunca nos escribe por esta conexión: EOF significa que se
+            # cayó (o que liveness la cerró con drop_neighbor_connection)
+            try:
+                await reader.read()
+            except ConnectionError:
+                pass
+
+            if self.writers.get(neighbor_id) is writer:
+                del self.writers[neighbor_id]
+                self.binary_peers.discard(neighbor_id)
+            writer.close()
+            self.metrics.inc("disconnects", label=neighbor_id)
+            self.logger.info("Conexión con %s perdida", neighbor_id)
+
+    def send_frame(self, frame, neighbor_id):
+        writer = self.writers.get(neighbor_id)
+        if writer is None or writer.is_closing():
+            return False
+        if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.metrics.inc("send_drops", label=neighbor_id)
+            self.logger.warning("Cola de salida hacia %s llena, mensaje descartado", neighbor_id)
+            return False
+
+        if self.in_loop():
+            writer.write(frame)
+        else:
+            self.loop.call_soon_threadsafe(writer.write, frame)
+        self.record_send(len(frame), neighbor_id)
+        self.logger.debug("Mensaje enviado a %s", neighbor_id)
+        return True
+
+    def send_echo(self, address, frame):
+        """El acuse sale por una conexión asyncio: un reply_to lento no frena el loop"""
+        if self.in_loop():
+            self.start_echo(address, frame)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.start_echo, address, frame)
+        except RuntimeError as e:
+            # El loop ya terminó
+            self.echo_result(address, e)
+
+    def start_echo(self, address, frame):
+        task = self.loop.create_task(self.write_echo(address, frame))
+        # El loop solo guarda referencias débiles a sus tareas
+        self.echo_tasks.add(task)
+        task.add_done_callback(self.echo_tasks.discard)
+
+    async def write_echo(self, address, frame):
+        connection = self.echo_connections.get(address)
+        if connection is None:
+            # Los echo que llegan mientras se conecta esperan la misma tarea
+            connection = self.echo_connections[address] = self.loop.create_task(self.open_echo(address))
+        try:
+            writer = await connection
+            if writer.is_closing():
+                raise ConnectionError("conexión cerrada")
+            if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                raise OSError("buffer de salida lleno")
+            writer.write(frame)
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            # La próxima respuesta vuelve a conectar
+            if self.echo_connections.get(address) is connection:
+                del self.echo_connections[address]
+            self.echo_result(address, e)
+            return
+        self.echo_result(address, None)
+
+    async def open_echo(self, address):
+        host, port_str = address.split(':')
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port_str)), ECHO_CONNECT_TIMEOUT)
+        return writer
+
+    def drop_neighbor_connection(self, neighbor_id):
+        # Cerrar el writer hace que connect_loop vea EOF y reconecte
+        writer = self.writers.pop(neighbor_id, None)
+        self.binary_peers.discard(neighbor_id)
+        if writer is not None:
+            writer.close()
+
+    def queue_depths(self):
+        """Bytes pendientes en el transporte de cada vecino"""
+        return {
+            neighbor_id: writer.transport.get_write_buffer_size()
+            for neighbor_id, writer in list(self.writers.items())
+            if not writer.is_closing()
+        }
+
+    def shutdown(self):
+        self.running = False
+        self.liveness.stop()
+        if hasattr(self.routing_algorithm, 'shutdown'):
+            self.routing_algorithm.shutdown()
+        if self.metrics_path:
+            self.write_metrics()
+        if self.loop and self.stopped and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.stopped.set)
+            except RuntimeError:
+                # El loop ya terminó
+                pass
+
+
+def run_nodes(nodes, node_addresses):
+    """Corre varios AsyncNode en un único event loop (un worker de run_network)"""
+    asyncio.run(_run_nodes(nodes, node_addresses))
+
+
+async def _run_nodes(nodes, node_addresses):
+    def stop_all():
+        for node in nodes:
+            if node.stopped is not None:
+                node.stopped.set()
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop_all)
+    except (NotImplementedError, RuntimeError):
+        pass
+    await asyncio.gather(*(node.run(node_addresses, handle_signals=False) for node in nodes))
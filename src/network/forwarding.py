@@ -0,0 +1,109 @@
+import zlib
+
+MAX_UNKNOWN_DESTINATIONS = 4096
+# Tipos que se rutean hasta su destino; un echo además se contesta al origen
+DATA_TYPES = frozenset(("message", "echo"))
+
+
+def header_value(message, key):
+    """Valor de un header opcional del mensaje: headers: [{key: ...}]"""
+    for header in message.get("headers") or ():
+        if isinstance(header, dict) and key in header:
+            return header[key]
+    return None
+
+
+def message_flow(message):
+    """Flow id opcional de un mensaje: headers: [{"flow": ...}]"""
+    return header_value(message, "flow")
+
+
+class ForwardingTable:
+    """
+    FIB: mapa plano destino -> vecino que usa el plano de datos.
+    El plano de control arma un dict nuevo y lo publica reemplazando la
+    referencia, así los hilos que reciben mensajes leen sin locks y nunca ven
+    una tabla a medio construir.
+    Los destinos con varios caminos de igual costo tienen además sus next hops
+    en multipath; lookup elige uno con un hash estable de (from, to, flow), así
+    los mensajes de un mismo flujo siguen todos el mismo camino y en orden.
+    """
+
+    def __init__(self, logger=None, seed=""):
+        self.logger = logger
+        self.entries = {}
+        self.multipath = {}
+        self.set_seed(seed)
+        self.version = 0
+        # Cache negativo: destinos sin ruta ya reportados en esta versión
+        self.unknown = set()
+        self.hits = 0
+        self.misses = 0
+        # Callback opcional on_publish(cambió) para observar la convergencia
+        self.on_publish = None
+
+    def publish(self, routes):
+        """Publica una tabla {destino: {'next_hop', 'next_hops'?, ...}} del algoritmo de routing"""
+        self.publish_next_hops({
+            destination: route['next_hop']
+            for destination, route in routes.items()
+            if route.get('next_hop') is not None
+        }, {
+            destination: tuple(route['next_hops'])
+            for destination, route in routes.items()
+            if len(route.get('next_hops') or ()) > 1
+        })
+
+    def publish_next_hops(self, next_hops, multipath=None):
+        """Publica un mapa {destino: vecino} ya armado (no se modifica después)"""
+        multipath = multipath or {}
+        if self.on_publish is not None:
+            self.on_publish(next_hops != self.entries or multipath != self.multipath)
+        # multipath primero: un lector con la tabla vieja solo elige entre hops viejos
+        self.multipath = multipath
+        self.entries = next_hops
+        self.unknown = set()
+        self.version += 1
+
+    def lookup(self, destination, source=None, flow=None):
+        next_hop = self.entries.get(destination)
+        if next_hop is not None:
+            self.hits += 1
+            if self.multipath:
+                hops = self.multipath.get(destination)
+                if hops is not None:
+                    return hops[self.flow_hash(source, destination, flow) % len(hops)]
+            return next_hop
+
+        self.misses += 1
+        unknown = self.unknown
+        if destination not in unknown and len(unknown) < MAX_UNKNOWN_DESTINATIONS:
+            # Solo el primer fallo por destino y versión se reporta
+            unknown.add(destination)
+            if self.logger:
+                self.logger.warning("No hay ruta conocida para %s", destination)
+        return None
+
+    def set_seed(self, node_id):
+        # Cada nodo mezcla su id en el hash: si todos usaran el mismo, los
+        # nodos siguientes del camino elegirían siempre la misma rama
+        self.seed = zlib.crc32(node_id.encode())
+
+    def flow_hash(self, source, destination, flow=None):
+        key = f"{source}\0{destination}\0{'' if flow is None else flow}"
+        return zlib.crc32(key.encode(), self.seed)
+
+    def __contains__(self, destination):
+        return destination in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "entries": len(self.entries),
+            "multipath": len(self.multipath),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,100 @@
+# Peso de cada muestra en el RTT suavizado (TCP usa 1/8 para su SRTT)
+RTT_ALPHA = 0.2
+# Segundos de RTT que suman 1 al costo configurado del enlace (se trunca: en localhost no suma)
+RTT_COST_UNIT = 0.01
+# Cambio relativo mínimo respecto del costo vigente para anunciar uno nuevo
+COST_HYSTERESIS = 0.25
+# Segundos mínimos entre dos cambios de costo de un mismo enlace
+COST_HOLD_DOWN = 5.0
+# Muestras de un enlace antes de usar su RTT (las del arranque vienen infladas)
+MIN_RTT_SAMPLES = 5
+
+
+class LinkCostEstimator:
+    """
+    RTT por vecino medido con los hellos: cada hello lleva la hora de envío
+    (ts) y devuelve la del último hello recibido de ese vecino (echo) junto con
+    cuánto estuvo retenida (hold), así el que lo recibe calcula
+    ahora - echo - hold con su propio reloj. El RTT se suaviza con un EWMA
+    y, si enabled, el costo del enlace pasa a ser el configurado más
+    RTT / unit. Solo se avisa un costo nuevo (node.on_link_cost) si se aleja
+    del vigente más que la histéresis y pasó el hold-down desde el último
+    cambio del enlace: así un enlace no oscila entre dos rutas.
+    """
+
+    def __init__(self, node, alpha=RTT_ALPHA, unit=RTT_COST_UNIT, hysteresis=COST_HYSTERESIS,
+                 hold_down=COST_HOLD_DOWN, min_samples=MIN_RTT_SAMPLES):
+        self.node = node
+        self.alpha = alpha
+        self.unit = unit
+        self.hysteresis = hysteresis
+        self.hold_down = hold_down
+        self.min_samples = min_samples
+        # Apagado, solo mide; main.py lo activa con --dynamic-costs
+        self.enabled = False
+        self.srtt = {}
+        self.samples = {}
+        self.stamps = {}  # vecino -> (ts de su último hello, cuándo llegó)
+        self.costs = {}  # vecino -> costo dinámico vigente
+        self.changed_at = {}
+
+    def hello_fields(self, neighbor_id):
+        """Campos de tiempo para el hello hacia un vecino"""
+        now = self.node.now()
+        fields = {"ts": now}
+        stamp = self.stamps.get(neighbor_id)
+        if stamp is not None:
+            fields["echo"] = stamp[0]
+            fields["hold"] = now - stamp[1]
+        return fields
+
+    def on_hello(self, message):
+        neighbor_id = message.get("from")
+        if neighbor_id not in self.node.neighbors:
+            return
+        now = self.node.now()
+        if message.get("ts") is not None:
+            self.stamps[neighbor_id] = (message["ts"], now)
+        echo = message.get("echo")
+        if echo is None:
+            return
+        rtt = now - echo - message.get("hold", 0)
+        # Un echo de antes de reiniciar el nodo no dice nada
+        if 0 <= rtt < self.node.liveness.dead_interval:
+            self.sample(neighbor_id, rtt)
+
+    def sample(self, neighbor_id, rtt):
+        srtt = self.srtt.get(neighbor_id)
+        srtt = rtt if srtt is None else srtt + self.alpha * (rtt - srtt)
+        self.srtt[neighbor_id] = srtt
+        self.samples[neighbor_id] = self.samples.get(neighbor_id, 0) + 1
+        self.node.metrics.observe("hello_rtt", rtt)
+        if not self.enabled or self.samples[neighbor_id] < self.min_samples:
+            return
+
+        current = self.cost(neighbor_id)
+        cost = self.node.neighbors[neighbor_id] + int(srtt / self.unit)
+        if abs(cost - current) < max(1, self.hysteresis * current):
+            return
+        now = self.node.now()
+        last = self.changed_at.get(neighbor_id)
+        if last is not None and now - last < self.hold_down:
+            return
+        self.costs[neighbor_id] = cost
+        self.changed_at[neighbor_id] = now
+        self.node.on_link_cost(neighbor_id, cost)
+
+    def cost(self, neighbor_id):
+        """Costo vigente del enlace: el medido o, si no hay, el configurado"""
+        return self.costs.get(neighbor_id, self.node.neighbors.get(neighbor_id))
+
+    def reset(self, neighbor_id):
+        """El enlace se cayó: al volver se mide de cero desde el costo configurado"""
+        self.srtt.pop(neighbor_id, None)
+        self.samples.pop(neighbor_id, None)
+        self.stamps.pop(neighbor_id, None)
+        self.costs.pop(neighbor_id, None)
+
+    def rtts(self):
+        """RTT suavizado por vecino, en milisegundos"""
+        return {neighbor_id: round(srtt * 1000, 3) for neighbor_id, srtt in list(self.srtt.items())}
@@ -0,0 +1,131 @@
+import random
+import threading
+
+HELLO_INTERVAL = 1.0
+DEAD_INTERVAL = 4.0
+RECONNECT_INITIAL_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+
+
+class Backoff:
+    """Demora exponencial con jitter para reintentos de conexión"""
+
+    def __init__(self, initial=RECONNECT_INITIAL_DELAY, maximum=RECONNECT_MAX_DELAY, rng=random):
+        self.initial = initial
+        self.maximum = maximum
+        self.rng = rng
+        self.current = initial
+
+    def next(self):
+        # Jitter de ±25% para que los vecinos de un nodo caído no reintenten a la vez
+        delay = self.current * self.rng.uniform(0.75, 1.25)
+        self.current = min(self.current * 2, self.maximum)
+        return delay
+
+    def reset(self):
+        self.current = self.initial
+
+
+class Ticker:
+    """Un único hilo que llama a callback cada interval segundos hasta cancel()"""
+
+    def __init__(self, interval, callback):
+        self.interval = interval
+        self.callback = callback
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.callback()
+
+    def cancel(self):
+        self.stopped.set()
+
+
+class PeriodicTimer:
+    """Lo mismo que Ticker sobre node.call_later, para el event loop y el reloj virtual"""
+
+    def __init__(self, node, interval, callback):
+        self.node = node
+        self.interval = interval
+        self.callback = callback
+        self.cancelled = False
+        self.timer = node.call_later(interval, self.fire)
+
+    def fire(self):
+        if self.cancelled:
+            return
+        self.callback()
+        if not self.cancelled:
+            self.timer = self.node.call_later(self.interval, self.fire)
+
+    def cancel(self):
+        self.cancelled = True
+        if self.timer is not None:
+            self.timer.cancel()
+
+
+class NeighborLiveness:
+    """
+    Detección de vecinos vivos: manda un hello a cada vecino conectado cada
+    hello_interval y da el enlace por caído si no oye ninguno en dead_interval.
+    Al arrancar todos los vecinos se suponen vivos (la topología de la
+    configuración los incluye), así uno que nunca levanta también se detecta.
+    Los cambios se avisan con node.on_link_down / node.on_link_up.
+    """
+
+    def __init__(self, node, hello_interval=HELLO_INTERVAL, dead_interval=DEAD_INTERVAL):
+        self.node = node
+        self.hello_interval = hello_interval
+        self.dead_interval = dead_interval
+        self.last_heard = {}
+        self.down = set()
+        # Con hilos, heard() corre en los hilos de recepción y tick() en el del
+        # ticker: el cambio de estado y su aviso van juntos bajo el lock para
+        # que un "vecino activo" no se cruce con un "caído"
+        self.lock = threading.RLock()
+        self.timer = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        now = self.node.now()
+        with self.lock:
+            for neighbor_id in self.node.neighbors:
+                self.last_heard.setdefault(neighbor_id, now)
+        self.timer = self.node.every(self.hello_interval, self.tick)
+
+    def stop(self):
+        self.running = False
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def is_up(self, neighbor_id):
+        with self.lock:
+            return neighbor_id in self.node.neighbors and neighbor_id not in self.down
+
+    def heard(self, neighbor_id):
+        """Llega un hello del vecino"""
+        if neighbor_id not in self.node.neighbors:
+            return
+        with self.lock:
+            self.last_heard[neighbor_id] = self.node.now()
+            if neighbor_id in self.down:
+                self.down.discard(neighbor_id)
+                self.node.on_link_up(neighbor_id)
+
+    def tick(self):
+        if not self.running:
+            return
+        for neighbor_id in list(self.node.writers):
+            self.node.send_hello(neighbor_id)
+
+        with self.lock:
+            now = self.node.now()
+            for neighbor_id, last in list(self.last_heard.items()):
+                if neighbor_id not in self.down and now - last > self.dead_interval:
+                    self.down.add(neighbor_id)
+                    self.node.on_link_down(neighbor_id)
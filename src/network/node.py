@@ -1,8 +1,23 @@
 import socket
+import logging
 import threading
-import json
 import time
-from src.utils.logger import setup_logger
+import random
+from src.utils.logger import setup_logger, data_logger, dropped_records
+from src.utils.helpers import encode_frame, pack_frame, new_message_id, FrameDecoder, FrameError, FRAME_HEADER, RECV_BUFFER_SIZE
+from src.utils.codec import decode_body
+from src.utils.metrics import Metrics, METRICS_INTERVAL
+from src.transport.socket_client import NeighborWriter, PoolSender
+from src.transport.datagram import DatagramTransport, MAX_DATAGRAM
+from src.transport.xmpp_client import XmppClient, XMPP_ADDRESS
+from src.network.liveness import NeighborLiveness, Backoff, Ticker
+from src.network.forwarding import header_value
+from src.network.link_cost import LinkCostEstimator
+
+# Tipos de mensaje que van por UDP con transport 'udp'; los datos siguen por TCP
+CONTROL_TYPES = frozenset(("hello", "lsa", "dv", "info"))
+# TTL de la respuesta a un echo, que sale del destino hacia el origen
+ECHO_REPLY_TTL = 16
 
 class Node:
     def __init__(self, node_id, neighbors, host, port, routing_algorithm):
@@ -11,133 +26,564 @@ class Node:
         self.host = host
         self.port = port
         self.routing_algorithm = routing_algorithm
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket = None
         self.client_sockets = {}
+        # Un escritor con cola acotada por vecino; es el único que escribe en su socket
+        self.writers = {}
         self.logger = setup_logger(node_id)
+        # Eventos por mensaje, con muestreo para no inundar la consola
+        self.data_logger = data_logger(self.logger)
         self.running = True
+        # Fuente de aleatoriedad de los algoritmos; el simulador la reemplaza por una con semilla
+        self.random = random
+        # Contadores e histogramas del nodo; main.py define metrics_path para escribir snapshots
+        self.metrics = Metrics(node_id, self.now)
+        self.metrics.gauge("queue_depth", self.queue_depths)
+        self.metrics.gauge("log_records_dropped", dropped_records)
+        self.metrics_path = None
+        self.metrics_interval = METRICS_INTERVAL
+        self.connected_before = set()
+        # Hellos periódicos y dead interval; avisa caídas con on_link_down/on_link_up
+        self.liveness = NeighborLiveness(self)
+        # RTT por vecino con los hellos; con enabled también ajusta los costos
+        self.link_costs = LinkCostEstimator(self)
+        self.metrics.gauge("link_rtt_ms", self.link_costs.rtts)
+        # Se activa cuando se cae la conexión de salida hacia un vecino
+        self.disconnected = {}
+        self.stopping = threading.Event()
+        # Codec binario (main.py lo crea con la tabla de nombres); sin él todo va en JSON.
+        # binary_peers son los vecinos que lo aceptaron en su hello
+        self.codec = None
+        self.binary_peers = set()
+        # Camino rápido de tránsito del algoritmo (forward_frame), si lo tiene
+        self.transit_forward = getattr(routing_algorithm, 'forward_frame', None)
+        # on_ready(node, error) se llama una vez, cuando el servidor escucha o no pudo hacerlo
+        self.on_ready = None
+        self.ready_reported = False
+        # 'tcp': todo por las conexiones con los vecinos; 'udp': el control por
+        # datagramas en el mismo puerto; 'xmpp': todo por un stream XMPP hacia
+        # xmpp_server (main.py lo elige con --transport)
+        self.transport = "tcp"
+        self.datagram = None
+        self.xmpp = None
+        self.xmpp_server = XMPP_ADDRESS
+        # Envío de los acuses de echo hacia su reply_to (generador de carga)
+        self.echo_sender = None
+        self.echo_lock = threading.Lock()
         
         self.routing_algorithm.set_node(self)
 
     def start_server(self):
         try:
+            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
-            self.logger.info(f"Escuchando en {self.host}:{self.port}")
+            self.server_socket.listen(socket.SOMAXCONN)
+            self.logger.info("Escuchando en %s:%s", self.host, self.port)
+            self.report_ready()
             
             while self.running:
                 try:
                     client_socket, addr = self.server_socket.accept()
                     threading.Thread(target=self.handle_client, 
-                                    args=(client_socket,)).start()
+                                    args=(client_socket,), daemon=True).start()
                 except Exception as e:
                     if self.running:
-                        self.logger.debug(f"Error aceptando conexión: {e}")
+                        self.logger.debug("Error aceptando conexión: %s", e)
         except Exception as e:
-            self.logger.error(f"Error iniciando servidor: {e}")
+            self.logger.error("Error iniciando servidor: %s", e)
+            self.report_ready(e)
+
+    def report_ready(self, error=None):
+        """Avisa (una sola vez) que el nodo acepta conexiones, o por qué no pudo"""
+        if self.ready_reported:
+            return
+        self.ready_reported = True
+        if self.on_ready is not None:
+            self.on_ready(self, error)
 
     # Intenta conectar a vecinos, pero sin bloquear ni fallar si no están disponibles
     def connect_to_neighbors(self, node_addresses):
         for neighbor_id in self.neighbors:
-            if neighbor_id in node_addresses:
+            if self.xmpp is not None:
+                threading.Thread(target=self.attach_xmpp, args=(neighbor_id,), daemon=True).start()
+            elif neighbor_id in node_addresses:
                 threading.Thread(target=self.try_connect, 
-                               args=(neighbor_id, node_addresses[neighbor_id])).start()
+                               args=(neighbor_id, node_addresses[neighbor_id]), daemon=True).start()
 
-    #Intenta conectar a un vecino con reintentos en segundo plano
+    # Mantiene la conexión de salida hacia un vecino: reintenta con backoff
+    # exponencial y vuelve a conectar cada vez que la conexión se cae
     def try_connect(self, neighbor_id, address):
         host, port_str = address.split(':')
         port = int(port_str)
+        backoff = Backoff(rng=self.random)
+        disconnected = self.disconnected.setdefault(neighbor_id, threading.Event())
         
         while self.running:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(2)
             try:
-                if neighbor_id in self.client_sockets:
-                    # Ya conectado, verificar si la conexión sigue activa
-                    try:
-                        # Enviar un ping simple para verificar conexión
-                        ping_msg = json.dumps({
-                            "proto": "flooding",
-                            "type": "hello",
-                            "from": self.node_id,
-                            "to": neighbor_id,
-                            "ttl": 1,
-                            "headers": [],
-                            "payload": "ping"
-                        })
-                        self.client_sockets[neighbor_id].send(ping_msg.encode())
-                    except:
-                        # Conexión perdida, eliminar y reconectar
-                        if neighbor_id in self.client_sockets:
-                            del self.client_sockets[neighbor_id]
-                
-                if neighbor_id not in self.client_sockets:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(2)
-                    sock.connect((host, port))
-                    self.client_sockets[neighbor_id] = sock
-                    self.logger.info(f"Conectado a {neighbor_id} en {host}:{port}")
-                
-                # Conexión exitosa, salir del bucle de reintentos
-                break
-                
-            except Exception as e:
-                self.logger.debug(f"No se pudo conectar a {neighbor_id}: {e}")
-                time.sleep(3)  # Reintentar después de 3 segundos
+                sock.connect((host, port))
+            except OSError as e:
+                sock.close()
+                delay = backoff.next()
+                self.logger.debug("No se pudo conectar a %s: %s (reintento en %.1f s)", neighbor_id, e, delay)
+                self.stopping.wait(delay)
+                continue
+
+            backoff.reset()
+            disconnected.clear()
+            self.client_sockets[neighbor_id] = sock
+            self.writers[neighbor_id] = NeighborWriter(neighbor_id, sock, self.on_writer_error)
+            self.record_connect(neighbor_id)
+            self.logger.info("Conectado a %s en %s:%s", neighbor_id, host, port)
+            # El hello inicial le dice al vecino quién está del otro lado de la conexión
+            self.send_frame(self.hello_frame(neighbor_id), neighbor_id)
+            self.on_neighbor_connected(neighbor_id)
+
+            # Hasta que falle un envío o el vecino pase el dead interval sin hablar
+            disconnected.wait()
+            if self.running:
+                self.logger.info("Conexión con %s perdida, reconectando", neighbor_id)
+
+    # Con transport 'xmpp' no hay conexión por vecino: el escritor va por el
+    # stream del nodo. Se vuelve a agregar cuando liveness lo da por caído
+    def attach_xmpp(self, neighbor_id):
+        disconnected = self.disconnected.setdefault(neighbor_id, threading.Event())
+
+        while self.running:
+            if not self.xmpp.wait_connected(1.0):
+                continue
+            disconnected.clear()
+            self.writers[neighbor_id] = self.xmpp.writer_for(neighbor_id)
+            self.record_connect(neighbor_id)
+            self.logger.info("Vecino %s por XMPP (%s@%s)", neighbor_id, neighbor_id, self.xmpp.domain)
+            self.send_frame(self.hello_frame(neighbor_id), neighbor_id)
+            self.on_neighbor_connected(neighbor_id)
+
+            disconnected.wait()
+            if self.running:
+                self.stopping.wait(self.liveness.hello_interval)
+
+    def hello_frame(self, neighbor_id):
+        # Siempre en JSON: el vecino todavía no sabe si entendemos otro codec
+        hello = {
+            "proto": "flooding",
+            "type": "hello",
+            "from": self.node_id,
+            "to": neighbor_id,
+            "ttl": 1,
+            "headers": [self.codec.offer()] if self.codec else [],
+            "payload": "ping"
+        }
+        hello.update(self.link_costs.hello_fields(neighbor_id))
+        return encode_frame(hello)
+
+    def open_datagram(self, node_addresses):
+        """Socket UDP del transport 'udp'; si no se puede abrir, el control sigue por TCP"""
+        try:
+            datagram = DatagramTransport(self.host, self.port, self.receive_datagram, self.logger)
+        except OSError as e:
+            self.logger.error("No se pudo abrir el socket UDP, el control sigue por TCP: %s", e)
+            return None
+        for neighbor_id in self.neighbors:
+            if neighbor_id in node_addresses:
+                datagram.add_peer(neighbor_id, node_addresses[neighbor_id])
+        self.logger.info("Control por UDP en %s:%s", self.host, self.port)
+        return datagram
+
+    def receive_datagram(self, frame, peer):
+        self.metrics.inc("datagrams_in", label=peer or "externo")
+        self.handle_frame(frame, peer)
+
+    def receive_xmpp(self, frame, peer):
+        self.metrics.inc("stanzas_in", label=peer or "externo")
+        self.handle_frame(frame, peer)
+
+    def negotiate_codec(self, neighbor_id, headers):
+        """El hello del vecino dice si le podemos mandar frames binarios"""
+        if neighbor_id not in self.neighbors:
+            return
+        if self.codec is not None and self.codec.accepts(headers):
+            if neighbor_id not in self.binary_peers:
+                self.binary_peers.add(neighbor_id)
+                self.logger.info("Codec binario acordado con %s", neighbor_id)
+        elif neighbor_id in self.binary_peers:
+            self.binary_peers.discard(neighbor_id)
+            self.logger.info("%s ya no acepta el codec binario, se vuelve a JSON", neighbor_id)
 
+    def decode_body(self, body):
+        return decode_body(body, self.codec)
+
+    def encode_for(self, message, neighbor_id):
+        """Frame del mensaje en el codec acordado con el vecino"""
+        if neighbor_id in self.binary_peers:
+            return pack_frame(self.codec.encode(message))
+        return encode_frame(message)
+
+    # Lee frames del socket hasta que el otro extremo cierre la conexión
     def handle_client(self, client_socket):
+        decoder = FrameDecoder(with_header=True)
+        # Vecino del otro lado, conocido por su hello; sin hello es un cliente externo
+        peer = None
         try:
-            data = client_socket.recv(4096).decode()
-            if not data:
-                return
-                
-            message = json.loads(data)
-            self.logger.info(f"Mensaje recibido: {message}")
-            
-            # Procesar el mensaje según el protocolo estándar
-            self.process_standard_message(message)
-            
-        except json.JSONDecodeError:
-            self.logger.error("Mensaje JSON mal formado")
+            while self.running:
+                data = client_socket.recv(RECV_BUFFER_SIZE)
+                if not data:
+                    break
+
+                for frame in decoder.feed(data):
+                    peer = self.handle_frame(frame, peer)
+
+        except FrameError as e:
+            self.logger.error("Stream corrupto, cerrando conexión: %s", e)
         except Exception as e:
-            self.logger.error(f"Error manejando cliente: {e}")
+            if self.running:
+                self.logger.error("Error manejando cliente: %s", e)
         finally:
-            # No cerramos el socket para mantener la conexión
-            pass
+            client_socket.close()
+
+    def handle_frame(self, frame, peer):
+        """
+        Procesa un frame recibido (bytearray con la longitud incluida) y
+        devuelve el vecino del otro lado, que se conoce por su primer hello
+        """
+        body = memoryview(frame)[FRAME_HEADER.size:]
+        if self.forward_transit(frame, body):
+            self.record_receive(len(body), peer)
+            return peer
+
+        try:
+            message = self.decode_body(body)
+        except ValueError as e:
+            self.metrics.inc("malformed_frames", label=peer or "externo")
+            self.logger.error("Mensaje mal formado: %s", e)
+            return peer
+
+        if peer is None and message.get("type") == "hello":
+            peer = message.get("from")
+        self.record_receive(len(body), peer)
+        self.data_logger.info("Mensaje recibido: %s", message)
+
+        # Procesar el mensaje según el protocolo estándar
+        self.process_standard_message(message)
+        return peer
+
+    def forward_transit(self, frame, body):
+        """
+        Camino rápido para mensajes de datos en binario que no son para este
+        nodo: se lee solo la cabecera fija y el algoritmo reenvía el mismo
+        frame (con el TTL reescrito si corresponde) sin decodificar el payload.
+        False si el mensaje tiene que ir por el camino normal.
+        """
+        forward = self.transit_forward
+        if forward is None or self.codec is None:
+            return False
+        header = self.codec.routing_header(body)
+        if header is None or header[1] == self.node_id:
+            return False
+
+        start = time.perf_counter()
+        try:
+            handled = forward(frame, body, *header)
+        except ValueError:
+            return False
+        if handled:
+            self.metrics.observe("forward_latency", time.perf_counter() - start)
+            self.metrics.inc("fast_forwarded")
+            if self.data_logger.isEnabledFor(logging.INFO):
+                self.log_transit(body, *header)
+        return handled
+
+    def log_transit(self, body, source, destination, ttl):
+        """
+        Lo que el camino rápido no decodifica no pasa por "Mensaje recibido":
+        se deja una línea corta con id y destino para que el LogStore la indexe
+        """
+        try:
+            message_id = self.codec.message_id(body)
+        except ValueError:
+            message_id = None
+        self.data_logger.info("Mensaje en tránsito: {'id': '%s', 'from': '%s', 'to': '%s', 'ttl': %s}",
+                              message_id, source, destination, ttl)
 
     #Procesa mensajes según el protocolo definido
     def process_standard_message(self, message):
         message_type = message.get("type", "")
         
         if message_type == "hello":
-            # Mensaje de saludo/keepalive, podemos responder
-            self.logger.debug(f"Hello recibido de {message.get('from')}")
+            # Mensaje de saludo/keepalive: mantiene vivo el enlace con el vecino
+            self.logger.debug("Hello recibido de %s", message.get('from'))
+            self.negotiate_codec(message.get("from"), message.get("headers"))
+            self.liveness.heard(message.get("from"))
+            self.link_costs.on_hello(message)
         else:
             # Delegar al algoritmo de routing
+            start = time.perf_counter()
             self.routing_algorithm.handle_message(message)
+            elapsed = time.perf_counter() - start
+            self.metrics.observe("forward_latency" if message_type == "message" else "control_latency", elapsed)
+
+    def deliver_local(self, message):
+        """El algoritmo entrega aquí lo que llegó a este nodo; los echo se contestan"""
+        self.metrics.inc("delivered", label=message.get("type"))
+        if message.get("type") != "echo":
+            return
+        if header_value(message, "echo_reply") is None:
+            self.answer_echo(message)
+        else:
+            self.return_echo(message)
+
+    def answer_echo(self, message):
+        """Devuelve el echo a su origen por la red, con el id original en echo_reply"""
+        headers = [{"echo_reply": message.get("id")}]
+        reply_to = header_value(message, "reply_to")
+        if reply_to:
+            headers.append({"reply_to": reply_to})
+        reply = {
+            "proto": message.get("proto"),
+            "type": "echo",
+            "id": new_message_id(self.node_id),
+            "from": self.node_id,
+            "to": message.get("from"),
+            "ttl": ECHO_REPLY_TTL,
+            "headers": headers,
+            "payload": message.get("payload")
+        }
+        self.routing_algorithm.handle_message(reply)
+
+    def return_echo(self, reply):
+        """
+        La respuesta volvió al origen del echo: si quien lo inyectó pidió
+        acuse (header reply_to, 'host:puerto'), se le manda el frame por una
+        conexión persistente
+        """
+        address = header_value(reply, "reply_to")
+        if not address:
+            self.data_logger.info("Echo %s respondido por %s", header_value(reply, "echo_reply"), reply.get("from"))
+            return
+        try:
+            frame = encode_frame(reply)
+        except ValueError as e:
+            self.echo_result(address, e)
+            return
+        self.send_echo(address, frame)
+
+    def send_echo(self, address, frame):
+        """Encola el acuse en un hilo propio: el receptor no espera el connect ni el envío"""
+        with self.echo_lock:
+            if self.echo_sender is None:
+                self.echo_sender = PoolSender(on_result=self.echo_result)
+        if not self.echo_sender.enqueue(address, frame):
+            self.echo_result(address, OSError("cola de acuses llena"))
+
+    def echo_result(self, address, error):
+        if error is None:
+            self.metrics.inc("echo_acks")
+            return
+        self.metrics.inc("echo_ack_errors")
+        self.logger.warning("No se pudo avisar el echo a %s: %s", address, error)
 
     #Envía mensaje usando el protocolo estándar
     def send_message(self, message, neighbor_id):
-        try:
-            if neighbor_id in self.client_sockets:
-                sock = self.client_sockets[neighbor_id]
-                sock.send(json.dumps(message).encode())
-                self.logger.debug(f"Mensaje enviado a {neighbor_id}")
-                return True
-        except Exception as e:
-            self.logger.error(f"Error enviando mensaje a {neighbor_id}: {e}")
-            # Eliminar socket problemático
-            if neighbor_id in self.client_sockets:
-                del self.client_sockets[neighbor_id]
-        return False
+        if neighbor_id not in self.writers:
+            return False
+        frame = self.encode_for(message, neighbor_id)
+        if self.datagram is not None and message.get("type") in CONTROL_TYPES:
+            return self.send_datagram(frame, neighbor_id)
+        return self.send_frame(frame, neighbor_id)
+
+    def send_hello(self, neighbor_id):
+        frame = self.hello_frame(neighbor_id)
+        if self.datagram is not None:
+            return self.send_datagram(frame, neighbor_id)
+        return self.send_frame(frame, neighbor_id)
 
-    #Reenvía mensaje a todos los vecinos conectados
+    def send_datagram(self, frame, neighbor_id):
+        """Frame de control por UDP; si no entra en un datagrama o falla, por TCP"""
+        if len(frame) > MAX_DATAGRAM or not self.datagram.send(frame, neighbor_id):
+            return self.send_frame(frame, neighbor_id)
+        self.record_send(len(frame), neighbor_id)
+        self.metrics.inc("datagrams_out", label=neighbor_id)
+        return True
+
+    def forward_frame(self, frame, neighbor_id):
+        """Reenvía un frame binario recibido; a un vecino sin codec binario se le pasa a JSON"""
+        if neighbor_id in self.binary_peers:
+            return self.send_frame(frame, neighbor_id)
+        if neighbor_id not in self.writers:
+            return False
+        return self.send_frame(self.json_frame(frame), neighbor_id)
+
+    def flood_frame(self, frame, exclude_neighbor=None):
+        """flood_message para un frame binario recibido, sin volver a serializarlo"""
+        return self.send_frames(self.flood_frames(frame, exclude_neighbor))
+
+    def flood_frames(self, frame, exclude_neighbor=None):
+        """
+        (vecino, frame) de un flood sin mandar nada todavía: el paso a JSON
+        para los vecinos sin codec binario (que puede fallar con ValueError)
+        se hace acá, antes del primer envío
+        """
+        json_frame = None
+        frames = []
+        for neighbor_id in list(self.writers):
+            if neighbor_id == exclude_neighbor:
+                continue
+            if neighbor_id in self.binary_peers:
+                frames.append((neighbor_id, frame))
+            else:
+                if json_frame is None:
+                    json_frame = self.json_frame(frame)
+                frames.append((neighbor_id, json_frame))
+        return frames
+
+    def send_frames(self, frames):
+        sent_count = 0
+        for neighbor_id, frame in frames:
+            if self.send_frame(frame, neighbor_id):
+                sent_count += 1
+        return sent_count
+
+    def json_frame(self, frame):
+        return encode_frame(self.codec.decode(memoryview(frame)[FRAME_HEADER.size:]))
+
+    # Encola un frame ya codificado en el escritor del vecino, sin bloquear
+    def send_frame(self, frame, neighbor_id):
+        writer = self.writers.get(neighbor_id)
+        if writer is None:
+            return False
+        if not writer.enqueue(frame):
+            self.metrics.inc("send_drops", label=neighbor_id)
+            self.logger.warning("Cola de salida hacia %s llena, mensaje descartado", neighbor_id)
+            return False
+        self.record_send(len(frame), neighbor_id)
+        self.logger.debug("Mensaje enviado a %s", neighbor_id)
+        return True
+
+    #Reenvía mensaje a todos los vecinos conectados (se serializa una vez por codec)
     def flood_message(self, message, exclude_neighbor=None):
+        frames = {}
         sent_count = 0
-        for neighbor_id in self.client_sockets:
+        send = self.send_frame
+        if self.datagram is not None and message.get("type") in CONTROL_TYPES:
+            send = self.send_datagram
+        for neighbor_id in list(self.writers):
             if neighbor_id != exclude_neighbor:
-                if self.send_message(message, neighbor_id):
+                binary = neighbor_id in self.binary_peers
+                frame = frames.get(binary)
+                if frame is None:
+                    frame = frames[binary] = self.encode_for(message, neighbor_id)
+                if send(frame, neighbor_id):
                     sent_count += 1
         return sent_count
 
+    def on_writer_error(self, writer, error):
+        self.logger.error("Error enviando mensaje a %s: %s", writer.neighbor_id, error)
+        # Eliminar socket problemático
+        if self.writers.get(writer.neighbor_id) is writer:
+            self.drop_neighbor_connection(writer.neighbor_id)
+
+    def drop_neighbor_connection(self, neighbor_id):
+        writer = self.writers.pop(neighbor_id, None)
+        if writer:
+            writer.close()
+            self.metrics.inc("disconnects", label=neighbor_id)
+        self.client_sockets.pop(neighbor_id, None)
+        # La próxima conexión vuelve a negociar el codec con el hello
+        self.binary_peers.discard(neighbor_id)
+        disconnected = self.disconnected.get(neighbor_id)
+        if disconnected is not None:
+            disconnected.set()
+
+    def on_link_down(self, neighbor_id):
+        """Liveness dio al vecino por caído: cortar la conexión y avisar al algoritmo"""
+        self.logger.warning("Vecino %s caído: sin hello en %.1f s", neighbor_id, self.liveness.dead_interval)
+        self.metrics.inc("link_down", label=neighbor_id)
+        self.drop_neighbor_connection(neighbor_id)
+        self.link_costs.reset(neighbor_id)
+        if hasattr(self.routing_algorithm, 'link_down'):
+            self.routing_algorithm.link_down(neighbor_id)
+
+    def on_link_up(self, neighbor_id):
+        self.logger.info("Vecino %s activo de nuevo", neighbor_id)
+        self.metrics.inc("link_up", label=neighbor_id)
+        if hasattr(self.routing_algorithm, 'link_up'):
+            self.routing_algorithm.link_up(neighbor_id)
+
+    def on_neighbor_connected(self, neighbor_id):
+        """Hay conexión nueva hacia un vecino: el algoritmo puede mandarle su estado"""
+        if hasattr(self.routing_algorithm, 'neighbor_connected'):
+            self.routing_algorithm.neighbor_connected(neighbor_id)
+
+    def on_link_cost(self, neighbor_id, cost):
+        """El costo medido de un enlace superó la histéresis: el algoritmo lo re-anuncia"""
+        self.logger.info("Costo del enlace con %s ahora %s (RTT %.2f ms)",
+                         neighbor_id, cost, self.link_costs.srtt.get(neighbor_id, 0) * 1000)
+        self.metrics.inc("link_cost_changes", label=neighbor_id)
+        if hasattr(self.routing_algorithm, 'update_link_cost'):
+            self.routing_algorithm.update_link_cost(neighbor_id, cost)
+
+    def record_receive(self, size, peer):
+        label = peer or "externo"
+        self.metrics.inc("messages_in", label=label)
+        self.metrics.inc("bytes_in", size + FRAME_HEADER.size, label=label)
+
+    def record_send(self, size, neighbor_id):
+        self.metrics.inc("messages_out", label=neighbor_id)
+        self.metrics.inc("bytes_out", size, label=neighbor_id)
+
+    def record_connect(self, neighbor_id):
+        self.metrics.inc("connects", label=neighbor_id)
+        if neighbor_id in self.connected_before:
+            self.metrics.inc("reconnects", label=neighbor_id)
+        self.connected_before.add(neighbor_id)
+
+    def queue_depths(self):
+        """Frames esperando en la cola de cada vecino"""
+        return {neighbor_id: writer.queue_depth() for neighbor_id, writer in list(self.writers.items())}
+
+    def schedule_metrics(self):
+        if self.metrics_path and self.metrics_interval > 0:
+            self.call_later(self.metrics_interval, self.write_metrics)
+
+    def write_metrics(self):
+        """Snapshot periódico de métricas en metrics_path"""
+        try:
+            self.metrics.write_snapshot(self.metrics_path)
+        except OSError as e:
+            self.logger.warning("No se pudieron escribir las métricas: %s", e)
+        if self.running:
+            self.schedule_metrics()
+
+    def now(self):
+        """Reloj monotónico que usan los algoritmos para medir tiempos"""
+        return time.monotonic()
+
+    # Programa un callback dentro de `delay` segundos; devuelve un objeto con cancel()
+    def call_later(self, delay, callback, *args):
+        timer = threading.Timer(delay, callback, args=args)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    # Llama a callback cada `interval` segundos desde un único hilo; devuelve un objeto con cancel()
+    def every(self, interval, callback):
+        return Ticker(interval, callback)
+
     def start(self, node_addresses):
+        self.launch(node_addresses)
+        
+        # Bucle principal simple
+        try:
+            while self.running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.logger.info("Cerrando nodo")
+            self.shutdown()
+
+    def launch(self, node_addresses):
+        """Arranca servidor, algoritmo y conexiones en hilos propios sin bloquear"""
         # Iniciar servidor
         server_thread = threading.Thread(target=self.start_server)
         server_thread.daemon = True
@@ -148,21 +594,39 @@ class Node:
         routing_thread.daemon = True
         routing_thread.start()
         
+        if self.transport == "udp":
+            self.datagram = self.open_datagram(node_addresses)
+            if self.datagram is not None:
+                self.datagram.start()
+        elif self.transport == "xmpp":
+            # El servidor TCP sigue abierto para inyectar mensajes desde afuera
+            self.xmpp = XmppClient(self.node_id, self.xmpp_server, self.receive_xmpp, self.logger)
+            self.xmpp.start()
+
         # Conectar a vecinos (en segundo plano con reintentos)
         self.connect_to_neighbors(node_addresses)
+        self.liveness.start()
+        self.schedule_metrics()
         
-        self.logger.info(f"Nodo {self.node_id} iniciado")
-        
-        # Bucle principal simple
-        try:
-            while self.running:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            self.logger.info("Cerrando nodo")
-            self.shutdown()
+        self.logger.info("Nodo %s iniciado", self.node_id)
 
     def shutdown(self):
         self.running = False
-        for sock in self.client_sockets.values():
-            sock.close()
-        self.server_socket.close()
\ No newline at end of file
+        self.stopping.set()
+        self.liveness.stop()
+        if hasattr(self.routing_algorithm, 'shutdown'):
+            self.routing_algorithm.shutdown()
+        if self.metrics_path:
+            self.write_metrics()
+        if self.datagram is not None:
+            self.datagram.close()
+        if self.xmpp is not None:
+            self.xmpp.close()
+        if self.echo_sender is not None:
+            self.echo_sender.close()
+        for neighbor_id in list(self.writers):
+            self.drop_neighbor_connection(neighbor_id)
+        for disconnected in list(self.disconnected.values()):
+            disconnected.set()
+        if self.server_socket:
+            self.server_socket.close()
\ No newline at end of file
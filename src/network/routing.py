@@ -0,0 +1,171 @@
+import heapq
+from array import array
+
+INFINITY = float('inf')
+NO_HOP = -1
+
+
+class Graph:
+    """
+    Grafo compacto para la SPF: los IDs de nodo se internan a enteros y la
+    adyacencia se guarda en arreglos CSR (offsets, targets, weights).
+    Los vecinos de i son targets[offsets[i]:offsets[i + 1]]. index (nombre ->
+    entero) se arma de names si no se pasa uno, p. ej. uno que busca en el
+    archivo mapeado.
+    """
+
+    def __init__(self, names, offsets, targets, weights, index=None):
+        self.names = names
+        self.index = index if index is not None else {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_topology(cls, topology):
+        """Construye el grafo desde el formato de topo-ejemplo.json: {nodo: {vecino: costo}}"""
+        names = list(topology)
+        index = {name: i for i, name in enumerate(names)}
+        # Vecinos que no tienen entrada propia también son nodos del grafo
+        for links in topology.values():
+            for neighbor in links:
+                if neighbor not in index:
+                    index[neighbor] = len(names)
+                    names.append(neighbor)
+
+        # Costos enteros (lo normal en la configuración) se guardan como enteros
+        integral = all(isinstance(cost, int) for links in topology.values() for cost in links.values())
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = array('q' if integral else 'd')
+        for name in names:
+            for neighbor, cost in topology.get(name, {}).items():
+                targets.append(index[neighbor])
+                weights.append(cost)
+            offsets.append(len(targets))
+
+        return cls(names, offsets, targets, weights)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def neighbors(self, name):
+        """Devuelve {vecino: costo} de un nodo"""
+        i = self.index[name]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return {self.names[self.targets[k]]: self.weights[k] for k in range(start, end)}
+
+    def to_topology(self):
+        return {name: self.neighbors(name) for name in self.names}
+
+    def shortest_paths(self, source, multipath=True):
+        """
+        Dijkstra desde source calculando costo y next hop de cada nodo en una
+        sola pasada. Con multipath también junta todos los next hops de igual
+        costo (ECMP); solo los nodos con empate tienen entrada en multipath.
+        """
+        size = len(self.names)
+        src = self.index[source]
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        costs = [INFINITY] * size
+        next_hops = [NO_HOP] * size
+        parents = [NO_HOP] * size
+        # {nodo: tupla ordenada de next hops} para los destinos con más de uno
+        multi = {}
+        costs[src] = 0
+        pq = [(0, src)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        while pq:
+            cost, u = heappop(pq)
+            if cost > costs[u]:
+                continue
+
+            # El next hop se hereda del padre; los vecinos directos son su propio next hop
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                d = cost + weights[k]
+                if d < costs[v]:
+                    costs[v] = d
+                    parents[v] = u
+                    next_hops[v] = v if u == src else next_hops[u]
+                    if multi:
+                        inherited = multi.get(u) if u != src else None
+                        if inherited is not None:
+                            multi[v] = inherited
+                        else:
+                            multi.pop(v, None)
+                    heappush(pq, (d, v))
+                elif d == costs[v] and multipath and v != src:
+                    # Otro camino del mismo costo: v suma los next hops de u. Con pesos
+                    # positivos u ya está cerrado, así que su conjunto es definitivo
+                    hops_u = (v,) if u == src else multi.get(u) or (next_hops[u],)
+                    hops_v = multi.get(v) or (next_hops[v],)
+                    if hops_u != hops_v:
+                        merged = tuple(sorted(set(hops_v).union(hops_u)))
+                        if len(merged) > len(hops_v):
+                            multi[v] = merged
+
+        return SpfResult(self, src, costs, next_hops, parents, multi)
+
+
+class SpfResult:
+    """Resultado de una SPF: costos y next hops por índice; los caminos se arman solo si se piden"""
+
+    def __init__(self, graph, source, costs, next_hops, parents, multipath=None):
+        self.graph = graph
+        self.source = source
+        self.costs = costs
+        self.next_hops = next_hops
+        self.parents = parents
+        self.multipath = multipath or {}
+
+    def next_hop(self, destination):
+        i = self.graph.index.get(destination)
+        if i is None or self.next_hops[i] == NO_HOP:
+            return None
+        return self.graph.names[self.next_hops[i]]
+
+    def all_next_hops(self, destination):
+        """Todos los next hops de igual costo hacia un destino"""
+        i = self.graph.index.get(destination)
+        if i is None or self.next_hops[i] == NO_HOP:
+            return []
+        names = self.graph.names
+        return [names[hop] for hop in self.multipath.get(i, (self.next_hops[i],))]
+
+    def cost(self, destination):
+        i = self.graph.index.get(destination)
+        return INFINITY if i is None else self.costs[i]
+
+    def path(self, destination):
+        """Reconstruye el camino completo hacia un destino (lista vacía si no hay)"""
+        i = self.graph.index.get(destination)
+        if i is None or (i != self.source and self.parents[i] == NO_HOP):
+            return []
+        path = []
+        while i != NO_HOP:
+            path.append(self.graph.names[i])
+            i = self.parents[i]
+        path.reverse()
+        return path
+
+    def routes(self):
+        """
+        Tabla {destino: {'next_hop', 'cost'}} con los destinos alcanzables; los
+        que tienen varios caminos de igual costo llevan además 'next_hops'
+        """
+        names = self.graph.names
+        costs = self.costs
+        routes = {
+            names[i]: {'next_hop': names[hop], 'cost': costs[i]}
+            for i, hop in enumerate(self.next_hops)
+            if hop != NO_HOP
+        }
+        for i, hops in self.multipath.items():
+            routes[names[i]]['next_hops'] = [names[hop] for hop in hops]
+        return routes
@@ -0,0 +1,300 @@
+import logging
+from src.network.node import Node
+from src.network.liveness import PeriodicTimer
+from src.network.simulator import EventScheduler
+from src.network.routing import Graph
+from src.algorithms.flooding import Flooding
+from src.algorithms.dijkstra import Dijkstra
+from src.algorithms.link_state import LinkStateRouter
+from src.algorithms.distance_vector import DistanceVectorRouter, config_infinity
+from src.utils.helpers import FRAME_HEADER, FrameError
+from src.utils.codec import BinaryCodec, topology_names
+
+ALGORITHMS = ['flooding', 'dijkstra', 'lsr', 'dvr']
+
+
+class VirtualNode(Node):
+    """
+    Nodo sin sockets: send_message/flood_message entregan los frames a la
+    VirtualNetwork en lugar de escribirlos en una conexión TCP.
+    """
+
+    def __init__(self, node_id, neighbors, network, routing_algorithm):
+        self.network = network
+        super().__init__(node_id, neighbors, None, None, routing_algorithm)
+        self.logger.setLevel(network.log_level)
+        # Aleatoriedad de los algoritmos (jitter) con la semilla de la simulación
+        self.random = network.scheduler.random
+
+    def now(self):
+        return self.network.now()
+
+    def call_later(self, delay, callback, *args):
+        return self.network.call_later(delay, callback, *args)
+
+    def every(self, interval, callback):
+        return PeriodicTimer(self, interval, callback)
+
+    def connect_to_neighbors(self, node_addresses=None):
+        # Los enlaces existen si el vecino también está en la red simulada
+        for neighbor_id in self.neighbors:
+            if neighbor_id in self.network.nodes:
+                self.writers[neighbor_id] = neighbor_id
+                # Todos los nodos simulados comparten el codec: no hace falta negociarlo
+                if self.codec is not None:
+                    self.binary_peers.add(neighbor_id)
+
+    def queue_depths(self):
+        # Los frames en vuelo son eventos del simulador, no hay colas por vecino
+        return {}
+
+    def drop_neighbor_connection(self, neighbor_id):
+        # El enlace vuelve con VirtualNetwork.restore_link
+        self.writers.pop(neighbor_id, None)
+
+    def send_frame(self, frame, neighbor_id):
+        if neighbor_id not in self.writers:
+            return False
+        self.network.transmit(self.node_id, neighbor_id, frame)
+        self.record_send(len(frame), neighbor_id)
+        return True
+
+    def receive_frame(self, frame, sender_id=None):
+        # El mismo frame puede estar en vuelo hacia otros nodos: se copia antes
+        # de que el camino rápido le reescriba el TTL
+        frame = bytearray(frame)
+        body = memoryview(frame)[FRAME_HEADER.size:]
+        self.record_receive(len(body), sender_id)
+        if self.forward_transit(frame, body):
+            self.network.count_frame("message")
+            return
+        try:
+            message = self.decode_body(body)
+        except (ValueError, FrameError) as e:
+            # Como en handle_frame: se descarta el frame, la simulación sigue
+            self.metrics.inc("malformed_frames", label=sender_id)
+            self.logger.error("Mensaje mal formado: %s", e)
+            return
+        self.network.record_receive(self.node_id, message)
+        self.process_standard_message(message)
+
+    def start(self, node_addresses=None):
+        self.connect_to_neighbors()
+        self.routing_algorithm.start()
+
+    def shutdown(self):
+        self.running = False
+        self.liveness.stop()
+        if hasattr(self.routing_algorithm, 'shutdown'):
+            self.routing_algorithm.shutdown()
+
+
+def build_algorithm(name, topo_config, shared_graph=None):
+    """Crea el algoritmo de routing para un nodo, igual que main.py"""
+    if name == 'flooding':
+        return Flooding()
+    if name == 'dijkstra':
+        algorithm = Dijkstra()
+        algorithm.topology = topo_config['config']
+        # Todos los nodos comparten el mismo grafo de solo lectura
+        algorithm.graph = shared_graph
+        return algorithm
+    if name == 'lsr':
+        # Como en main.py, la topología se aprende por LSAs
+        return LinkStateRouter()
+    if name == 'dvr':
+        return DistanceVectorRouter(infinity=config_infinity(topo_config['config']))
+    raise ValueError(f"Algoritmo {name} no soportado en la simulación")
+
+
+class VirtualNetwork:
+    """
+    Topología completa dentro de un solo proceso. Los frames entre nodos y los
+    timers de los algoritmos son eventos de un EventScheduler con reloj
+    virtual; cada enlace demora base_delay + costo * cost_delay (+ jitter).
+    Con liveness=True los nodos intercambian hellos y detectan solos los
+    enlaces caídos; si no, fail_link les avisa en el momento. Con
+    codec='binary' los frames entre nodos usan el codec binario. Con
+    dynamic_costs (requiere liveness) los nodos ajustan los costos con el
+    RTT de los hellos, y slow_link agrega demora a un enlace.
+    """
+
+    def __init__(self, log_level=logging.WARNING, seed=None, base_delay=0.0, cost_delay=0.0, jitter=0.0,
+                 liveness=False, codec='json', dynamic_costs=False):
+        self.log_level = log_level
+        self.liveness = liveness
+        self.dynamic_costs = dynamic_costs
+        # (a, b) ordenado -> demora extra del enlace en segundos
+        self.extra_delay = {}
+        self.codec_name = codec
+        self.codec = None
+        self.scheduler = EventScheduler(seed)
+        self.base_delay = base_delay
+        self.cost_delay = cost_delay
+        self.jitter = jitter
+        self.nodes = {}
+        self.in_flight = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.frames_by_type = {}
+        self.injected = {}
+        self.deliveries = {}
+        self.route_changes = []
+
+    @classmethod
+    def from_config(cls, topo_config, algorithm='flooding', log_level=logging.WARNING, **options):
+        network = cls(log_level, **options)
+        if network.codec_name == 'binary':
+            network.codec = BinaryCodec(topology_names(topo_config['config']))
+        shared_graph = Graph.from_topology(topo_config['config']) if algorithm == 'dijkstra' else None
+        for node_id, neighbors in topo_config['config'].items():
+            network.add_node(node_id, dict(neighbors), build_algorithm(algorithm, topo_config, shared_graph))
+        return network
+
+    def add_node(self, node_id, neighbors, routing_algorithm):
+        node = VirtualNode(node_id, neighbors, self, routing_algorithm)
+        node.codec = self.codec
+        node.link_costs.enabled = self.dynamic_costs
+        # Los algoritmos crean su propio logger en set_node
+        if hasattr(routing_algorithm, 'logger'):
+            routing_algorithm.logger.setLevel(self.log_level)
+        fib = getattr(routing_algorithm, 'fib', None)
+        if fib is not None:
+            fib.on_publish = self.record_route_change
+        self.nodes[node_id] = node
+        return node
+
+    def now(self):
+        return self.scheduler.now()
+
+    def call_later(self, delay, callback, *args):
+        return self.scheduler.call_later(delay, callback, *args)
+
+    def link_delay(self, sender_id, neighbor_id):
+        cost = self.nodes[sender_id].neighbors.get(neighbor_id, 1)
+        delay = self.base_delay + cost * self.cost_delay
+        if self.extra_delay:
+            delay += self.extra_delay.get(tuple(sorted((sender_id, neighbor_id))), 0.0)
+        if self.jitter:
+            delay += self.scheduler.random.uniform(0, self.jitter)
+        return delay
+
+    def transmit(self, sender_id, neighbor_id, frame):
+        self.frames_sent += 1
+        self.bytes_sent += len(frame)
+        self.in_flight += 1
+        self.scheduler.call_later(self.link_delay(sender_id, neighbor_id), self.deliver, neighbor_id, frame, sender_id)
+
+    def deliver(self, neighbor_id, frame, sender_id=None):
+        self.in_flight -= 1
+        node = self.nodes.get(neighbor_id)
+        if node is None or not node.running:
+            return
+        # Lo que estaba en vuelo por un enlace que se cayó se pierde
+        if sender_id is not None and sender_id not in node.writers:
+            return
+        node.receive_frame(frame, sender_id)
+
+    def count_frame(self, message_type):
+        self.frames_by_type[message_type] = self.frames_by_type.get(message_type, 0) + 1
+
+    def record_receive(self, node_id, message):
+        message_type = message.get("type", "")
+        self.count_frame(message_type)
+        if message_type == "message" and message.get("to") == node_id:
+            message_id = message.get("id")
+            if message_id not in self.deliveries:
+                self.deliveries[message_id] = self.now()
+
+    def record_route_change(self, changed=True):
+        if changed:
+            self.route_changes.append(self.now())
+
+    @property
+    def last_route_change(self):
+        return self.route_changes[-1] if self.route_changes else None
+
+    def convergence_times(self, event_times):
+        """
+        Para cada evento (p. ej. un cambio de costo), cuánto tardó en cambiar la
+        última ruta antes del evento siguiente.
+        """
+        bounds = sorted(event_times) + [float('inf')]
+        changes = self.route_changes
+        result = []
+        k = 0
+        for i, start in enumerate(bounds[:-1]):
+            while k < len(changes) and changes[k] < start:
+                k += 1
+            last = None
+            while k < len(changes) and changes[k] < bounds[i + 1]:
+                last = changes[k]
+                k += 1
+            result.append(0.0 if last is None else last - start)
+        return result
+
+    def start(self):
+        for node in self.nodes.values():
+            node.connect_to_neighbors()
+        for node in self.nodes.values():
+            if isinstance(node.routing_algorithm, Dijkstra):
+                node.routing_algorithm.calculate_routes()
+            node.routing_algorithm.start()
+            if self.liveness:
+                node.liveness.start()
+
+    def inject(self, message):
+        """Entrega un mensaje al nodo 'from' como si llegara de un cliente externo"""
+        self.injected[message.get("id")] = self.now()
+        node = self.nodes[message["from"]]
+        node.process_standard_message(message)
+
+    def change_link_cost(self, a, b, cost):
+        """Cambia el costo de un enlace en ambos extremos"""
+        for node_id, neighbor_id in ((a, b), (b, a)):
+            node = self.nodes[node_id]
+            node.neighbors[neighbor_id] = cost
+            algorithm = node.routing_algorithm
+            if hasattr(algorithm, 'update_link_cost'):
+                algorithm.update_link_cost(neighbor_id, cost)
+
+    def slow_link(self, a, b, delay):
+        """Agrega demora a un enlace sin cambiar su costo (congestión, enlace lento)"""
+        self.extra_delay[tuple(sorted((a, b)))] = delay
+
+    def fail_link(self, a, b):
+        """Corta un enlace en ambos sentidos"""
+        for node_id, neighbor_id in ((a, b), (b, a)):
+            node = self.nodes[node_id]
+            node.writers.pop(neighbor_id, None)
+            if not self.liveness:
+                node.on_link_down(neighbor_id)
+
+    def restore_link(self, a, b):
+        """Vuelve a conectar un enlace cortado con fail_link"""
+        for node_id, neighbor_id in ((a, b), (b, a)):
+            node = self.nodes[node_id]
+            node.writers[neighbor_id] = neighbor_id
+            if not self.liveness:
+                node.on_link_up(neighbor_id)
+
+    def run(self, duration=None):
+        """
+        Sin duration procesa eventos hasta que no queden frames en vuelo;
+        con duration avanza el reloj virtual esa cantidad de segundos.
+        """
+        if duration is None:
+            self.scheduler.run(stop=lambda: self.in_flight == 0)
+        else:
+            self.scheduler.run(until=self.now() + duration)
+
+    def delivery_latencies(self):
+        return [
+            self.deliveries[message_id] - sent_at
+            for message_id, sent_at in self.injected.items()
+            if message_id in self.deliveries
+        ]
+
+    def shutdown(self):
+        for node in self.nodes.values():
+            node.shutdown()
@@ -0,0 +1,105 @@
+import socket
+import threading
+from src.utils.helpers import FRAME_HEADER
+
+# Máximo payload de un datagrama UDP sobre IPv4; lo que no entra va por TCP
+MAX_DATAGRAM = 65507
+# Buffer de recepción del kernel: una inundación de LSAs llega toda junta
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+
+class DatagramTransport:
+    """
+    Socket UDP en el mismo host:puerto que el servidor TCP del nodo, para el
+    tráfico de control (hellos, LSAs, vectores de distancia). Cada datagrama
+    lleva un frame completo, con su prefijo de longitud, así el nodo lo procesa
+    igual que uno recibido por TCP. El vecino se reconoce por la dirección de
+    origen: cada nodo manda desde su propio socket ya enlazado.
+    """
+
+    def __init__(self, host, port, on_frame, logger):
+        self.on_frame = on_frame
+        self.logger = logger
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        except OSError:
+            pass
+        self.sock.bind((host, port))
+        self.peers = {}  # (ip, puerto) -> vecino
+        self.addresses = {}  # vecino -> (ip, puerto)
+        self.running = True
+        self.loop = None
+        self.invalid = 0
+
+    def add_peer(self, neighbor_id, address):
+        host, port_str = address.split(':')
+        try:
+            resolved = (socket.gethostbyname(host), int(port_str))
+        except OSError as e:
+            self.logger.warning("No se pudo resolver %s para UDP: %s", address, e)
+            return
+        self.addresses[neighbor_id] = resolved
+        self.peers[resolved] = neighbor_id
+
+    def send(self, frame, neighbor_id):
+        """False si el vecino no tiene dirección o el envío falló (se reintenta por TCP)"""
+        address = self.addresses.get(neighbor_id)
+        if address is None or len(frame) > MAX_DATAGRAM:
+            return False
+        try:
+            self.sock.sendto(frame, address)
+        except OSError:
+            return False
+        return True
+
+    def start(self):
+        """Recibe en un hilo propio (motor de hilos)"""
+        self.sock.settimeout(1.0)
+        threading.Thread(target=self.receive_loop, daemon=True).start()
+
+    def attach(self, loop):
+        """Recibe desde el event loop (motor asyncio)"""
+        self.loop = loop
+        self.sock.setblocking(False)
+        loop.add_reader(self.sock.fileno(), self.drain)
+
+    def receive_loop(self):
+        while self.running:
+            try:
+                data, address = self.sock.recvfrom(MAX_DATAGRAM + FRAME_HEADER.size)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self.running:
+                    self.logger.error("Socket UDP cerrado inesperadamente")
+                return
+            self.dispatch(data, address)
+
+    def drain(self):
+        while self.running:
+            try:
+                data, address = self.sock.recvfrom(MAX_DATAGRAM + FRAME_HEADER.size)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.logger.debug("Error recibiendo datagrama: %s", e)
+                return
+            self.dispatch(data, address)
+
+    def dispatch(self, data, address):
+        # Un datagrama es un frame entero: la longitud del prefijo tiene que coincidir
+        if len(data) < FRAME_HEADER.size or FRAME_HEADER.unpack_from(data)[0] != len(data) - FRAME_HEADER.size:
+            self.invalid += 1
+            return
+        try:
+            self.on_frame(bytearray(data), self.peers.get(address))
+        except Exception as e:
+            self.logger.error("Error procesando datagrama de %s: %s", address, e)
+
+    def close(self):
+        self.running = False
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
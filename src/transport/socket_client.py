@@ -0,0 +1,199 @@
+import select
+import socket
+import threading
+from collections import deque
+
+DEFAULT_MAX_QUEUE = 1024
+DEFAULT_MAX_BATCH_BYTES = 256 * 1024
+
+
+class NeighborWriter:
+    """
+    Escritor asíncrono para la conexión con un vecino.
+    Los frames se encolan sin bloquear al que envía y un hilo dedicado los
+    manda juntando los que estén pendientes en un solo sendall.
+    """
+
+    def __init__(self, neighbor_id, sock, on_error=None,
+                 max_queue=DEFAULT_MAX_QUEUE, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES):
+        self.neighbor_id = neighbor_id
+        self.sock = sock
+        self.on_error = on_error
+        self.max_queue = max_queue
+        self.max_batch_bytes = max_batch_bytes
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.running = True
+        self.dropped = 0
+        self.sent_frames = 0
+        self.sent_batches = 0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def enqueue(self, frame):
+        """Encola un frame ya codificado; False si la cola está llena o cerrada"""
+        with self.condition:
+            if not self.running:
+                return False
+            if len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self.queue.append(frame)
+            self.condition.notify()
+        return True
+
+    def queue_depth(self):
+        return len(self.queue)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    return
+
+                # Juntar los frames pendientes hasta el límite del batch
+                batch = [self.queue.popleft()]
+                size = len(batch[0])
+                while self.queue and size < self.max_batch_bytes:
+                    frame = self.queue.popleft()
+                    batch.append(frame)
+                    size += len(frame)
+
+            try:
+                self.sock.sendall(batch[0] if len(batch) == 1 else b"".join(batch))
+                self.sent_frames += len(batch)
+                self.sent_batches += 1
+            except OSError as e:
+                self.close()
+                if self.on_error:
+                    self.on_error(self, e)
+                return
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.queue.clear()
+            self.condition.notify()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    """
+    Conexiones TCP reutilizables hacia los nodos, una por dirección. Para las
+    herramientas que inyectan mensajes: el nodo lee frames de una conexión
+    hasta que se cierra, así no hace falta abrir una por mensaje.
+    """
+
+    def __init__(self, timeout=5.0):
+        self.timeout = timeout
+        self.connections = {}
+        self.lock = threading.Lock()
+
+    def send(self, address, frame):
+        """Manda un frame ya codificado a 'host:puerto'; reconecta una vez si la conexión murió"""
+        with self.lock:
+            for attempt in range(2):
+                sock = self.connection(address)
+                try:
+                    sock.sendall(frame)
+                    return
+                except OSError:
+                    self.discard(address)
+                    if attempt:
+                        raise
+
+    def connection(self, address):
+        sock = self.connections.get(address)
+        if sock is not None and self.alive(sock):
+            return sock
+        self.discard(address)
+        host, port_str = address.split(':')
+        sock = socket.create_connection((host, int(port_str)), timeout=self.timeout)
+        self.connections[address] = sock
+        return sock
+
+    @staticmethod
+    def alive(sock):
+        # El nodo nunca escribe por estas conexiones: si hay algo para leer es EOF o un reset
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def discard(self, address):
+        sock = self.connections.pop(address, None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def close(self):
+        with self.lock:
+            for address in list(self.connections):
+                self.discard(address)
+
+
+class PoolSender:
+    """
+    Manda frames por un ConnectionPool desde un hilo propio: quien encola no
+    espera el connect ni el sendall (acuses de echo hacia direcciones que
+    pueden estar lentas o caídas). on_result(address, error) se llama desde
+    ese hilo, con error None si el frame salió.
+    """
+
+    def __init__(self, on_result=None, max_queue=DEFAULT_MAX_QUEUE, timeout=5.0):
+        self.pool = ConnectionPool(timeout=timeout)
+        self.on_result = on_result
+        self.max_queue = max_queue
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.running = True
+        self.dropped = 0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def enqueue(self, address, frame):
+        """Encola un frame para 'host:puerto'; False si la cola está llena o cerrada"""
+        with self.condition:
+            if not self.running:
+                return False
+            if len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self.queue.append((address, frame))
+            self.condition.notify()
+        return True
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                address, frame = self.queue.popleft()
+
+            try:
+                self.pool.send(address, frame)
+                error = None
+            except (OSError, ValueError) as e:
+                error = e
+            if self.on_result:
+                self.on_result(address, error)
+        # Lo cierra este hilo: close() no espera un connect en curso
+        self.pool.close()
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.queue.clear()
+            self.condition.notify()
@@ -0,0 +1,276 @@
+import base64
+import socket
+import threading
+import xml.etree.ElementTree as ET
+from collections import deque
+from xml.sax.saxutils import escape, quoteattr
+from src.utils.helpers import pack_frame, FRAME_HEADER, RECV_BUFFER_SIZE
+from src.transport.socket_client import NeighborWriter
+from src.network.liveness import Backoff
+
+XMPP_DOMAIN = "lab3"
+XMPP_PORT = 5222
+XMPP_ADDRESS = f"localhost:{XMPP_PORT}"
+HANDSHAKE_TIMEOUT = 5.0
+
+STREAM_NS = "http://etherx.jabber.org/streams"
+CLIENT_NS = "jabber:client"
+SASL_NS = "urn:ietf:params:xml:ns:xmpp-sasl"
+BIND_NS = "urn:ietf:params:xml:ns:xmpp-bind"
+# Cuerpos binarios (codec bin1) van en base64 dentro de este elemento; los JSON en <body>
+FRAME_NS = "urn:lab3:frame"
+
+
+class XmppError(Exception):
+    """El servidor cerró el stream, rechazó la sesión o mandó XML inválido"""
+    pass
+
+
+def local_name(tag):
+    return tag.rpartition("}")[2]
+
+
+def bare_jid(jid):
+    return jid.partition("/")[0]
+
+
+def stream_header(domain, stream_id=None):
+    attributes = f" from='{domain}' id='{stream_id}'" if stream_id else f" to='{domain}'"
+    return (f"<?xml version='1.0'?><stream:stream{attributes} xmlns='{CLIENT_NS}' "
+            f"xmlns:stream='{STREAM_NS}' version='1.0'>").encode()
+
+
+def message_stanza(to_jid, body, from_jid=None):
+    """Stanza <message> con el cuerpo de un frame (JSON como texto, binario en base64)"""
+    if body[:1] == b"{":
+        content = f"<body>{escape(bytes(body).decode())}</body>"
+    else:
+        content = f"<frame xmlns='{FRAME_NS}'>{base64.b64encode(body).decode()}</frame>"
+    sender = f" from={quoteattr(from_jid)}" if from_jid else ""
+    return f"<message to={quoteattr(to_jid)}{sender} type='normal'>{content}</message>".encode()
+
+
+def stanza_body(element):
+    """Cuerpo del frame que trae un <message>; None si no trae ninguno"""
+    for child in element:
+        name = local_name(child.tag)
+        if name == "body":
+            return (child.text or "").encode()
+        if name == "frame":
+            return base64.b64decode(child.text or "")
+    return None
+
+
+class StanzaReader:
+    """
+    Parser incremental de un stream XMPP. feed() devuelve eventos completos:
+    ('stream', elemento) al abrir el stream, ('stanza', elemento) por cada
+    hijo directo terminado y ('end', None) al cerrarse. Los stanzas ya
+    entregados se sacan del árbol para que el stream no crezca en memoria.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Cada stream nuevo (también tras la autenticación) empieza con su propio header
+        self.parser = ET.XMLPullParser(events=("start", "end"))
+        self.stream = None
+        self.depth = 0
+
+    def feed(self, data):
+        try:
+            self.parser.feed(data)
+            raw_events = list(self.parser.read_events())
+        except ET.ParseError as e:
+            raise XmppError(f"XML inválido en el stream: {e}")
+
+        events = []
+        for event, element in raw_events:
+            if event == "start":
+                self.depth += 1
+                if self.depth == 1:
+                    self.stream = element
+                    events.append(("stream", element))
+            else:
+                self.depth -= 1
+                if self.depth == 1:
+                    self.stream.remove(element)
+                    events.append(("stanza", element))
+                elif self.depth == 0:
+                    events.append(("end", None))
+        return events
+
+
+class XmppNeighborWriter:
+    """Escritor hacia un vecino por el stream XMPP del nodo (mismo contrato que NeighborWriter)"""
+
+    def __init__(self, client, neighbor_id):
+        self.client = client
+        self.neighbor_id = neighbor_id
+        self.jid = f"{neighbor_id}@{client.domain}"
+
+    def enqueue(self, frame):
+        return self.client.send(message_stanza(self.jid, memoryview(frame)[FRAME_HEADER.size:]))
+
+    def queue_depth(self):
+        return self.client.queue_depth()
+
+    def close(self):
+        # El stream es compartido con los demás vecinos: no se cierra por uno
+        pass
+
+
+class XmppClient:
+    """
+    Un stream XMPP persistente por nodo hacia el servidor (JID <nodo>@dominio).
+    Los stanzas se encolan y un hilo los manda en lotes (NeighborWriter), sin
+    esperar respuesta por mensaje; la cola acotada es la contrapresión: si se
+    llena, send() devuelve False y el nodo lo cuenta como descarte. Si el
+    stream se cae se reconecta con backoff; lo encolado en ese momento se pierde
+    igual que con una conexión TCP.
+    """
+
+    def __init__(self, node_id, address, on_frame, logger, domain=XMPP_DOMAIN, password=""):
+        self.node_id = node_id
+        self.address = address
+        self.on_frame = on_frame
+        self.logger = logger
+        self.domain = domain
+        self.password = password
+        self.jid = None
+        self.sock = None
+        self.writer = None
+        self.connected = threading.Event()
+        self.running = True
+        self.stopping = threading.Event()
+        self.dropped = 0
+        self.pending = deque()
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def wait_connected(self, timeout=None):
+        return self.connected.wait(timeout)
+
+    def writer_for(self, neighbor_id):
+        return XmppNeighborWriter(self, neighbor_id)
+
+    def send(self, stanza):
+        writer = self.writer
+        if writer is None or not writer.enqueue(stanza):
+            self.dropped += 1
+            return False
+        return True
+
+    def queue_depth(self):
+        writer = self.writer
+        return writer.queue_depth() if writer else 0
+
+    def run(self):
+        host, port_str = self.address.split(':')
+        backoff = Backoff()
+        while self.running:
+            reader = StanzaReader()
+            try:
+                self.sock = socket.create_connection((host, int(port_str)), timeout=HANDSHAKE_TIMEOUT)
+                self.open_session(reader)
+            except (OSError, XmppError) as e:
+                self.close_socket()
+                delay = backoff.next()
+                self.logger.debug("No se pudo abrir el stream XMPP con %s: %s (reintento en %.1f s)",
+                                  self.address, e, delay)
+                self.stopping.wait(delay)
+                continue
+
+            backoff.reset()
+            self.writer = NeighborWriter(self.jid, self.sock, self.on_writer_error)
+            self.connected.set()
+            self.logger.info("Stream XMPP abierto como %s", self.jid)
+            try:
+                self.receive(reader)
+            except (OSError, XmppError) as e:
+                if self.running:
+                    self.logger.warning("Stream XMPP cerrado: %s", e)
+            self.connected.clear()
+            writer, self.writer = self.writer, None
+            if writer is not None:
+                writer.close()
+            self.close_socket()
+
+    def open_session(self, reader):
+        """Header, SASL PLAIN, reinicio del stream y bind del recurso"""
+        self.pending.clear()
+        self.sock.sendall(stream_header(self.domain))
+        self.expect(reader, "stream")
+        self.expect(reader, "features")
+        credentials = base64.b64encode(f"\0{self.node_id}\0{self.password}".encode()).decode()
+        self.sock.sendall(f"<auth xmlns='{SASL_NS}' mechanism='PLAIN'>{credentials}</auth>".encode())
+        self.expect(reader, "success")
+
+        reader.reset()
+        self.pending.clear()
+        self.sock.sendall(stream_header(self.domain))
+        self.expect(reader, "stream")
+        self.expect(reader, "features")
+        self.sock.sendall(f"<iq type='set' id='bind'><bind xmlns='{BIND_NS}'><resource>{escape(self.node_id)}"
+                          f"</resource></bind></iq>".encode())
+        result = self.expect(reader, "iq")
+        jid = result.find(f"{{{BIND_NS}}}bind/{{{BIND_NS}}}jid")
+        if result.get("type") != "result" or jid is None:
+            raise XmppError("El servidor no asignó un recurso")
+        self.jid = jid.text
+        self.sock.sendall(b"<presence/>")
+        self.sock.settimeout(None)
+
+    def expect(self, reader, name):
+        kind, element = self.next_event(reader)
+        found = "stream" if kind == "stream" else (local_name(element.tag) if element is not None else kind)
+        if found != name:
+            raise XmppError(f"Se esperaba {name} y llegó {found}")
+        return element
+
+    def next_event(self, reader):
+        while not self.pending:
+            data = self.sock.recv(RECV_BUFFER_SIZE)
+            if not data:
+                raise XmppError("El servidor cerró la conexión")
+            self.pending.extend(reader.feed(data))
+        return self.pending.popleft()
+
+    def receive(self, reader):
+        while self.running:
+            kind, element = self.next_event(reader)
+            if kind == "end":
+                raise XmppError("El servidor cerró el stream")
+            if kind != "stanza" or local_name(element.tag) != "message":
+                continue
+            body = stanza_body(element)
+            if body is None:
+                continue
+            peer = bare_jid(element.get("from", "")).partition("@")[0] or None
+            try:
+                self.on_frame(bytearray(pack_frame(body)), peer)
+            except Exception as e:
+                self.logger.error("Error procesando mensaje XMPP de %s: %s", peer, e)
+
+    def on_writer_error(self, writer, error):
+        self.logger.error("Error escribiendo en el stream XMPP: %s", error)
+        self.close_socket()
+
+    def close_socket(self):
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def close(self):
+        self.running = False
+        self.stopping.set()
+        writer = self.writer
+        if writer is not None:
+            writer.close()
+        self.close_socket()
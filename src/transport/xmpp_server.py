@@ -0,0 +1,158 @@
+import asyncio
+import base64
+import itertools
+import logging
+import threading
+from xml.sax.saxutils import escape
+from src.utils.helpers import RECV_BUFFER_SIZE
+from src.transport.xmpp_client import (
+    StanzaReader, XmppError, local_name, bare_jid, stream_header, message_stanza, stanza_body,
+    XMPP_DOMAIN, XMPP_PORT, SASL_NS, BIND_NS,
+)
+
+# Bytes pendientes hacia un cliente antes de descartar lo que se le rutea
+MAX_WRITE_BUFFER = 4 * 1024 * 1024
+
+
+class LocalXmppServer:
+    """
+    Servidor XMPP mínimo para correr la red y los benchmarks sin red externa.
+    Implementa solo lo que usa XmppClient: stream, SASL PLAIN (acepta cualquier
+    contraseña), bind del recurso y ruteo de <message> por JID. Sin TLS, roster
+    ni mensajes offline: un mensaje a alguien sin sesión se descarta.
+    """
+
+    def __init__(self, host="localhost", port=XMPP_PORT, domain=XMPP_DOMAIN, logger=None):
+        self.host = host
+        self.port = port
+        self.domain = domain
+        self.logger = logger or logging.getLogger("xmpp-server")
+        self.sessions = {}  # JID sin recurso -> writer de su conexión
+        self.stream_ids = itertools.count(1)
+        self.routed = 0
+        self.dropped = 0
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.stopped = None
+
+    async def serve(self, ready=None):
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.logger.info("Servidor XMPP local en %s:%s (dominio %s)", self.host, self.port, self.domain)
+        if ready is not None:
+            ready.set()
+        await self.stopped.wait()
+        self.server.close()
+        for writer in list(self.sessions.values()):
+            writer.close()
+        await self.server.wait_closed()
+
+    def start_in_thread(self, timeout=5.0):
+        """Corre el servidor en un hilo con su propio event loop; vuelve cuando ya escucha"""
+        ready = threading.Event()
+        self.thread = threading.Thread(target=asyncio.run, args=(self.serve(ready),), daemon=True)
+        self.thread.start()
+        if not ready.wait(timeout):
+            raise OSError(f"El servidor XMPP no pudo escuchar en {self.host}:{self.port}")
+
+    def stop(self):
+        if self.loop is not None and self.stopped is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.stopped.set)
+            except RuntimeError:
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    async def handle_client(self, reader, writer):
+        stanzas = StanzaReader()
+        user = None
+        bare = None
+        try:
+            while True:
+                data = await reader.read(RECV_BUFFER_SIZE)
+                if not data:
+                    break
+                for kind, element in stanzas.feed(data):
+                    if kind == "end":
+                        return
+                    if kind == "stream":
+                        writer.write(stream_header(self.domain, next(self.stream_ids)) + self.features(user))
+                        continue
+
+                    name = local_name(element.tag)
+                    if name == "message" and bare is not None:
+                        self.route(element, bare)
+                    elif name == "auth" and user is None:
+                        user = self.authenticate(element)
+                        if user is None:
+                            writer.write(f"<failure xmlns='{SASL_NS}'><not-authorized/></failure>".encode())
+                            return
+                        writer.write(f"<success xmlns='{SASL_NS}'/>".encode())
+                        # El cliente abre un stream nuevo; lo que sigue es de otro documento
+                        stanzas.reset()
+                        break
+                    elif name == "iq" and user is not None:
+                        bare = self.bind(element, user, writer) or bare
+                    # presence y demás stanzas no se usan en la red
+        except (XmppError, ConnectionError) as e:
+            self.logger.debug("Sesión XMPP cerrada con error: %s", e)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if bare is not None and self.sessions.get(bare) is writer:
+                del self.sessions[bare]
+            writer.close()
+
+    def features(self, user):
+        if user is None:
+            return (f"<stream:features><mechanisms xmlns='{SASL_NS}'><mechanism>PLAIN</mechanism>"
+                    f"</mechanisms></stream:features>").encode()
+        return f"<stream:features><bind xmlns='{BIND_NS}'/></stream:features>".encode()
+
+    def authenticate(self, element):
+        """Usuario de un <auth> PLAIN ('\\0usuario\\0contraseña'); None si es inválido"""
+        if element.get("mechanism") != "PLAIN":
+            return None
+        try:
+            parts = base64.b64decode(element.text or "").decode().split("\0")
+        except ValueError:
+            return None
+        if len(parts) != 3 or not parts[1] or "@" in parts[1] or "/" in parts[1]:
+            return None
+        return parts[1]
+
+    def bind(self, element, user, writer):
+        resource = element.find(f"{{{BIND_NS}}}bind/{{{BIND_NS}}}resource")
+        if element.get("type") != "set" or resource is None:
+            return None
+        bare = f"{user}@{self.domain}"
+        jid = f"{bare}/{resource.text or 'nodo'}"
+        # Una sesión nueva del mismo nodo (reconexión) reemplaza a la anterior
+        previous = self.sessions.get(bare)
+        if previous is not None and previous is not writer:
+            previous.close()
+        self.sessions[bare] = writer
+        stanza_id = escape(element.get("id", ""), {"'": "&apos;"})
+        writer.write(f"<iq type='result' id='{stanza_id}'><bind xmlns='{BIND_NS}'><jid>{escape(jid)}</jid>"
+                     f"</bind></iq>".encode())
+        return bare
+
+    def route(self, element, from_bare):
+        to_jid = element.get("to", "")
+        target = self.sessions.get(bare_jid(to_jid))
+        try:
+            body = stanza_body(element)
+        except ValueError:
+            body = None
+        if body is None or target is None or target.is_closing():
+            self.dropped += 1
+            return
+        if target.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.dropped += 1
+            return
+        # Se rearma con el remitente autenticado: el cliente no elige su from
+        target.write(message_stanza(to_jid, body, from_bare))
+        self.routed += 1
@@ -0,0 +1,306 @@
+import json
+import struct
+import zlib
+
+# Codec binario del protocolo. Un cuerpo binario empieza con MAGIC y uno JSON
+# con '{', así el receptor distingue el formato de cada frame sin negociar nada.
+# Cabecera fija: magic, flags, ttl, from, to, tipo, proto. from/to son índices en
+# la tabla de nombres compartida (la topología ordenada); INLINE indica que el
+# nombre viene escrito a continuación. Después, en orden y solo si los flags lo
+# indican: nombre de from, nombre de to, id, extra (JSON de lo que no entra en
+# la cabecera) y el payload hasta el final del cuerpo.
+BINARY_CODEC = "bin1"
+MAGIC = 0xB1
+HEADER = struct.Struct("!BHhHHBB")
+TTL_OFFSET = 3
+TO_OFFSET = 7
+INLINE = 0xFFFF
+
+HAS_FROM = 0x001
+HAS_TO = 0x002
+HAS_TTL = 0x004
+ID_INTERNED = 0x008
+ID_STRING = 0x010
+HAS_EXTRA = 0x020
+PAYLOAD_TEXT = 0x040
+PAYLOAD_JSON = 0x080
+EMPTY_HEADERS = 0x100
+
+# Código 0: sin tipo/proto, o uno que no está en la tabla (va en extra)
+TYPES = (None, "message", "echo", "info", "hello", "lsa", "dv")
+PROTOS = (None, "flooding", "dijkstra", "lsr", "dvr")
+TYPE_CODES = {name: code for code, name in enumerate(TYPES) if name}
+PROTO_CODES = {name: code for code, name in enumerate(PROTOS) if name}
+
+# Lo que tiene que estar en la cabecera para reenviar un mensaje sin decodificarlo
+ROUTABLE = HAS_FROM | HAS_TO | HAS_TTL
+MESSAGE_TYPE = TYPE_CODES["message"]
+TTL_FIELD = struct.Struct("!h")
+
+SHORT = struct.Struct("!B")
+ID_COUNTER = struct.Struct("!HQ")
+EXTRA_LENGTH = struct.Struct("!I")
+STANDARD_KEYS = frozenset(("proto", "type", "id", "from", "to", "ttl", "headers", "payload"))
+
+
+class CodecError(ValueError):
+    """Cuerpo binario mal formado o de un codec que este nodo no tiene"""
+    pass
+
+
+def names_digest(names):
+    """Hash de la tabla de nombres: los dos extremos de un enlace tienen que tener la misma"""
+    return f"{zlib.crc32(chr(10).join(names).encode()):08x}"
+
+
+def topology_names(topology, addresses=None):
+    """Nombres de todos los nodos de la topología (y de names), ordenados"""
+    names = set(topology)
+    for neighbors in topology.values():
+        names.update(neighbors)
+    names.update(addresses or ())
+    return sorted(names)
+
+
+class BinaryCodec:
+    """
+    Codifica los mensajes del protocolo con cabecera fija. Es sin pérdida:
+    decode(encode(m)) == m para cualquier mensaje que se pueda mandar como JSON;
+    lo que no entra en la cabecera viaja en el campo extra.
+    La tabla puede venir ya armada (names indexable, index con get() que no
+    devuelve posiciones >= INLINE y su digest), p. ej. leída a demanda de la
+    topología compilada en lugar de decodificar todos los nombres.
+    """
+
+    def __init__(self, names, index=None, digest=None):
+        if index is None:
+            names = list(names)
+            index = {name: i for i, name in enumerate(names) if i < INLINE}
+        self.names = names
+        self.index = index
+        self.digest = digest or names_digest(names)
+
+    def offer(self):
+        """Header que va en los hellos para ofrecer el codec al vecino"""
+        return {"codec": BINARY_CODEC, "names": self.digest}
+
+    def accepts(self, headers):
+        """True si los headers de un hello ofrecen este mismo codec y tabla"""
+        for header in headers or ():
+            if (isinstance(header, dict) and header.get("codec") == BINARY_CODEC
+                    and header.get("names") == self.digest):
+                return True
+        return False
+
+    def _name(self, value, extra, key):
+        """(índice, nombre en línea) de from/to; None si tiene que ir en extra"""
+        i = self.index.get(value) if type(value) is str else None
+        if i is not None:
+            return i, b""
+        if not isinstance(value, str):
+            extra[key] = value
+            return None
+        encoded = value.encode("utf-8", "surrogatepass")
+        if len(encoded) > 255:
+            extra[key] = value
+            return None
+        return INLINE, SHORT.pack(len(encoded)) + encoded
+
+    def encode(self, message):
+        flags = 0
+        extra = {key: message[key] for key in message.keys() - STANDARD_KEYS}
+        tail = []
+
+        proto = message.get("proto")
+        proto_code = PROTO_CODES.get(proto, 0) if type(proto) is str else 0
+        if not proto_code and "proto" in message:
+            extra["proto"] = proto
+        message_type = message.get("type")
+        type_code = TYPE_CODES.get(message_type, 0) if type(message_type) is str else 0
+        if not type_code and "type" in message:
+            extra["type"] = message_type
+
+        ttl = message.get("ttl")
+        if type(ttl) is int and -32768 <= ttl <= 32767:
+            flags |= HAS_TTL
+        else:
+            if "ttl" in message:
+                extra["ttl"] = ttl
+            ttl = 0
+
+        from_index = to_index = 0
+        if "from" in message:
+            name = self._name(message["from"], extra, "from")
+            if name is not None:
+                flags |= HAS_FROM
+                from_index = name[0]
+                tail.append(name[1])
+        if "to" in message:
+            name = self._name(message["to"], extra, "to")
+            if name is not None:
+                flags |= HAS_TO
+                to_index = name[0]
+                tail.append(name[1])
+
+        if "id" in message:
+            id_flag, encoded = self._encode_id(message["id"], extra)
+            flags |= id_flag
+            tail.append(encoded)
+
+        if "headers" in message:
+            if message["headers"] == [] and type(message["headers"]) is list:
+                flags |= EMPTY_HEADERS
+            else:
+                extra["headers"] = message["headers"]
+
+        payload = b""
+        if "payload" in message:
+            value = message["payload"]
+            if isinstance(value, str):
+                try:
+                    payload = value.encode()
+                    flags |= PAYLOAD_TEXT
+                except UnicodeEncodeError:
+                    pass
+            if not flags & PAYLOAD_TEXT:
+                payload = json.dumps(value).encode()
+                flags |= PAYLOAD_JSON
+
+        if extra:
+            flags |= HAS_EXTRA
+            encoded = json.dumps(extra).encode()
+            tail.append(EXTRA_LENGTH.pack(len(encoded)) + encoded)
+
+        header = HEADER.pack(MAGIC, flags, ttl, from_index, to_index, type_code, proto_code)
+        return b"".join([header, *tail, payload])
+
+    def _encode_id(self, message_id, extra):
+        """'<origen>-<contador hex>' con el origen en la tabla va como índice + entero"""
+        if isinstance(message_id, str):
+            origin, _, counter = message_id.rpartition("-")
+            i = self.index.get(origin)
+            if i is not None and counter:
+                try:
+                    value = int(counter, 16)
+                except ValueError:
+                    value = None
+                # Solo si al volver a armarlo queda idéntico (sin ceros ni mayúsculas)
+                if value is not None and value < 1 << 64 and f"{value:x}" == counter:
+                    return ID_INTERNED, ID_COUNTER.pack(i, value)
+            encoded = message_id.encode("utf-8", "surrogatepass")
+            if len(encoded) <= 255:
+                return ID_STRING, SHORT.pack(len(encoded)) + encoded
+        extra["id"] = message_id
+        return 0, b""
+
+    def routing_header(self, body):
+        """
+        (from, to, ttl) de un mensaje de datos leyendo solo la cabecera fija;
+        None si no es binario, no es de tipo message, alguno de esos campos
+        no está en la cabecera o trae extra (headers como el flow id de ECMP):
+        entonces hay que decodificarlo completo.
+        """
+        if len(body) < HEADER.size:
+            return None
+        magic, flags, ttl, from_index, to_index, type_code, _ = HEADER.unpack_from(body)
+        if (magic != MAGIC or type_code != MESSAGE_TYPE or flags & ROUTABLE != ROUTABLE
+                or flags & HAS_EXTRA or from_index == INLINE or to_index == INLINE):
+            return None
+        names = self.names
+        if from_index >= len(names) or to_index >= len(names):
+            return None
+        return names[from_index], names[to_index], ttl
+
+    def message_id(self, body):
+        """id de un mensaje que pasó routing_header (el id va justo después de la cabecera)"""
+        flags = body[1] << 8 | body[2]
+        try:
+            if flags & ID_INTERNED:
+                origin, counter = ID_COUNTER.unpack_from(body, HEADER.size)
+                return f"{self.names[origin]}-{counter:x}"
+            if flags & ID_STRING:
+                return self._decode_string(body, HEADER.size)[0]
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise CodecError(f"Cuerpo binario mal formado: {e}")
+        return None
+
+    def decode(self, body):
+        try:
+            magic, flags, ttl, from_index, to_index, type_code, proto_code = HEADER.unpack_from(body)
+        except struct.error:
+            raise CodecError("Cuerpo binario más corto que la cabecera")
+        if magic != MAGIC:
+            raise CodecError(f"Codec binario desconocido: {magic:#x}")
+
+        try:
+            message = {}
+            if proto_code:
+                message["proto"] = PROTOS[proto_code]
+            if type_code:
+                message["type"] = TYPES[type_code]
+
+            position = HEADER.size
+            if flags & HAS_FROM:
+                message["from"], position = self._decode_name(body, from_index, position)
+            if flags & HAS_TO:
+                message["to"], position = self._decode_name(body, to_index, position)
+            if flags & ID_INTERNED:
+                origin, counter = ID_COUNTER.unpack_from(body, position)
+                message["id"] = f"{self.names[origin]}-{counter:x}"
+                position += ID_COUNTER.size
+            elif flags & ID_STRING:
+                message["id"], position = self._decode_string(body, position)
+            if flags & HAS_TTL:
+                message["ttl"] = ttl
+            if flags & EMPTY_HEADERS:
+                message["headers"] = []
+            if flags & HAS_EXTRA:
+                (length,) = EXTRA_LENGTH.unpack_from(body, position)
+                position += EXTRA_LENGTH.size
+                extra = json.loads(bytes(body[position:position + length]))
+                position += length
+            else:
+                extra = None
+
+            if flags & PAYLOAD_TEXT:
+                message["payload"] = bytes(body[position:]).decode()
+            elif flags & PAYLOAD_JSON:
+                message["payload"] = json.loads(bytes(body[position:]))
+        except (struct.error, IndexError, UnicodeDecodeError, ValueError) as e:
+            raise CodecError(f"Cuerpo binario mal formado: {e}")
+
+        if extra:
+            message.update(extra)
+        return message
+
+    def _decode_name(self, body, index, position):
+        if index != INLINE:
+            return self.names[index], position
+        return self._decode_string(body, position)
+
+    def _decode_string(self, body, position):
+        length = body[position]
+        start = position + 1
+        if start + length > len(body):
+            raise CodecError("Cadena cortada en el cuerpo binario")
+        return bytes(body[start:start + length]).decode("utf-8", "surrogatepass"), start + length
+
+
+def patch_ttl(body, ttl):
+    """Reescribe en su lugar el TTL de un cuerpo binario (bytearray o memoryview escribible)"""
+    TTL_FIELD.pack_into(body, TTL_OFFSET, ttl)
+
+
+def decode_body(body, codec=None):
+    """
+    Deserializa el cuerpo de un frame JSON o binario según su primer byte.
+    Acepta bytes o un memoryview sobre el frame recibido.
+    """
+    if body[:1] == b"{":
+        return json.loads(bytes(body))
+    if body and body[0] == MAGIC:
+        if codec is None:
+            raise CodecError("Llegó un frame binario pero este nodo no tiene codec binario")
+        return codec.decode(body)
+    # Cualquier otra cosa la decide el parser JSON (espacios al inicio, error)
+    return json.loads(bytes(body))
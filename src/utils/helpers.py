@@ -0,0 +1,99 @@
+import itertools
+import json
+import struct
+import time
+
+# Cada frame del stream TCP es: longitud del cuerpo (4 bytes, big-endian) + cuerpo
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+RECV_BUFFER_SIZE = 65536
+
+
+class FrameError(Exception):
+    """Error de protocolo en el stream (frame corrupto o demasiado grande)"""
+    pass
+
+
+def pack_frame(body):
+    """Antepone la longitud a un cuerpo ya serializado"""
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def encode_frame(message):
+    """Serializa un mensaje del protocolo como un frame listo para enviar"""
+    return pack_frame(json.dumps(message).encode())
+
+
+def decode_message(body):
+    """Deserializa el cuerpo de un frame"""
+    return json.loads(body)
+
+
+class FrameDecoder:
+    """
+    Acumula bytes de un stream y devuelve los frames completos que contiene.
+    Con with_header=True cada frame es un bytearray que incluye la longitud,
+    listo para reenviarlo (o parchearlo) sin armarlo de nuevo.
+    """
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE, with_header=False):
+        self.buffer = bytearray()
+        self.max_frame_size = max_frame_size
+        self.with_header = with_header
+
+    def feed(self, data):
+        self.buffer += data
+        frames = []
+        offset = 0
+        header_size = FRAME_HEADER.size
+
+        while len(self.buffer) - offset >= header_size:
+            (length,) = FRAME_HEADER.unpack_from(self.buffer, offset)
+            if length > self.max_frame_size:
+                raise FrameError(f"Frame de {length} bytes excede el máximo permitido")
+
+            end = offset + header_size + length
+            if end > len(self.buffer):
+                # Frame incompleto, esperar más datos
+                break
+
+            if self.with_header:
+                frames.append(self.buffer[offset:end])
+            else:
+                frames.append(bytes(self.buffer[offset + header_size:end]))
+            offset = end
+
+        if offset:
+            del self.buffer[:offset]
+        return frames
+
+
+
+_message_counter = itertools.count(time.time_ns() & 0xFFFFFFFFFFFF)
+
+
+def new_message_id(node_id):
+    """Genera un ID único para un mensaje originado en node_id"""
+    return f"{node_id}-{next(_message_counter):x}"
+
+
+# Línea que un worker de run_network escribe en stdout cuando cada nodo que
+# aloja acepta conexiones (o no pudo abrir su puerto)
+READY_PREFIX = "READY "
+FAILED_PREFIX = "FAILED "
+
+
+def ready_line(node_id, error=None):
+    if error is None:
+        return f"{READY_PREFIX}{node_id}"
+    return f"{FAILED_PREFIX}{node_id} {error}"
+
+
+def parse_ready_line(line):
+    """(nodo, error) de una línea de ready_line; None si es una línea cualquiera"""
+    if line.startswith(READY_PREFIX):
+        return line[len(READY_PREFIX):].strip(), None
+    if line.startswith(FAILED_PREFIX):
+        node_id, _, error = line[len(FAILED_PREFIX):].partition(" ")
+        return node_id, error or "error"
+    return None
@@ -0,0 +1,183 @@
+import os
+import re
+import threading
+from collections import deque
+
+# Un segmento se cierra al llegar a este tamaño y se guardan como mucho
+# MAX_SEGMENTS: el disco usado queda acotado y se pierde lo más viejo
+SEGMENT_SIZE = 4 * 1024 * 1024
+MAX_SEGMENTS = 8
+# Líneas que se guardan en memoria por nodo para mostrar la cola de su log
+RECENT_LINES = 200
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+
+# 'id': 'A-1f' / "to": "G" tal como aparecen los mensajes en las líneas de log
+MESSAGE_ID = re.compile(r"""['"]id['"]: ['"]([^'"]+)['"]""")
+DESTINATION = re.compile(r"""['"]to['"]: ['"]([^'"]+)['"]""")
+
+
+class Segment:
+    """Archivo de log con sus líneas indexadas por id de mensaje y por destino"""
+
+    def __init__(self, number, path):
+        self.number = number
+        self.path = path
+        self.size = 0
+        # valor -> offsets de las líneas dentro del archivo
+        self.by_id = {}
+        self.by_destination = {}
+
+    def index(self, offset, line):
+        match = MESSAGE_ID.search(line)
+        if not match:
+            # Sin id son hellos y logs de control: no se indexan
+            return
+        self.by_id.setdefault(match.group(1), []).append(offset)
+        match = DESTINATION.search(line)
+        if match:
+            self.by_destination.setdefault(match.group(1), []).append(offset)
+
+
+class LogStore:
+    """
+    Logs de toda la red con memoria y disco acotados: un ring buffer por nodo
+    con sus últimas líneas y segmentos rotativos en disco con todas. Cada
+    segmento lleva el índice de sus propias líneas, así al borrar el más viejo
+    su parte del índice se va con él. Cada línea se guarda como
+    '<nodo>\\t<línea>'. Se puede usar desde varios hilos.
+    """
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE, max_segments=MAX_SEGMENTS,
+                 recent_lines=RECENT_LINES, reset=False):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max(1, max_segments)
+        self.recent_lines = recent_lines
+        self.recent = {}
+        self.segments = deque()
+        self.file = None
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        if reset:
+            for number, path in self.segment_files():
+                os.remove(path)
+        else:
+            self.load()
+
+    def segment_files(self):
+        """(número, ruta) de los segmentos del directorio, del más viejo al más nuevo"""
+        files = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+                number = filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+                if number.isdigit():
+                    files.append((int(number), os.path.join(self.directory, filename)))
+        return sorted(files)
+
+    def load(self):
+        """Reconstruye índices y buffers a partir de los segmentos de una corrida anterior"""
+        for number, path in self.segment_files()[-self.max_segments:]:
+            segment = Segment(number, path)
+            with open(path, "rb") as f:
+                offset = 0
+                for raw in f:
+                    node_id, _, line = raw.decode("utf-8", "replace").rstrip("\n").partition("\t")
+                    segment.index(offset, line)
+                    self.remember(node_id, line)
+                    offset += len(raw)
+            segment.size = offset
+            self.segments.append(segment)
+
+    def remember(self, node_id, line):
+        buffer = self.recent.get(node_id)
+        if buffer is None:
+            buffer = self.recent[node_id] = deque(maxlen=self.recent_lines)
+        buffer.append(line)
+
+    def append(self, node_id, line):
+        encoded = f"{node_id}\t{line}\n".encode("utf-8", "replace")
+        with self.lock:
+            self.remember(node_id, line)
+            segment = self.writable_segment(len(encoded))
+            offset = segment.size
+            self.file.write(encoded)
+            segment.size += len(encoded)
+            segment.index(offset, line)
+
+    def writable_segment(self, size):
+        """Segmento actual, o uno nuevo si esta línea lo pasa del tamaño máximo"""
+        if self.segments and self.file is not None:
+            segment = self.segments[-1]
+            if segment.size == 0 or segment.size + size <= self.segment_size:
+                return segment
+
+        if self.file is not None:
+            self.file.close()
+        number = self.segments[-1].number + 1 if self.segments else 1
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+        segment = Segment(number, path)
+        self.file = open(path, "wb")
+        self.segments.append(segment)
+        while len(self.segments) > self.max_segments:
+            os.remove(self.segments.popleft().path)
+        return segment
+
+    def tail(self, node_id, lines=10):
+        """Últimas líneas de un nodo, desde memoria"""
+        with self.lock:
+            return list(self.recent.get(node_id, ()))[-lines:]
+
+    def trace(self, message_id):
+        """[(nodo, línea)] que mencionan el mensaje, en el orden en que llegaron"""
+        return self.read_indexed("by_id", message_id)
+
+    def to_destination(self, destination, limit=None):
+        """[(nodo, línea)] de mensajes hacia destination; con limit, solo las últimas"""
+        return self.read_indexed("by_destination", destination, limit)
+
+    def read_indexed(self, index_name, key, limit=None):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+            wanted = [(segment, getattr(segment, index_name).get(key)) for segment in self.segments]
+            wanted = [(segment, offsets) for segment, offsets in wanted if offsets]
+            if limit is not None:
+                wanted = self.last_offsets(wanted, limit)
+
+            result = []
+            for segment, offsets in wanted:
+                with open(segment.path, "rb") as f:
+                    for offset in offsets:
+                        f.seek(offset)
+                        node_id, _, line = f.readline().decode("utf-8", "replace").rstrip("\n").partition("\t")
+                        result.append((node_id, line))
+            return result
+
+    @staticmethod
+    def last_offsets(wanted, limit):
+        """Recorta [(segmento, offsets)] a los últimos `limit` offsets en total"""
+        trimmed = []
+        for segment, offsets in reversed(wanted):
+            if limit <= 0:
+                break
+            trimmed.append((segment, offsets[-limit:]))
+            limit -= len(trimmed[-1][1])
+        trimmed.reverse()
+        return trimmed
+
+    def stats(self):
+        with self.lock:
+            return {
+                "segments": len(self.segments),
+                "bytes": sum(segment.size for segment in self.segments),
+                "message_ids": sum(len(segment.by_id) for segment in self.segments),
+                "nodes": len(self.recent),
+            }
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
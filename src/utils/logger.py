@@ -1,7 +1,186 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
+# Registros pendientes de escribir; si la consola no da abasto se descartan en vez de bloquear
+LOG_QUEUE_SIZE = 10000
+# Por defecto cada tipo de evento del plano de datos se escribe como mucho esto por segundo
+DATA_LOG_RATE = 50.0
+
+_config = {
+    "mode": "queue",
+    "json_file": None,
+    "data_rate": DATA_LOG_RATE,
+    "data_sample": 1,
+}
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo que loguea (el mensaje %-style se
+    arma recién en el listener) y que descarta si la cola está llena.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Mismo proceso: el registro viaja sin combinar msg y args, salvo que
+        # algún argumento sea mutable (el mensaje sigue cambiando después)
+        if record.args and any(isinstance(arg, (dict, list, set)) for arg in record.args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limita eventos repetitivos: agrupa por plantilla del mensaje (msg sin
+    formatear) y deja pasar 1 de cada `sample` y como mucho `rate` por segundo.
+    El registro que pasa lleva en `suppressed` cuántos se omitieron antes.
+    """
+
+    def __init__(self, rate=None, sample=1, clock=time.monotonic):
+        super().__init__()
+        self.rate = rate
+        self.sample = max(1, sample)
+        self.clock = clock
+        self.state = {}
+        # Con el motor de hilos varias conexiones pasan por el mismo filtro
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        with self.lock:
+            return self._filter(record)
+
+    def _filter(self, record):
+        key = record.msg
+        state = self.state.get(key)
+        if state is None:
+            # [vistos, omitidos, tokens, último refill]
+            state = self.state[key] = [0, 0, self.rate or 0.0, self.clock()]
+        state[0] += 1
+
+        allowed = (state[0] - 1) % self.sample == 0
+        if allowed and self.rate:
+            now = self.clock()
+            state[2] = min(self.rate, state[2] + (now - state[3]) * self.rate)
+            state[3] = now
+            if state[2] >= 1:
+                state[2] -= 1
+            else:
+                allowed = False
+
+        if not allowed:
+            state[1] += 1
+            return False
+        record.suppressed = state[1]
+        state[1] = 0
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Una línea JSON por registro, para procesar los logs con herramientas"""
+
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _formatter():
+    # Formato para los mensajes de log (más visible)
+    return logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+
+
+def configure_logging(mode="queue", json_file=None, data_rate=DATA_LOG_RATE, data_sample=1):
+    """
+    Configura cómo escriben los loggers que se creen después:
+    - mode "queue": los handlers solo encolan y un hilo escribe consola/archivos
+    - mode "sync": StreamHandler directo en cada logger (comportamiento original)
+    - json_file: además escribe cada registro como una línea JSON
+    - data_rate / data_sample: límite por plantilla para los eventos del plano de datos
+    """
+    stop_logging()
+    _config.update(mode=mode, json_file=json_file, data_rate=data_rate, data_sample=data_sample)
+
+
+def _sink_handlers():
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(_formatter())
+    handlers = [console_handler]
+    if _config["json_file"]:
+        json_dir = os.path.dirname(_config["json_file"])
+        if json_dir and not os.path.exists(json_dir):
+            os.makedirs(json_dir, exist_ok=True)
+        json_handler = logging.FileHandler(_config["json_file"], encoding='utf-8')
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+    return handlers
+
+
+def _shared_handlers():
+    """Handlers que se agregan a cada logger según el modo"""
+    global _listener, _queue_handler
+    if _config["mode"] == "sync":
+        return _sink_handlers()
+
+    with _lock:
+        if _queue_handler is None:
+            log_queue = queue.Queue(LOG_QUEUE_SIZE)
+            _queue_handler = DroppingQueueHandler(log_queue)
+            _listener = logging.handlers.QueueListener(log_queue, *_sink_handlers())
+            _listener.start()
+    return [_queue_handler]
+
+
+def stop_logging():
+    """Vacía la cola y detiene el hilo escritor (se llama también al salir)"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _listener = None
+        _queue_handler = None
+
+
+atexit.register(stop_logging)
+
+
+def dropped_records():
+    return _queue_handler.dropped if _queue_handler else 0
+
+
 def setup_logger(name, log_file=None, level=logging.INFO):
     """
     Configura y devuelve un logger con el nombre especificado.
@@ -9,33 +188,38 @@ def setup_logger(name, log_file=None, level=logging.INFO):
     # Crear el logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Evitar que los mensajes se propaguen al logger raíz
     logger.propagate = False
-    
+
     # Limpiar handlers existentes
     if logger.handlers:
         logger.handlers = []
-    
-    # Formato para los mensajes de log (más visible)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    
-    # Handler para consola con colores (opcional)
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+
+    for handler in _shared_handlers():
+        logger.addHandler(handler)
+
     # Handler para archivo (si se especifica)
     if log_file:
         log_dir = os.path.dirname(log_file)
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir)
-        
+
         file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(_formatter())
         logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+
+    return logger
+
+
+def data_logger(logger):
+    """
+    Logger hijo para eventos por mensaje (recibido, forwardeado, entregado).
+    Escribe por los handlers del padre y con su nivel, pero con muestreo.
+    """
+    child = logging.getLogger(f"{logger.name}.data")
+    child.propagate = True
+    child.filters = []
+    if _config["data_rate"] or _config["data_sample"] > 1:
+        child.addFilter(SamplingFilter(_config["data_rate"], _config["data_sample"]))
+    return child
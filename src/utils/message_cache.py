@@ -0,0 +1,174 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_TTL = 120.0
+
+
+class DuplicateCache:
+    """
+    Cache de IDs de mensajes ya vistos, acotado en tamaño (LRU) y con
+    expiración por tiempo. Sirve para suprimir duplicados al inundar.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def check_and_add(self, key):
+        """Devuelve True si el ID ya se había visto; si no, lo registra"""
+        now = self.clock()
+        with self.lock:
+            self._expire(now)
+            if key in self.entries:
+                self.hits += 1
+                # Un duplicado que sigue llegando renueva su ventana
+                self.entries[key] = now
+                self.entries.move_to_end(key)
+                return True
+
+            self.misses += 1
+            self.entries[key] = now
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            return False
+
+    def add(self, key):
+        with self.lock:
+            self.entries[key] = self.clock()
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self.lock:
+            self._expire(self.clock())
+            return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _expire(self, now):
+        # Las entradas más viejas están al inicio del OrderedDict
+        deadline = now - self.ttl
+        while self.entries:
+            key, added_at = next(iter(self.entries.items()))
+            if added_at > deadline:
+                break
+            del self.entries[key]
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "mode": "lru",
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class BloomDuplicateCache:
+    """
+    Variante probabilística con memoria constante: varios filtros de Bloom que
+    rotan cada ttl / generations segundos (o al llenarse). Puede dar falsos
+    positivos con probabilidad ~false_positive_rate, nunca falsos negativos
+    dentro de la ventana de tiempo.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, false_positive_rate=0.001,
+                 generations=2, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.generations = generations
+        self.per_filter_capacity = max(1, max_entries // generations)
+        self.num_bits = max(8, int(-self.per_filter_capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.per_filter_capacity * math.log(2)))
+        self.filters = [bytearray((self.num_bits + 7) // 8) for _ in range(generations)]
+        self.current_count = 0
+        self.rotated_at = clock()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def _rotate_if_needed(self, now):
+        interval = self.ttl / self.generations
+        if now - self.rotated_at < interval and self.current_count < self.per_filter_capacity:
+            return
+        # Se descarta el filtro más viejo y se abre uno vacío
+        self.filters.pop()
+        self.filters.insert(0, bytearray((self.num_bits + 7) // 8))
+        self.current_count = 0
+        self.rotated_at = now
+        self.evictions += 1
+
+    def check_and_add(self, key):
+        positions = self._positions(key)
+        with self.lock:
+            self._rotate_if_needed(self.clock())
+            for bits in self.filters:
+                if all(bits[p >> 3] & (1 << (p & 7)) for p in positions):
+                    self.hits += 1
+                    return True
+
+            current = self.filters[0]
+            for p in positions:
+                current[p >> 3] |= 1 << (p & 7)
+            self.current_count += 1
+            self.misses += 1
+            return False
+
+    def add(self, key):
+        positions = self._positions(key)
+        with self.lock:
+            self._rotate_if_needed(self.clock())
+            current = self.filters[0]
+            for p in positions:
+                current[p >> 3] |= 1 << (p & 7)
+            self.current_count += 1
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        with self.lock:
+            return any(all(bits[p >> 3] & (1 << (p & 7)) for p in positions) for bits in self.filters)
+
+    def __len__(self):
+        return self.current_count
+
+    def stats(self):
+        return {
+            "mode": "bloom",
+            "size": self.current_count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": len(self.filters[0]) * self.generations,
+        }
+
+
+def make_duplicate_cache(mode="lru", **kwargs):
+    """Crea el cache de duplicados según el modo ('lru' o 'bloom')"""
+    if mode == "bloom":
+        return BloomDuplicateCache(**kwargs)
+    if mode == "lru":
+        return DuplicateCache(**kwargs)
+    raise ValueError(f"Modo de cache de duplicados desconocido: {mode}")
@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import bisect
+import threading
+
+# Límites superiores de los buckets de los histogramas de tiempo, en segundos
+# (de 10 µs a 10 s, cuatro buckets por década); lo que pase de 10 s va al último
+LATENCY_BUCKETS = tuple(round(10 ** (e / 4), 9) for e in range(-20, 5))
+METRICS_INTERVAL = 5.0
+
+
+class Histogram:
+    """Histograma de buckets fijos: observar es O(log buckets) y se combina sumando conteos"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        return {
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+        }
+
+
+def percentile(snapshot, q):
+    """Percentil aproximado (límite superior del bucket) de un snapshot de Histogram"""
+    if not snapshot["count"]:
+        return None
+    rank = q * snapshot["count"]
+    seen = 0
+    for bound, count in zip(snapshot["bounds"], snapshot["counts"]):
+        seen += count
+        if seen >= rank:
+            return min(bound, snapshot["max"])
+    return snapshot["max"]
+
+
+def merge_histograms(snapshots):
+    """Suma snapshots de histogramas con los mismos buckets"""
+    merged = None
+    for snapshot in snapshots:
+        if merged is None:
+            merged = {key: (list(value) if isinstance(value, list) else value)
+                      for key, value in snapshot.items()}
+            continue
+        merged["counts"] = [a + b for a, b in zip(merged["counts"], snapshot["counts"])]
+        merged["count"] += snapshot["count"]
+        merged["sum"] += snapshot["sum"]
+        merged["max"] = max(merged["max"], snapshot["max"])
+    return merged
+
+
+class Metrics:
+    """
+    Contadores e histogramas de un nodo. Los contadores pueden llevar una
+    etiqueta (el vecino); los gauges son funciones que se evalúan recién al
+    tomar el snapshot, así no cuestan nada en el camino de los mensajes.
+    """
+
+    def __init__(self, node_id, clock=time.monotonic):
+        self.node_id = node_id
+        self.clock = clock
+        self.started = clock()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1, label=None):
+        key = (name, label)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    def gauge(self, name, function):
+        """Registra una función que devuelve un número o un {etiqueta: número}"""
+        self.gauges[name] = function
+
+    def get(self, name, label=None):
+        return self.counters.get((name, label), 0)
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {name: h.snapshot() for name, h in self.histograms.items()}
+
+        totals = {}
+        per_neighbor = {}
+        for (name, label), value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+            if label is not None:
+                per_neighbor.setdefault(name, {})[label] = value
+
+        gauges = {}
+        for name, function in self.gauges.items():
+            try:
+                gauges[name] = function()
+            except Exception:
+                # Un gauge roto no debe impedir el resto del snapshot
+                gauges[name] = None
+
+        return {
+            "node": self.node_id,
+            "timestamp": time.time(),
+            "uptime": self.clock() - self.started,
+            "counters": totals,
+            "per_neighbor": per_neighbor,
+            "histograms": histograms,
+            "gauges": gauges,
+        }
+
+    def write_snapshot(self, path):
+        """Escribe el snapshot como JSON reemplazando el archivo de una vez"""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temp_path, path)
+
+
+def load_snapshots(directory):
+    """Lee los snapshots <nodo>.json de un directorio"""
+    snapshots = {}
+    if not os.path.isdir(directory):
+        return snapshots
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        snapshots[snapshot.get("node", filename[:-5])] = snapshot
+    return snapshots
+
+
+def aggregate(snapshots):
+    """Totales de la red y por nodo a partir de los snapshots de cada nodo"""
+    rows = []
+    totals = {}
+    histograms = {}
+    for node_id, snapshot in sorted(snapshots.items()):
+        counters = snapshot["counters"]
+        uptime = snapshot["uptime"] or 1.0
+        latency = snapshot["histograms"].get("forward_latency")
+        rows.append({
+            "node": node_id,
+            "messages_in": counters.get("messages_in", 0),
+            "messages_out": counters.get("messages_out", 0),
+            "bytes_in": counters.get("bytes_in", 0),
+            "bytes_out": counters.get("bytes_out", 0),
+            "out_per_sec": counters.get("messages_out", 0) / uptime,
+            "duplicates": counters.get("duplicates_dropped", 0),
+            "ttl_expired": counters.get("ttl_expired", 0),
+            "send_drops": counters.get("send_drops", 0),
+            "reconnects": counters.get("reconnects", 0),
+            "forward_p50": percentile(latency, 0.5) if latency else None,
+            "forward_p99": percentile(latency, 0.99) if latency else None,
+        })
+        for name, value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+        for name, histogram in snapshot["histograms"].items():
+            histograms.setdefault(name, []).append(histogram)
+
+    merged = {name: merge_histograms(group) for name, group in histograms.items()}
+    latencies = {
+        name: {
+            "count": histogram["count"],
+            "p50": percentile(histogram, 0.5),
+            "p99": percentile(histogram, 0.99),
+            "max": histogram["max"],
+        }
+        for name, histogram in merged.items()
+    }
+    return {"nodes": rows, "totals": totals, "latencies": latencies}
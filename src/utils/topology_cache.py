@@ -0,0 +1,303 @@
+import os
+import sys
+import mmap
+import struct
+from array import array
+from src.utils.config_loader import load_config
+from src.network.routing import Graph
+from src.utils.codec import names_digest, INLINE
+
+# Topología compilada: cabecera + secciones de enteros de 8 bytes + blobs UTF-8.
+# Secciones, en orden: name_offsets (n+1), sorted_names (n), address_offsets (n+1),
+# offsets (n+1), targets (m), weights (m), blob de nombres, blob de direcciones.
+# Los nodos de la red la abren con mmap y solo leen las entradas que usan.
+MAGIC = b"TOPC"
+FORMAT_VERSION = 2
+# magic, versión, tipo de pesos ('q'/'d'), little endian, nodos, aristas,
+# mtime_ns y tamaño de los JSON de topología y de nombres, digest de la tabla
+# de nombres del codec binario y costo máximo de un enlace
+HEADER = struct.Struct("<4sHcBqqqqqqId")
+WORD = 8
+
+
+class TopologyCacheError(Exception):
+    """Archivo compilado inválido, de otra versión o de otra arquitectura"""
+    pass
+
+
+def compiled_path(topo_path):
+    """Ruta por defecto del archivo compilado junto al JSON de topología"""
+    return os.path.splitext(topo_path)[0] + ".bin"
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _blob(strings):
+    offsets = array('q', [0])
+    data = bytearray()
+    for value in strings:
+        data += value
+        offsets.append(len(data))
+    return offsets, bytes(data)
+
+
+def _padded(data):
+    return data + b"\0" * (-len(data) % WORD)
+
+
+def compile_topology(topo_path, names_path, output_path=None):
+    """Compila los JSON de topología y nombres a un archivo binario mapeable"""
+    output_path = output_path or compiled_path(topo_path)
+    topo_config = load_config(topo_path)
+    addresses = load_config(names_path)['config']
+
+    graph = Graph.from_topology(topo_config['config'])
+    names = list(graph.names)
+    # Nodos con dirección pero sin enlaces en la topología quedan aislados
+    names += [name for name in addresses if name not in graph.index]
+    edge_count = len(graph.targets)
+    offsets = array('q', graph.offsets)
+    offsets.extend([edge_count] * (len(names) + 1 - len(offsets)))
+
+    encoded = [name.encode() for name in names]
+    name_offsets, name_blob = _blob(encoded)
+    address_offsets, address_blob = _blob(addresses.get(name, "").encode() for name in names)
+    # Índices ordenados por nombre para buscar un nodo con búsqueda binaria
+    sorted_names = array('q', sorted(range(len(names)), key=encoded.__getitem__))
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, graph.weights.typecode.encode(), sys.byteorder == "little",
+        len(names), edge_count, *_source_stamp(topo_path), *_source_stamp(names_path),
+        int(names_digest(sorted(names)), 16), max(graph.weights, default=1))
+    sections = [
+        name_offsets, sorted_names, address_offsets, offsets,
+        array('q', graph.targets), graph.weights,
+    ]
+
+    # Se escribe aparte y se reemplaza: los nodos que ya mapearon el anterior no lo ven cambiar
+    temp_path = f"{output_path}.tmp-{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            f.write(section.tobytes())
+        f.write(_padded(name_blob))
+        f.write(address_blob)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+class CompiledTopology:
+    """
+    Vista de solo lectura sobre un archivo compilado con compile_topology.
+    Abrirlo y consultar un nodo cuesta lo mismo sin importar el tamaño del
+    grafo; graph() arma el Graph completo para la SPF sobre las mismas páginas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise TopologyCacheError(f"{path} está vacío")
+
+        if len(self.map) < HEADER.size:
+            raise TopologyCacheError(f"{path} es demasiado corto")
+        (magic, version, weight_code, little_endian, self.node_count, self.edge_count,
+         *stamps, digest, max_weight) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise TopologyCacheError(f"{path} no es una topología compilada versión {FORMAT_VERSION}")
+        if bool(little_endian) != (sys.byteorder == "little"):
+            raise TopologyCacheError(f"{path} fue compilado en otra arquitectura")
+        self.topo_stamp = tuple(stamps[:2])
+        self.names_stamp = tuple(stamps[2:])
+        self.names_digest = f"{digest:08x}"
+        self.max_cost = int(max_weight) if weight_code == b"q" else max_weight
+
+        view = memoryview(self.map)
+        position = HEADER.size
+        n, m = self.node_count, self.edge_count
+
+        def section(count, typecode='q'):
+            nonlocal position
+            data = view[position:position + count * WORD].cast(typecode)
+            position += count * WORD
+            return data
+
+        self.name_offsets = section(n + 1)
+        self.sorted_names = section(n)
+        self.address_offsets = section(n + 1)
+        self.offsets = section(n + 1)
+        self.targets = section(m)
+        self.weights = section(m, weight_code.decode())
+        names_size = self.name_offsets[n]
+        self.name_blob = view[position:position + names_size]
+        position += names_size + (-names_size % WORD)
+        self.address_blob = view[position:position + self.address_offsets[n]]
+
+    def __len__(self):
+        return self.node_count
+
+    def __contains__(self, node_id):
+        return self.find(node_id) >= 0
+
+    def is_fresh(self, topo_path, names_path):
+        """True si los JSON fuente no cambiaron desde la compilación"""
+        try:
+            return (_source_stamp(topo_path) == self.topo_stamp
+                    and _source_stamp(names_path) == self.names_stamp)
+        except OSError:
+            return False
+
+    def _name_bytes(self, i):
+        return bytes(self.name_blob[self.name_offsets[i]:self.name_offsets[i + 1]])
+
+    def name(self, i):
+        return self._name_bytes(i).decode()
+
+    def sorted_names_list(self):
+        """Todos los nombres ordenados (el orden de bytes UTF-8 es el de str)"""
+        return [self.name(i) for i in self.sorted_names]
+
+    def sorted_position(self, node_id):
+        """Posición del nodo en el orden por nombre, por búsqueda binaria; -1 si no existe"""
+        key = node_id.encode()
+        low, high = 0, self.node_count
+        while low < high:
+            middle = (low + high) // 2
+            current = self._name_bytes(self.sorted_names[middle])
+            if current == key:
+                return middle
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return -1
+
+    def find(self, node_id):
+        """Índice del nodo por búsqueda binaria, -1 si no existe"""
+        position = self.sorted_position(node_id)
+        return self.sorted_names[position] if position >= 0 else -1
+
+    def neighbors(self, node_id):
+        """Devuelve {vecino: costo} de un nodo, como get_neighbors"""
+        i = self.find(node_id)
+        if i < 0:
+            return {}
+        return {
+            self.name(self.targets[k]): self.weights[k]
+            for k in range(self.offsets[i], self.offsets[i + 1])
+        }
+
+    def address(self, node_id):
+        i = self.find(node_id)
+        if i < 0:
+            return None
+        address = bytes(self.address_blob[self.address_offsets[i]:self.address_offsets[i + 1]])
+        return address.decode() or None
+
+    def addresses_for(self, node_ids):
+        """{nodo: 'host:puerto'} solo de los nodos pedidos que tienen dirección"""
+        result = {}
+        for node_id in node_ids:
+            address = self.address(node_id)
+            if address is not None:
+                result[node_id] = address
+        return result
+
+    def graph(self):
+        """
+        Graph para la SPF sobre el archivo mapeado: la adyacencia son las
+        secciones CSR y los nombres se decodifican solo cuando se usan.
+        """
+        return Graph(MappedNames(self.name, self.node_count), self.offsets, self.targets, self.weights,
+                     MappedIndex(self.find))
+
+    def codec_names(self):
+        """(names, index, digest) del codec binario sin decodificar toda la tabla"""
+        names = MappedNames(lambda position: self.name(self.sorted_names[position]), self.node_count)
+        return names, MappedIndex(self.sorted_position, limit=INLINE), self.names_digest
+
+    def close(self):
+        for attribute in ('name_offsets', 'sorted_names', 'address_offsets',
+                          'offsets', 'targets', 'weights', 'name_blob', 'address_blob'):
+            getattr(self, attribute).release()
+        self.map.close()
+
+
+class MappedNames:
+    """Secuencia de nombres que se decodifican del archivo al pedirlos (y se recuerdan)"""
+
+    def __init__(self, decode, size):
+        self.decode = decode
+        self.size = size
+        self.cache = {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        name = self.cache.get(i)
+        if name is None:
+            if not 0 <= i < self.size:
+                raise IndexError(i)
+            name = self.cache[i] = self.decode(i)
+        return name
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self[i]
+
+
+class MappedIndex:
+    """Nombre -> índice buscando en el archivo (búsqueda binaria), con los resultados recordados"""
+
+    def __init__(self, search, limit=None):
+        self.search = search
+        self.limit = limit
+        self.cache = {}
+
+    def get(self, name, default=None):
+        i = self.cache.get(name)
+        if i is None:
+            i = self.search(name) if isinstance(name, str) else -1
+            if i < 0 or (self.limit is not None and i >= self.limit):
+                return default
+            self.cache[name] = i
+        return i
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __getitem__(self, name):
+        i = self.get(name)
+        if i is None:
+            raise KeyError(name)
+        return i
+
+
+def open_compiled_topology(topo_path, names_path, path=None):
+    """La topología compilada si existe y está al día con los JSON, si no None"""
+    path = path or compiled_path(topo_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        compiled = CompiledTopology(path)
+    except (OSError, TopologyCacheError):
+        return None
+    if not compiled.is_fresh(topo_path, names_path):
+        return None
+    return compiled
+
+
+def ensure_compiled(topo_path, names_path, path=None):
+    """Compila solo si falta el archivo o quedó viejo; devuelve (ruta, si se compiló)"""
+    path = path or compiled_path(topo_path)
+    compiled = open_compiled_topology(topo_path, names_path, path)
+    if compiled is not None:
+        compiled.close()
+        return path, False
+    return compile_topology(topo_path, names_path, path), True
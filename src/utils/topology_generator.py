@@ -0,0 +1,104 @@
+import random
+
+BASE_PORT = 10000
+
+
+def node_names(size):
+    """Nombres N0..N{size-1} para topologías generadas"""
+    return [f"N{i}" for i in range(size)]
+
+
+def _connect(config, a, b, cost):
+    config[a][b] = cost
+    config[b][a] = cost
+
+
+def ring_topology(size, cost=1):
+    names = node_names(size)
+    config = {name: {} for name in names}
+    for i in range(size):
+        if size > 1:
+            _connect(config, names[i], names[(i + 1) % size], cost)
+    return {"type": "topo", "config": config}
+
+
+def grid_topology(rows, columns=None, max_cost=1, seed=None):
+    columns = columns or rows
+    rng = random.Random(seed)
+    names = node_names(rows * columns)
+    config = {name: {} for name in names}
+    for r in range(rows):
+        for c in range(columns):
+            i = r * columns + c
+            if c + 1 < columns:
+                _connect(config, names[i], names[i + 1], rng.randint(1, max_cost))
+            if r + 1 < rows:
+                _connect(config, names[i], names[i + columns], rng.randint(1, max_cost))
+    return {"type": "topo", "config": config}
+
+
+def random_topology(size, average_degree=4, max_cost=10, seed=None):
+    """Grafo aleatorio conexo: un árbol aleatorio más aristas extra hasta el grado medio pedido"""
+    rng = random.Random(seed)
+    names = node_names(size)
+    config = {name: {} for name in names}
+    for i in range(1, size):
+        _connect(config, names[i], names[rng.randrange(i)], rng.randint(1, max_cost))
+
+    target_edges = max(size - 1, size * average_degree // 2)
+    edges = size - 1
+    attempts = 0
+    while edges < target_edges and attempts < target_edges * 10:
+        attempts += 1
+        a, b = rng.randrange(size), rng.randrange(size)
+        if a == b or names[b] in config[names[a]]:
+            continue
+        _connect(config, names[a], names[b], rng.randint(1, max_cost))
+        edges += 1
+    return {"type": "topo", "config": config}
+
+
+def scale_free_topology(size, links_per_node=2, max_cost=10, seed=None):
+    """Modelo Barabási-Albert: cada nodo nuevo se une a m nodos con probabilidad proporcional al grado"""
+    rng = random.Random(seed)
+    names = node_names(size)
+    config = {name: {} for name in names}
+    m = max(1, min(links_per_node, size - 1))
+    # Cada aparición en esta lista es un extremo de arista: elegir de ella sesga por grado
+    endpoints = []
+    for i in range(1, m + 1 if size > 1 else 1):
+        _connect(config, names[i], names[0], rng.randint(1, max_cost))
+        endpoints += [i, 0]
+    for i in range(m + 1, size):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(endpoints))
+        for j in targets:
+            _connect(config, names[i], names[j], rng.randint(1, max_cost))
+            endpoints += [i, j]
+    return {"type": "topo", "config": config}
+
+
+TOPOLOGY_KINDS = ['ring', 'grid', 'random', 'scale-free']
+
+
+def generate_topology(kind, size, seed=None):
+    """Genera una topología de aproximadamente `size` nodos (la grilla redondea a un cuadrado)"""
+    if kind == 'ring':
+        return ring_topology(size)
+    if kind == 'grid':
+        side = max(1, round(size ** 0.5))
+        return grid_topology(side, max_cost=10, seed=seed)
+    if kind == 'random':
+        return random_topology(size, seed=seed)
+    if kind == 'scale-free':
+        return scale_free_topology(size, seed=seed)
+    raise ValueError(f"Tipo de topología desconocido: {kind}")
+
+
+def names_config(topo_config, host="localhost", base_port=BASE_PORT):
+    """Archivo de nombres en el formato de names-ejemplo.json para una topología"""
+    return {
+        "type": "names",
+        "config": {name: f"{host}:{base_port + i}" for i, name in enumerate(topo_config["config"])}
+    }
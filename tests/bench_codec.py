@@ -0,0 +1,60 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.codec import BinaryCodec, topology_names
+from src.utils.helpers import new_message_id
+from src.utils.topology_generator import grid_topology
+
+
+def sample_messages(names):
+    """Mensajes típicos del protocolo: datos, vector de distancias y LSA"""
+    return {
+        "message": {"proto": "lsr", "type": "message", "id": new_message_id(names[0]),
+                    "from": names[0], "to": names[-1], "ttl": 10, "headers": [],
+                    "payload": "mensaje de prueba"},
+        "dv": {"proto": "dvr", "type": "dv", "from": names[0], "to": names[1], "ttl": 1,
+               "headers": [], "payload": {name: i for i, name in enumerate(names[:20])}},
+        "lsa": {"proto": "lsr", "type": "lsa", "from": names[0], "seq": 12,
+                "neighbors": {name: 1 for name in names[1:5]}, "timestamp": int(time.time()),
+                "id": f"{names[0]}-12"},
+    }
+
+
+def per_second(function, argument, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(argument)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara el codec JSON con el binario: tamaño y velocidad')
+    parser.add_argument('--grid', type=int, default=30, help='Tabla de nombres de una grilla de N x N nodos')
+    parser.add_argument('--iterations', type=int, default=100000, help='Repeticiones por medición')
+    args = parser.parse_args()
+
+    codec = BinaryCodec(topology_names(grid_topology(args.grid)['config']))
+    json_encode = lambda message: json.dumps(message).encode()
+
+    print(f"{'mensaje':>8} {'bytes json':>11} {'bytes bin':>10} {'enc json/s':>12} {'enc bin/s':>12} "
+          f"{'dec json/s':>12} {'dec bin/s':>12}")
+    for name, message in sample_messages(codec.names).items():
+        json_body = json_encode(message)
+        binary_body = codec.encode(message)
+        assert codec.decode(binary_body) == json.loads(json_body)
+        print(f"{name:>8} {len(json_body):>11} {len(binary_body):>10} "
+              f"{per_second(json_encode, message, args.iterations):>12.0f} "
+              f"{per_second(codec.encode, message, args.iterations):>12.0f} "
+              f"{per_second(json.loads, json_body, args.iterations):>12.0f} "
+              f"{per_second(codec.decode, binary_body, args.iterations):>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.log_store import LogStore
+from src.utils.topology_generator import node_names
+
+
+def log_line(node_id, message_id, destination):
+    return (f"12:00:00 - {node_id}.data - INFO - Mensaje recibido: {{'proto': 'lsr', 'type': 'message', "
+            f"'from': 'N0', 'to': '{destination}', 'id': '{message_id}', 'ttl': 10, 'headers': [], "
+            f"'payload': 'mensaje de prueba'}}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Escritura y consultas del LogStore de run_network')
+    parser.add_argument('--nodes', type=int, default=100, help='Nodos que escriben')
+    parser.add_argument('--messages', type=int, default=50000, help='Mensajes distintos')
+    parser.add_argument('--hops', type=int, default=8, help='Líneas por mensaje (nodos del recorrido)')
+    parser.add_argument('--segment-mb', type=float, default=4, help='Tamaño de cada segmento en MB')
+    parser.add_argument('--segments', type=int, default=8, help='Segmentos que se conservan')
+    args = parser.parse_args()
+
+    names = node_names(args.nodes)
+    directory = tempfile.mkdtemp(prefix='log_store_')
+    try:
+        store = LogStore(directory, segment_size=int(args.segment_mb * 1024 * 1024),
+                         max_segments=args.segments, reset=True)
+        start = time.perf_counter()
+        for i in range(args.messages):
+            message_id = f"N0-{i:x}"
+            destination = names[i % len(names)]
+            for hop in range(args.hops):
+                node_id = names[(i + hop) % len(names)]
+                store.append(node_id, log_line(node_id, message_id, destination))
+        elapsed = time.perf_counter() - start
+        lines = args.messages * args.hops
+        stats = store.stats()
+        print(f"{lines} líneas en {elapsed:.2f} s ({lines / elapsed:.0f} líneas/s); "
+              f"{stats['segments']} segmentos, {stats['bytes'] / 1024 / 1024:.1f} MB en disco")
+
+        # Un mensaje reciente (sigue en disco) y uno de los primeros (ya rotó)
+        for message_id in (f"N0-{args.messages - 1:x}", "N0-0"):
+            start = time.perf_counter()
+            entries = store.trace(message_id)
+            print(f"trace {message_id}: {len(entries)} líneas en {(time.perf_counter() - start) * 1e3:.3f} ms")
+        start = time.perf_counter()
+        entries = store.to_destination(names[-1], 100)
+        print(f"destino {names[-1]}: {len(entries)} líneas en {(time.perf_counter() - start) * 1e3:.3f} ms")
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import logging
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.algorithms.link_state import LinkStateRouter
+from src.utils.topology_generator import ring_topology
+from tests.bench_node import BenchNode
+
+
+def bench_forwarding(size, messages):
+    topology = ring_topology(size)['config']
+    router = LinkStateRouter()
+    router.logger.setLevel(logging.WARNING)
+    node = BenchNode("N0", topology["N0"])
+    router.set_node(node)
+    router.topology = topology
+
+    # La primera SPF se mide aparte: el forwarding ya no debería pagarla
+    start = time.perf_counter()
+    router.calculate_routes()
+    spf_time = time.perf_counter() - start
+
+    destination = f"N{size // 2}"
+    message = {"type": "message", "from": "N0", "to": destination, "ttl": 10, "payload": "x"}
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        router.handle_forwarding(message)
+    elapsed = time.perf_counter() - start
+
+    return spf_time, messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput de forwarding de LinkStateRouter según tamaño de la red')
+    parser.add_argument('--sizes', default='10,100,1000,5000',
+                        help='Tamaños de anillo separados por coma')
+    parser.add_argument('--messages', type=int, default=50000,
+                        help='Mensajes forwardeados por tamaño')
+    args = parser.parse_args()
+
+    print(f"{'nodos':>8} {'spf (ms)':>10} {'forward ops/s':>15}")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        spf_time, ops = bench_forwarding(size, args.messages)
+        print(f"{size:>8} {spf_time * 1000:>10.2f} {ops:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import time
+import random
+import logging
+from src.utils.metrics import Metrics
+
+
+class BenchNode:
+    """
+    Nodo mínimo sin sockets para medir un algoritmo aislado: solo cuenta los
+    mensajes que le piden enviar. Lo comparten los benchmarks de forwarding.
+    """
+
+    def __init__(self, node_id, neighbors):
+        self.node_id = node_id
+        self.neighbors = neighbors
+        self.logger = logging.getLogger(f"bench-{node_id}")
+        self.logger.setLevel(logging.WARNING)
+        self.data_logger = self.logger
+        self.metrics = Metrics(node_id)
+        self.random = random.Random(0)
+        self.sent = 0
+
+    def now(self):
+        return time.monotonic()
+
+    def call_later(self, delay, callback, *args):
+        return None
+
+    def send_message(self, message, neighbor_id):
+        self.sent += 1
+        return True
+
+    def deliver_local(self, message):
+        pass
+
+    def flood_message(self, message, exclude_neighbor=None):
+        sent = len(self.neighbors) - (exclude_neighbor in self.neighbors)
+        self.sent += sent
+        return sent
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import logging
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.network.node import Node
+from src.algorithms.dijkstra import Dijkstra
+from src.utils.codec import BinaryCodec, topology_names
+from src.utils.helpers import encode_frame, pack_frame, new_message_id
+
+# A - B - C: se mide B reenviando a C lo que llega de A
+TOPOLOGY = {"A": {"B": 1}, "B": {"A": 1, "C": 1}, "C": {"B": 1}}
+
+
+class NullWriter:
+    """Escritor que descarta los frames: se mide solo el trabajo del nodo"""
+
+    def enqueue(self, frame):
+        return True
+
+    def queue_depth(self):
+        return 0
+
+
+def transit_node(codec, fast_path):
+    algorithm = Dijkstra()
+    algorithm.topology = TOPOLOGY
+    node = Node("B", TOPOLOGY["B"], "localhost", 0, algorithm)
+    node.logger.setLevel(logging.WARNING)
+    algorithm.logger.setLevel(logging.WARNING)
+    algorithm.calculate_routes()
+    node.writers["C"] = NullWriter()
+    node.codec = codec
+    if codec is not None:
+        node.binary_peers.add("C")
+    if not fast_path:
+        node.transit_forward = None
+    return node
+
+
+def bench(node, frame, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # FrameDecoder entrega un bytearray nuevo por frame
+        node.handle_frame(bytearray(frame), "A")
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Costo de reenviar un mensaje de tránsito según el tamaño del payload')
+    parser.add_argument('--sizes', default='16,1024,16384,262144',
+                        help='Tamaños de payload en bytes separados por coma')
+    parser.add_argument('--iterations', type=int, default=20000, help='Mensajes por medición')
+    args = parser.parse_args()
+
+    codec = BinaryCodec(topology_names(TOPOLOGY))
+    cases = [
+        ("json", None, False),
+        ("binario", codec, False),
+        ("binario rápido", codec, True),
+    ]
+
+    print(f"{'payload':>9} " + " ".join(f"{name + ' (us)':>20}" for name, _, _ in cases))
+    for size in [int(s) for s in args.sizes.split(',')]:
+        message = {"proto": "dijkstra", "type": "message", "id": new_message_id("A"), "from": "A",
+                   "to": "C", "ttl": 10, "headers": [], "payload": "x" * size}
+        results = []
+        for name, case_codec, fast_path in cases:
+            node = transit_node(case_codec, fast_path)
+            frame = pack_frame(case_codec.encode(message)) if case_codec else encode_frame(message)
+            results.append(bench(node, frame, args.iterations) * 1e6)
+        print(f"{size:>9} " + " ".join(f"{value:>20.2f}" for value in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import sys
+import os
+import time
+import socket
+import logging
+import argparse
+import threading
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.network.node import Node
+from src.utils.helpers import encode_frame
+from src.transport.socket_client import ConnectionPool
+from src.transport.xmpp_server import LocalXmppServer
+
+
+class Recorder:
+    """Algoritmo que solo anota cuánto tardó en llegar cada mensaje"""
+
+    def __init__(self):
+        self.latencies = []
+        self.last_arrival = None
+        self.arrived = threading.Condition()
+
+    def set_node(self, node):
+        self.node = node
+
+    def start(self):
+        pass
+
+    def handle_message(self, message):
+        now = time.perf_counter()
+        with self.arrived:
+            self.latencies.append(now - message["payload"]["sent"])
+            self.last_arrival = now
+            self.arrived.notify_all()
+
+    def wait_for(self, count, timeout):
+        with self.arrived:
+            return self.arrived.wait_for(lambda: len(self.latencies) >= count, timeout)
+
+
+def control_message(sequence):
+    # 'info' es tráfico de control: con transport 'udp' va por datagramas
+    return {"proto": "lsr", "type": "info", "from": "A", "to": "B", "ttl": 1, "headers": [],
+            "payload": {"sent": time.perf_counter(), "seq": sequence}}
+
+
+def node_pair(transport, port, xmpp_server=None):
+    addresses = {"A": f"localhost:{port}", "B": f"localhost:{port + 1}"}
+    nodes = []
+    for node_id, neighbor_id, node_port in (("A", "B", port), ("B", "A", port + 1)):
+        node = Node(node_id, {neighbor_id: 1}, "localhost", node_port, Recorder())
+        # Los descartes por cola llena salen en la columna de perdidos
+        node.logger.setLevel(logging.ERROR)
+        node.data_logger.setLevel(logging.WARNING)
+        node.transport = transport
+        if xmpp_server:
+            node.xmpp_server = xmpp_server
+        node.launch(addresses)
+        nodes.append(node)
+    deadline = time.monotonic() + 10
+    while not ("B" in nodes[0].writers and "A" in nodes[1].writers) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return nodes
+
+
+def run_case(send, recorder, count, timeout=10.0):
+    """(mensajes/s en ráfaga, perdidos, latencias de mensajes de a uno)"""
+    recorder.latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        send(control_message(i))
+    recorder.wait_for(count, timeout)
+    # Hasta el último que llegó: con datagramas perdidos no se cuenta la espera
+    received = len(recorder.latencies)
+    elapsed = (recorder.last_arrival or time.perf_counter()) - start
+
+    # Latencia sin cola: un mensaje a la vez, esperando que llegue
+    latencies = []
+    for i in range(min(count, 500)):
+        recorder.latencies = []
+        send(control_message(i))
+        if recorder.wait_for(1, 1.0):
+            latencies.append(recorder.latencies[0])
+    return received / elapsed, count - received, sorted(latencies)
+
+
+def fresh_connection(address):
+    host, port_str = address.split(':')
+
+    def send(message):
+        sock = socket.create_connection((host, int(port_str)), timeout=5)
+        sock.sendall(encode_frame(message))
+        sock.close()
+    return send
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia y throughput de mensajes de control según el transporte')
+    parser.add_argument('--messages', type=int, default=5000, help='Mensajes de la ráfaga')
+    parser.add_argument('--port', type=int, default=15500, help='Primer puerto (se usan siete)')
+    args = parser.parse_args()
+
+    tcp_a, tcp_b = node_pair("tcp", args.port)
+    udp_a, udp_b = node_pair("udp", args.port + 2)
+    # Servidor XMPP local en el mismo proceso: todo el camino pasa por él
+    xmpp_server = LocalXmppServer(port=args.port + 6)
+    xmpp_server.start_in_thread()
+    xmpp_a, xmpp_b = node_pair("xmpp", args.port + 4, f"localhost:{args.port + 6}")
+    pool = ConnectionPool()
+    b_address = f"localhost:{args.port + 1}"
+    cases = [
+        ("tcp nueva conexión", fresh_connection(b_address), tcp_b),
+        ("tcp pool", lambda message: pool.send(b_address, encode_frame(message)), tcp_b),
+        ("vecino tcp", lambda message: tcp_a.send_message(message, "B"), tcp_b),
+        ("vecino udp", lambda message: udp_a.send_message(message, "B"), udp_b),
+        ("vecino xmpp", lambda message: xmpp_a.send_message(message, "B"), xmpp_b),
+    ]
+
+    print(f"{'transporte':>20} {'msg/s':>10} {'perdidos':>9} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, send, receiver in cases:
+        rate, lost, latencies = run_case(send, receiver.routing_algorithm, args.messages)
+        print(f"{name:>20} {rate:>10.0f} {lost:>9} {percentile(latencies, 0.5) * 1e6:>10.0f} "
+              f"{percentile(latencies, 0.99) * 1e6:>10.0f}")
+
+    pool.close()
+    for node in (tcp_a, tcp_b, udp_a, udp_b, xmpp_a, xmpp_b):
+        node.shutdown()
+    xmpp_server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+import sys
+import os
+import gc
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tracemalloc
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.helpers import new_message_id
+from src.utils.topology_generator import generate_topology, TOPOLOGY_KINDS
+from src.network.routing import Graph
+from src.network.virtual import VirtualNetwork, ALGORITHMS, build_algorithm
+from tests.bench_node import BenchNode
+
+# Métricas donde un valor mayor es peor (el resto: mayor es mejor)
+LOWER_IS_BETTER = ['spf_ms', 'frames_per_delivery', 'convergence_s', 'control_frames',
+                   'router_peak_bytes', 'sim_peak_bytes']
+HIGHER_IS_BETTER = ['forward_ops_per_sec', 'delivery_ratio']
+
+
+def build_router(algorithm, topo_config, source, graph):
+    """
+    Algoritmo de un solo nodo con su tabla lista para forwardear. Devuelve
+    (algoritmo, segundos de cálculo de rutas o None si no aplica).
+    """
+    node = BenchNode(source, dict(topo_config['config'][source]))
+    router = build_algorithm(algorithm, topo_config, graph)
+    router.set_node(node)
+    if hasattr(router, 'logger'):
+        router.logger.setLevel(logging.WARNING)
+
+    if algorithm == 'dvr':
+        # La tabla de un DV convergido coincide con la de caminos mínimos
+        router.fib.publish(graph.shortest_paths(source).routes())
+    elif algorithm == 'lsr':
+        # Se mide un nodo con la LSDB ya completa; la convergencia real sale de simulate
+        router.topology = dict(topo_config['config'])
+    if algorithm not in ('dijkstra', 'lsr'):
+        return router, None
+
+    start = time.perf_counter()
+    router.calculate_routes()
+    return router, time.perf_counter() - start
+
+
+def bench_forwarding(router, algorithm, names, source, operations):
+    """Operaciones de forwarding por segundo en el nodo origen"""
+    destination = names[len(names) // 2] if len(names) > 1 else source
+    if algorithm == 'flooding':
+        # Cada mensaje es nuevo: se paga el cache de duplicados y el flood
+        messages = [
+            {"type": "message", "id": new_message_id(source), "from": source,
+             "to": destination, "ttl": 10, "payload": "x"}
+            for _ in range(operations)
+        ]
+        handle = router.handle_message
+        start = time.perf_counter()
+        for message in messages:
+            handle(message)
+        return operations / (time.perf_counter() - start)
+
+    message = {"type": "message", "id": "bench", "from": source, "to": destination,
+               "ttl": operations + 10, "payload": "x"}
+    handle = router.handle_forwarding if hasattr(router, 'handle_forwarding') else router.handle_message
+    start = time.perf_counter()
+    for _ in range(operations):
+        handle(message)
+    return operations / (time.perf_counter() - start)
+
+
+def simulate(topo_config, algorithm, seed, warmup, messages):
+    """Convergencia, frames de control y de datos en una red simulada completa"""
+    names = list(topo_config['config'])
+    network = VirtualNetwork.from_config(topo_config, algorithm, seed=seed, cost_delay=0.001)
+    network.start()
+    network.run(duration=warmup)
+    # Dijkstra calcula sus rutas de la configuración al arrancar: no hay
+    # convergencia que medir (sería siempre 0)
+    convergence = network.last_route_change if algorithm != 'dijkstra' else None
+    control_frames = sum(count for message_type, count in network.frames_by_type.items()
+                         if message_type != "message")
+
+    rng = random.Random(seed)
+    for i in range(messages):
+        from_node, to_node = rng.sample(names, 2) if len(names) > 1 else (names[0], names[0])
+        network.inject({
+            "proto": algorithm,
+            "type": "message",
+            "id": new_message_id(from_node),
+            "from": from_node,
+            "to": to_node,
+            "ttl": len(names),
+            "headers": [],
+            "payload": f"mensaje {i}"
+        })
+        network.run()
+    network.shutdown()
+
+    delivered = len(network.delivery_latencies())
+    data_frames = network.frames_by_type.get("message", 0)
+    return {
+        "convergence_s": convergence,
+        "control_frames": control_frames,
+        "delivery_ratio": delivered / messages if messages else None,
+        "frames_per_delivery": data_frames / delivered if delivered else None,
+    }
+
+
+def run_case(kind, size, algorithm, args):
+    topo_config = generate_topology(kind, size, seed=args.seed)
+    names = list(topo_config['config'])
+    source = names[0]
+    graph = Graph.from_topology(topo_config['config'])
+
+    result = {
+        "topology": kind,
+        "size": len(names),
+        "links": sum(len(neighbors) for neighbors in topo_config['config'].values()) // 2,
+        "algorithm": algorithm,
+    }
+
+    # Tiempos sin tracemalloc, que los distorsiona
+    router, spf_time = build_router(algorithm, topo_config, source, graph)
+    result["spf_ms"] = spf_time * 1000 if spf_time is not None else None
+    result["forward_ops_per_sec"] = bench_forwarding(router, algorithm, names, source, args.operations)
+    del router
+    gc.collect()
+
+    tracemalloc.start()
+    router, _ = build_router(algorithm, topo_config, source, graph)
+    result["router_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    del router
+    tracemalloc.stop()
+
+    if len(names) <= args.sim_max_nodes:
+        # El reloj es virtual, así que tracemalloc no altera los resultados,
+        # pero multiplica varias veces el tiempo real de la simulación
+        if args.sim_memory:
+            tracemalloc.start()
+        result.update(simulate(topo_config, algorithm, args.seed, args.warmup, args.messages))
+        if args.sim_memory:
+            result["sim_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    gc.collect()
+    return result
+
+
+def compare(results, baseline_path, tolerance):
+    """Lista de regresiones respecto a un JSON anterior de este mismo script"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {
+            (r["topology"], r["size"], r["algorithm"]): r
+            for r in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        old = baseline.get((result["topology"], result["size"], result["algorithm"]))
+        if old is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append((result["topology"], result["size"], result["algorithm"],
+                                    metric, before, after))
+    return regressions
+
+
+def format_value(value, digits=1):
+    if value is None:
+        return "-"
+    return f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los algoritmos de enrutamiento sobre topologías generadas')
+    parser.add_argument('--topologies', default=','.join(TOPOLOGY_KINDS),
+                        help='Tipos de topología separados por coma')
+    parser.add_argument('--sizes', default='10,100,1000,10000',
+                        help='Cantidad de nodos separadas por coma (hasta 100000)')
+    parser.add_argument('--algorithms', default=','.join(ALGORITHMS),
+                        help='Algoritmos separados por coma')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla de topologías y simulación')
+    parser.add_argument('--operations', type=int, default=20000,
+                        help='Operaciones de forwarding medidas por caso')
+    parser.add_argument('--sim-max-nodes', type=int, default=200,
+                        help='Tamaño máximo simulado completo (convergencia y frames por entrega)')
+    parser.add_argument('--sim-memory', action='store_true',
+                        help='Medir también el pico de memoria de la simulación completa (más lento)')
+    parser.add_argument('--warmup', type=float, default=60.0,
+                        help='Segundos simulados de convergencia inicial')
+    parser.add_argument('--messages', type=int, default=20,
+                        help='Mensajes de datos simulados por caso')
+    parser.add_argument('--output', '-o', help='Archivo JSON con los resultados')
+    parser.add_argument('--baseline', help='JSON anterior contra el que buscar regresiones')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Empeoramiento relativo tolerado antes de reportar regresión')
+    args = parser.parse_args()
+
+    kinds = args.topologies.split(',')
+    sizes = [int(s) for s in args.sizes.split(',')]
+    algorithms = args.algorithms.split(',')
+
+    print(f"{'topología':>10} {'nodos':>7} {'algoritmo':>9} {'spf ms':>9} {'fwd ops/s':>11} "
+          f"{'conv s':>8} {'frames/ent':>10} {'pico KB':>9}")
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            for algorithm in algorithms:
+                result = run_case(kind, size, algorithm, args)
+                results.append(result)
+                peak = max(result["router_peak_bytes"], result.get("sim_peak_bytes") or 0)
+                print(f"{kind:>10} {result['size']:>7} {algorithm:>9} "
+                      f"{format_value(result['spf_ms'], 2):>9} "
+                      f"{result['forward_ops_per_sec']:>11.0f} "
+                      f"{format_value(result.get('convergence_s'), 3):>8} "
+                      f"{format_value(result.get('frames_per_delivery')):>10} "
+                      f"{peak / 1024:>9.0f}", flush=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "operations": args.operations,
+            "warmup": args.warmup,
+            "messages": args.messages,
+            "sim_max_nodes": args.sim_max_nodes,
+            "sim_memory": args.sim_memory,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for kind, size, algorithm, metric, before, after in regressions:
+            print(f"REGRESIÓN {kind}/{size}/{algorithm} {metric}: {before:.4g} -> {after:.4g}")
+        if regressions:
+            sys.exit(1)
+        print("Sin regresiones respecto al baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import sys
+import os
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.topology_cache import compile_topology, compiled_path, CompiledTopology
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compila topología y nombres a un archivo binario que los nodos mapean con mmap')
+    parser.add_argument('--topo', default='config/topo-ejemplo.json', help='Archivo de topología')
+    parser.add_argument('--names', default='config/names-ejemplo.json', help='Archivo de nombres')
+    parser.add_argument('--output', '-o', help='Archivo de salida (por defecto junto a la topología, con extensión .bin)')
+    args = parser.parse_args()
+
+    topo_path = os.path.join(project_root, args.topo)
+    names_path = os.path.join(project_root, args.names)
+    output_path = compile_topology(topo_path, names_path, args.output or compiled_path(topo_path))
+
+    compiled = CompiledTopology(output_path)
+    print(f"Topología compilada en {output_path}: {len(compiled)} nodos, "
+          f"{compiled.edge_count} aristas dirigidas, {os.path.getsize(output_path)} bytes")
+    compiled.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,354 @@
+import sys
+import os
+import time
+import random
+import socket
+import argparse
+import threading
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.config_loader import load_config, get_node_addresses
+from src.utils.helpers import encode_frame, decode_message, new_message_id, FrameDecoder, FrameError, RECV_BUFFER_SIZE
+from src.network.forwarding import header_value
+from src.transport.socket_client import ConnectionPool
+
+TOPO_PATH = 'config/topo-ejemplo.json'
+NAMES_PATH = 'config/names-ejemplo.json'
+ALGORITHMS = ['flooding', 'dijkstra', 'lsr', 'dvr']
+# Segundos sin respuesta después de los cuales un echo se cuenta perdido
+ACK_TIMEOUT = 2.0
+
+
+class AckListener:
+    """
+    Servidor TCP donde los nodos de ingreso devuelven la respuesta de cada
+    echo (el header reply_to apunta aquí). Cada nodo abre una sola conexión
+    persistente y manda todos sus acuses por ella.
+    """
+
+    def __init__(self, on_ack, host='localhost', port=0):
+        self.on_ack = on_ack
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(socket.SOMAXCONN)
+        self.address = f"{host}:{self.sock.getsockname()[1]}"
+        self.running = True
+        self.invalid = 0
+
+    def start(self):
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.read_loop, args=(client,), daemon=True).start()
+
+    def read_loop(self, client):
+        decoder = FrameDecoder()
+        with client:
+            while self.running:
+                try:
+                    data = client.recv(RECV_BUFFER_SIZE)
+                    if not data:
+                        return
+                    bodies = decoder.feed(data)
+                except (OSError, FrameError):
+                    return
+                for body in bodies:
+                    try:
+                        self.on_ack(decode_message(body))
+                    except ValueError:
+                        self.invalid += 1
+
+    def close(self):
+        self.running = False
+        self.sock.close()
+
+
+class PairStats:
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.latencies = []
+
+
+class LoadGenerator:
+    """
+    Inyecta echos en la red por conexiones persistentes a los nodos de
+    ingreso (el 'from' de cada par) y mide cuánto tarda en volver cada uno:
+    el destino lo contesta por la red y el nodo de ingreso reenvía la
+    respuesta al AckListener. Dos modos:
+      - run_rate: lazo abierto, una tasa fija repartida entre los pares.
+      - run_closed: lazo cerrado, una ventana fija de echos en vuelo; cada
+        respuesta (o vencimiento) libera el lugar para el siguiente.
+    """
+
+    def __init__(self, node_addresses, pairs, proto='flooding', payload_size=32, ttl=16,
+                 timeout=ACK_TIMEOUT, reply_host='localhost', reply_port=0):
+        self.node_addresses = node_addresses
+        self.pairs = pairs
+        self.proto = proto
+        self.padding = "x" * payload_size
+        self.ttl = ttl
+        self.timeout = timeout
+        self.pool = ConnectionPool()
+        self.listener = AckListener(self.on_ack, reply_host, reply_port)
+        self.lock = threading.Lock()
+        self.acked = threading.Condition(self.lock)
+        self.outstanding = {}  # id -> (enviado, par)
+        self.stats = {pair: PairStats() for pair in pairs}
+        self.lost = 0
+        self.send_errors = 0
+        self.late = 0
+        self.first_send = None
+        self.last_ack = None
+
+    def start(self):
+        self.listener.start()
+
+    def echo(self, pair, sequence):
+        from_node, to_node = pair
+        return {
+            "proto": self.proto,
+            "type": "echo",
+            "id": new_message_id(from_node),
+            "from": from_node,
+            "to": to_node,
+            "ttl": self.ttl,
+            "headers": [{"reply_to": self.listener.address}],
+            "payload": f"{sequence}:{self.padding}"
+        }
+
+    def send(self, pair, sequence):
+        message = self.echo(pair, sequence)
+        now = time.perf_counter()
+        with self.lock:
+            self.outstanding[message["id"]] = (now, pair)
+            self.stats[pair].sent += 1
+            if self.first_send is None:
+                self.first_send = now
+        try:
+            self.pool.send(self.node_addresses[pair[0]], encode_frame(message))
+        except OSError:
+            with self.acked:
+                self.outstanding.pop(message["id"], None)
+                self.stats[pair].sent -= 1
+                self.send_errors += 1
+                self.acked.notify_all()
+            return False
+        return True
+
+    def on_ack(self, reply):
+        now = time.perf_counter()
+        with self.acked:
+            entry = self.outstanding.pop(header_value(reply, "echo_reply"), None)
+            if entry is None:
+                # Ya vencido o duplicado (flooding puede entregar la respuesta más de una vez)
+                self.late += 1
+                return
+            sent, pair = entry
+            if now - sent > self.timeout:
+                # Llegó, pero después del timeout: cuenta como perdido igual que en expire
+                self.late += 1
+                return
+            stats = self.stats[pair]
+            stats.acked += 1
+            stats.latencies.append(now - sent)
+            self.last_ack = now
+            self.acked.notify_all()
+
+    def expire(self, now):
+        """Da por perdidos los echos sin respuesta después de timeout (con el lock tomado)"""
+        expired = [message_id for message_id, (sent, _) in self.outstanding.items() if now - sent > self.timeout]
+        for message_id in expired:
+            del self.outstanding[message_id]
+        self.lost += len(expired)
+        return len(expired)
+
+    def run_rate(self, rate, duration):
+        """Lazo abierto: rate echos por segundo en total, rotando entre los pares"""
+        interval = 1.0 / rate
+        start = time.perf_counter()
+        deadline = start + duration
+        next_send = start
+        sequence = 0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if next_send > now:
+                time.sleep(next_send - now)
+            self.send(self.pairs[sequence % len(self.pairs)], sequence)
+            sequence += 1
+            next_send += interval
+            if sequence % 1000 == 0:
+                with self.lock:
+                    self.expire(time.perf_counter())
+        self.drain()
+
+    def run_closed(self, window, duration):
+        """Lazo cerrado: siempre window echos en vuelo; la tasa la pone la red"""
+        deadline = time.perf_counter() + duration
+        sequence = 0
+        while time.perf_counter() < deadline:
+            with self.acked:
+                while len(self.outstanding) >= window:
+                    if not self.acked.wait(self.timeout / 4):
+                        self.expire(time.perf_counter())
+            if not self.send(self.pairs[sequence % len(self.pairs)], sequence):
+                # Nodo de ingreso caído: no insistir a toda velocidad
+                time.sleep(0.01)
+            sequence += 1
+        self.drain()
+
+    def drain(self):
+        """Espera las respuestas pendientes hasta el timeout y cuenta el resto como perdidas"""
+        deadline = time.perf_counter() + self.timeout
+        with self.acked:
+            while self.outstanding and time.perf_counter() < deadline:
+                self.acked.wait(deadline - time.perf_counter())
+            self.expire(float('inf'))
+
+    def summary(self, stats=None):
+        """(enviados, respondidos, perdidos, respuestas/s, latencias ordenadas)"""
+        stats = stats or list(self.stats.values())
+        sent = sum(s.sent for s in stats)
+        acked = sum(s.acked for s in stats)
+        latencies = sorted(latency for s in stats for latency in s.latencies)
+        elapsed = (self.last_ack - self.first_send) if self.last_ack and self.first_send else 0
+        return sent, acked, sent - acked, acked / elapsed if elapsed > 0 else 0.0, latencies
+
+    def close(self):
+        self.pool.close()
+        self.listener.close()
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def choose_pairs(node_ids, spec=None, count=16, seed=0):
+    """Pares (origen, destino) de --pairs 'A:G,B:H' o count pares al azar distintos"""
+    if spec:
+        pairs = [tuple(item.split(':', 1)) for item in spec.split(',') if item]
+        unknown = {node for pair in pairs for node in pair if node not in node_ids}
+        if unknown:
+            raise ValueError(f"Nodos desconocidos: {', '.join(sorted(unknown))}")
+        return pairs
+    all_pairs = [(a, b) for a in node_ids for b in node_ids if a != b]
+    if len(all_pairs) <= count:
+        return all_pairs
+    return random.Random(seed).sample(all_pairs, count)
+
+
+def run_load(args, node_addresses, pairs, proto):
+    generator = LoadGenerator(node_addresses, pairs, proto, args.payload_size, args.ttl, args.timeout)
+    generator.start()
+    try:
+        if args.window:
+            generator.run_closed(args.window, args.duration)
+        else:
+            generator.run_rate(args.rate, args.duration)
+    finally:
+        generator.close()
+    return generator
+
+
+def print_header():
+    print(f"{'algoritmo':>10} {'enviados':>9} {'resp.':>9} {'perdidos':>9} {'resp/s':>9} "
+          f"{'p50 (ms)':>9} {'p99 (ms)':>9}")
+
+
+def print_row(label, summary):
+    sent, acked, lost, rate, latencies = summary
+    print(f"{label:>10} {sent:>9} {acked:>9} {lost:>9} {rate:>9.0f} "
+          f"{percentile(latencies, 0.5) * 1e3:>9.2f} {percentile(latencies, 0.99) * 1e3:>9.2f}")
+
+
+def print_pairs(generator):
+    for pair, stats in generator.stats.items():
+        print_row(f"{pair[0]}->{pair[1]}", generator.summary([stats]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generador de carga: echos por conexiones persistentes, con latencia de ida y vuelta',
+        epilog="Ejemplos: python tests/load_generator.py --rate 2000 --duration 10 | "
+               "python tests/load_generator.py --algorithms flooding,lsr,dvr --window 64")
+    parser.add_argument('--rate', type=float, default=1000, help='Echos por segundo en total (lazo abierto)')
+    parser.add_argument('--window', type=int,
+                        help='Lazo cerrado: echos en vuelo a la vez (ignora --rate)')
+    parser.add_argument('--duration', type=float, default=10, help='Segundos de carga')
+    parser.add_argument('--pairs', help="Pares origen:destino separados por coma, p. ej. 'A:G,B:H'")
+    parser.add_argument('--pair-count', type=int, default=16, help='Pares al azar si no se da --pairs')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla para elegir los pares')
+    parser.add_argument('--payload-size', type=int, default=32, help='Bytes de relleno del payload')
+    parser.add_argument('--ttl', type=int, default=16, help='TTL de cada echo')
+    parser.add_argument('--timeout', type=float, default=ACK_TIMEOUT,
+                        help='Segundos sin respuesta para contar un echo como perdido')
+    parser.add_argument('--proto', default='flooding', choices=ALGORITHMS,
+                        help="Campo proto de los echos contra una red ya levantada")
+    parser.add_argument('--algorithms',
+                        help='Levantar la red con cada algoritmo (separados por coma), medir y detenerla')
+    parser.add_argument('--settle', type=float, default=10,
+                        help='Segundos de espera a que converja el routing antes de medir (--algorithms)')
+    parser.add_argument('--workers', '-w', type=int, help='Procesos de la red con --algorithms')
+    parser.add_argument('--per-pair', action='store_true', help='Mostrar también el resultado de cada par')
+    parser.add_argument('--topo', default=TOPO_PATH, help='Archivo de topología')
+    parser.add_argument('--names', default=NAMES_PATH, help='Archivo de nombres')
+    args = parser.parse_args()
+
+    node_addresses = get_node_addresses(load_config(os.path.join(project_root, args.names)))
+    try:
+        pairs = choose_pairs(list(node_addresses), args.pairs, args.pair_count, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    mode = f"ventana {args.window}" if args.window else f"{args.rate:.0f} echos/s"
+    print(f"{len(pairs)} pares, {mode}, {args.duration:.0f} s por corrida")
+
+    if not args.algorithms:
+        generator = run_load(args, node_addresses, pairs, args.proto)
+        print_header()
+        print_row(args.proto, generator.summary())
+        if args.per_pair:
+            print_pairs(generator)
+        if generator.send_errors:
+            print(f"{generator.send_errors} echos no se pudieron enviar (¿está levantada la red?)")
+        return
+
+    from tests.run_network import NetworkManager
+    results = []
+    for algorithm in args.algorithms.split(','):
+        if algorithm not in ALGORITHMS:
+            parser.error(f"Algoritmo desconocido: {algorithm}")
+        manager = NetworkManager(args.topo, args.names, args.workers)
+        # Los logs de los nodos van solo al LogStore: la salida queda para la tabla
+        manager.quiet = True
+        manager.start_all_nodes(algorithm)
+        try:
+            time.sleep(args.settle)
+            results.append((algorithm, run_load(args, node_addresses, pairs, algorithm)))
+        finally:
+            manager.stop_all_nodes()
+
+    print()
+    print_header()
+    for algorithm, generator in results:
+        print_row(algorithm, generator.summary())
+    if args.per_pair:
+        for algorithm, generator in results:
+            print(f"\n{algorithm}:")
+            print_pairs(generator)
+
+
+if __name__ == '__main__':
+    main()
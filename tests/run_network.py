@@ -4,8 +4,7 @@ import subprocess
 import time
 import signal
 import threading
-import json
-import socket
+import selectors
 import argparse
 
 # Agregar el directorio raíz del proyecto al path de Python
@@ -13,109 +12,255 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from src.utils.config_loader import load_config, get_node_addresses
+from src.utils.helpers import encode_frame, new_message_id, parse_ready_line
+from src.utils.topology_cache import ensure_compiled
+from src.utils.metrics import load_snapshots, aggregate
+from src.utils.logger import DATA_LOG_RATE
+from src.utils.log_store import LogStore
+from src.transport.socket_client import ConnectionPool
+from src.transport.xmpp_client import XMPP_PORT
+from src.transport.xmpp_server import LocalXmppServer
+
+METRICS_DIR = os.path.join(project_root, 'logs', 'metrics')
+# Segmentos rotativos con los logs de todos los nodos, indexados por mensaje
+LOG_STORE_DIR = os.path.join(project_root, 'logs', 'store')
+TOPO_PATH = 'config/topo-ejemplo.json'
+NAMES_PATH = 'config/names-ejemplo.json'
+# Segundos que se espera a que todos los nodos acepten conexiones
+READY_TIMEOUT = 30.0
+
+
+class Worker:
+    """Proceso de main.py que aloja un grupo de nodos"""
+
+    def __init__(self, index, node_ids, process):
+        self.index = index
+        self.name = f"w{index}"
+        self.node_ids = node_ids
+        self.process = process
+
 
 class NetworkManager:
-    def __init__(self):
-        self.processes = {}
+    """
+    Levanta la red repartiendo los nodos en unos pocos procesos (uno por core
+    por defecto). La salida de todos se lee en un único hilo con selectors, y
+    cada worker escribe READY <nodo> cuando ese nodo ya acepta conexiones: el
+    arranque dura lo que tarda el más lento en vez de un segundo por nodo.
+    """
+
+    def __init__(self, topo_path=TOPO_PATH, names_path=NAMES_PATH, workers=None, xmpp_port=XMPP_PORT,
+                 log_rate=DATA_LOG_RATE):
+        self.topo_path = topo_path
+        # Límite por segundo de los eventos por mensaje en el log de cada nodo (0: todos)
+        self.log_rate = log_rate
+        self.names_path = names_path
+        self.worker_count = workers or os.cpu_count() or 1
+        self.workers = []
+        self.processes = {}  # nodo -> proceso del worker que lo aloja
         self.running = False
-        self.logs = {}  # Almacenar logs por nodo
+        # Logs por nodo: cola reciente en memoria y segmentos en disco (start_all_nodes)
+        self.logs = None
+        # nodo -> None si está listo o el error con el que no pudo arrancar
+        self.ready = {}
+        self.ready_changed = threading.Condition()
+        self.selector = None
+        self.partial = {}
+        self.collector = None
+        # Una conexión reutilizable por nodo para inyectar mensajes
+        self.pool = ConnectionPool()
+        # Servidor XMPP local para --transport xmpp; corre en este proceso
+        self.xmpp_port = xmpp_port
+        self.xmpp_server = None
+        # quiet: los logs de los nodos solo van al LogStore (load_generator.py)
+        self.quiet = False
         
         # Cargar configuración
-        self.names_config = load_config('config/names-ejemplo.json')
+        self.names_config = load_config(os.path.join(project_root, names_path))
         self.node_addresses = get_node_addresses(self.names_config)
     
-    def start_all_nodes(self, algorithm='flooding'):
-        """Inicia todos los nodos de la red"""
+    def start_all_nodes(self, algorithm='flooding', engine='threads', ready_timeout=READY_TIMEOUT, transport='tcp'):
+        """Inicia todos los nodos de la red y espera a que estén escuchando"""
         self.running = True
-        print(f"Iniciando todos los nodos de la red con algoritmo: {algorithm}")
+        node_ids = list(self.node_addresses)
+        shards = self.shard(node_ids)
+        print(f"Iniciando {len(node_ids)} nodos en {len(shards)} procesos con algoritmo: {algorithm}")
         print("Los logs de cada nodo se mostrarán a continuación:")
         print("=" * 60)
-        
-        for node_id in self.node_addresses.keys():
-            self.start_node(node_id, algorithm)
-            time.sleep(1)  # Pausa más larga para evitar congestión
-        
+
+        # Se compila una sola vez y todos los nodos mapean el mismo archivo
+        compiled_file, compiled_now = ensure_compiled(
+            os.path.join(project_root, self.topo_path),
+            os.path.join(project_root, self.names_path))
+        if compiled_now:
+            print(f"Topología compilada en {compiled_file}")
+
+        # Los snapshots de una corrida anterior mezclarían los totales
+        if os.path.isdir(METRICS_DIR):
+            for filename in os.listdir(METRICS_DIR):
+                if filename.endswith('.json'):
+                    os.remove(os.path.join(METRICS_DIR, filename))
+
+        self.logs = LogStore(LOG_STORE_DIR, reset=True)
+        start = time.monotonic()
+        if transport == 'xmpp':
+            self.xmpp_server = LocalXmppServer(port=self.xmpp_port)
+            self.xmpp_server.start_in_thread()
+            print(f"Servidor XMPP local en localhost:{self.xmpp_port}")
+        self.selector = selectors.DefaultSelector()
+        for index, shard in enumerate(shards):
+            self.start_worker(index, shard, algorithm, engine, transport)
+        # Todos los pipes quedan registrados antes de que el colector empiece a leer
+        self.collector = threading.Thread(target=self.collect_output, daemon=True)
+        self.collector.start()
+
+        self.wait_ready(node_ids, ready_timeout)
+        listening = sum(1 for node_id in node_ids if node_id in self.ready and self.ready[node_id] is None)
         print("=" * 60)
-        print("Todos los nodos iniciados. Presiona Ctrl+C para detener.")
+        print(f"{listening}/{len(node_ids)} nodos escuchando en {time.monotonic() - start:.1f} s. "
+              "Presiona Ctrl+C para detener.")
+
+    def shard(self, node_ids):
+        """Reparte los nodos en grupos contiguos, uno por worker"""
+        count = max(1, min(self.worker_count, len(node_ids)))
+        size, extra = divmod(len(node_ids), count)
+        shards = []
+        position = 0
+        for i in range(count):
+            end = position + size + (1 if i < extra else 0)
+            shards.append(node_ids[position:end])
+            position = end
+        return shards
     
-    def start_node(self, node_id, algorithm='flooding'):
-        """Inicia un nodo específico"""
+    def start_worker(self, index, node_ids, algorithm='flooding', engine='threads', transport='tcp'):
+        """Inicia un proceso de main.py con varios nodos"""
         try:
-            # Crear archivo de log individual para cada nodo
-            log_dir = os.path.join(project_root, 'logs')
-            if not os.path.exists(log_dir):
-                os.makedirs(log_dir)
-            
-            log_file = os.path.join(log_dir, f'{node_id}.log')
-            
-            # Iniciar proceso con output redirigido a archivo y consola
             process = subprocess.Popen([
-                sys.executable, "main.py", node_id, "--algorithm", algorithm
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-               text=True, bufsize=1, universal_newlines=True)
-            
-            self.processes[node_id] = process
-            self.logs[node_id] = []
-            
-            print(f"Nodo {node_id} iniciado (PID: {process.pid})")
-            
-            # Hilos para capturar output en tiempo real
-            threading.Thread(target=self.capture_stdout, args=(node_id, process), daemon=True).start()
-            threading.Thread(target=self.capture_stderr, args=(node_id, process), daemon=True).start()
-            
-        except Exception as e:
-            print(f"Error iniciando nodo {node_id}: {e}")
-    
-    def capture_stdout(self, node_id, process):
-        """Captura stdout en tiempo real"""
-        try:
-            while self.running and process.poll() is None:
-                line = process.stdout.readline()
-                if line:
-                    clean_line = line.strip()
-                    if clean_line:
-                        print(f"[{node_id}] {clean_line}")
-                        self.logs[node_id].append(clean_line)
-                time.sleep(0.1)
+                sys.executable, os.path.join(project_root, "main.py"), *node_ids,
+                "--algorithm", algorithm, "--engine", engine, "--transport", transport,
+                "--metrics-dir", METRICS_DIR, "--topo", self.topo_path, "--names", self.names_path,
+                "--ready", "--xmpp-server", f"localhost:{self.xmpp_port}", "--log-rate", str(self.log_rate)
+            ], cwd=project_root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         except Exception as e:
-            print(f"Error capturando stdout de {node_id}: {e}")
-    
-    def capture_stderr(self, node_id, process):
-        """Captura stderr en tiempo real"""
-        try:
-            while self.running and process.poll() is None:
-                line = process.stderr.readline()
-                if line:
-                    clean_line = line.strip()
-                    if clean_line:
-                        # Detectar si es realmente un ERROR o solo un log normal
-                        if any(keyword in clean_line for keyword in ['ERROR', 'CRITICAL', 'FATAL']):
-                            print(f"[{node_id}-ERROR] {clean_line}")
-                        else:
-                            print(f"[{node_id}-LOG] {clean_line}")
-                        self.logs[node_id].append(clean_line)
-                time.sleep(0.1)
-        except Exception as e:
-            print(f"Error capturando stderr de {node_id}: {e}")
+            print(f"Error iniciando worker {index}: {e}")
+            return
+
+        worker = Worker(index, node_ids, process)
+        self.workers.append(worker)
+        for node_id in node_ids:
+            self.processes[node_id] = process
+        self.selector.register(process.stdout, selectors.EVENT_READ, (worker, False))
+        self.selector.register(process.stderr, selectors.EVENT_READ, (worker, True))
+        print(f"Worker {worker.name} (PID: {process.pid}): {len(node_ids)} nodos, {node_ids[0]}..{node_ids[-1]}")
+
+    def wait_ready(self, node_ids, timeout):
+        """Espera los READY de todos los nodos, o a que no quede ningún worker vivo"""
+        deadline = time.monotonic() + timeout
+        with self.ready_changed:
+            while len(self.ready) < len(node_ids):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.selector.get_map():
+                    break
+                self.ready_changed.wait(min(remaining, 0.5))
+
+        missing = [node_id for node_id in node_ids if node_id not in self.ready]
+        if missing:
+            print(f"Sin respuesta de {len(missing)} nodos tras {timeout:.0f} s: {', '.join(missing[:10])}")
+        for node_id, error in self.ready.items():
+            if error is not None:
+                print(f"Nodo {node_id} no pudo arrancar: {error}")
+
+    def collect_output(self):
+        """Único lector de stdout/stderr de todos los workers"""
+        selector = self.selector
+        while selector.get_map():
+            for key, _ in selector.select(timeout=1):
+                worker, is_stderr = key.data
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    # EOF: el worker terminó (o cerró ese pipe)
+                    selector.unregister(key.fileobj)
+                    rest = self.partial.pop(key.fd, b"")
+                    if rest:
+                        self.handle_line(worker, is_stderr, rest.decode(errors='replace'))
+                    with self.ready_changed:
+                        self.ready_changed.notify_all()
+                    continue
+                lines = (self.partial.pop(key.fd, b"") + chunk).split(b"\n")
+                self.partial[key.fd] = lines.pop()
+                for line in lines:
+                    self.handle_line(worker, is_stderr, line.decode(errors='replace'))
+        selector.close()
+
+    def handle_line(self, worker, is_stderr, line):
+        clean_line = line.strip()
+        if not clean_line:
+            return
+
+        if not is_stderr:
+            ready = parse_ready_line(clean_line)
+            if ready is not None:
+                with self.ready_changed:
+                    self.ready[ready[0]] = ready[1]
+                    self.ready_changed.notify_all()
+                return
+
+        node_id = self.line_node(clean_line)
+        label = node_id or worker.name
+        if self.quiet:
+            pass
+        elif not is_stderr:
+            print(f"[{label}] {clean_line}")
+        # Detectar si es realmente un ERROR o solo un log normal
+        elif any(keyword in clean_line for keyword in ['ERROR', 'CRITICAL', 'FATAL']):
+            print(f"[{label}-ERROR] {clean_line}")
+        else:
+            print(f"[{label}-LOG] {clean_line}")
+        self.logs.append(label, clean_line)
+
+    def line_node(self, line):
+        """
+        Nodo al que pertenece una línea de log ('hh:mm:ss - <logger> - NIVEL - ...'),
+        por el nombre del logger: A, A.data, LSR-A, Dijkstra-A.data...
+        """
+        parts = line.split(" - ", 2)
+        if len(parts) < 3:
+            return None
+        name = parts[1].split(".")[0]
+        if name in self.node_addresses:
+            return name
+        name = name.partition("-")[2]
+        return name if name in self.node_addresses else None
     
     def stop_all_nodes(self):
-        """Detiene todos los nodos"""
+        """Detiene todos los workers"""
         self.running = False
         print("\nDeteniendo todos los nodos...")
         
-        for node_id, process in self.processes.items():
+        for worker in self.workers:
+            try:
+                worker.process.terminate()
+            except Exception as e:
+                print(f"Error deteniendo worker {worker.name}: {e}")
+        for worker in self.workers:
             try:
-                process.terminate()
-                stdout, stderr = process.communicate(timeout=3)
-                print(f"Nodo {node_id} detenido")
+                worker.process.wait(timeout=3)
+                print(f"Worker {worker.name} detenido ({len(worker.node_ids)} nodos)")
             except subprocess.TimeoutExpired:
                 try:
-                    process.kill()
-                    print(f"Nodo {node_id} forzado a detenerse")
+                    worker.process.kill()
+                    print(f"Worker {worker.name} forzado a detenerse")
                 except:
                     pass
-            except Exception as e:
-                print(f"Error deteniendo nodo {node_id}: {e}")
+        # Que el colector alcance a mostrar las últimas líneas
+        if self.collector is not None:
+            self.collector.join(timeout=3)
+        if self.logs is not None:
+            self.logs.close()
+        if self.xmpp_server is not None:
+            print(f"Servidor XMPP: {self.xmpp_server.routed} stanzas ruteados, "
+                  f"{self.xmpp_server.dropped} descartados")
+            self.xmpp_server.stop()
+        self.pool.close()
     
     def send_test_message(self, from_node, to_node, message_text, proto="flooding"):
         """Envía un mensaje de prueba y verifica delivery"""
@@ -123,30 +268,23 @@ class NetworkManager:
             print(f"Error: Nodo {from_node} no existe")
             return
         
-        target_address = self.node_addresses[from_node]
-        host, port_str = target_address.split(':')
-        port = int(port_str)
-        
         message = {
             "proto": proto,
             "type": "message",
+            "id": new_message_id(from_node),
             "from": from_node,
             "to": to_node,
             "ttl": 10,
             "headers": [],
-            "payload": message_text,
-            "timestamp": int(time.time())
+            "payload": message_text
         }
         
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((host, port))
-            sock.send(json.dumps(message).encode())
-            sock.close()
+            self.pool.send(self.node_addresses[from_node], encode_frame(message))
             
-            print(f"Mensaje enviado desde {from_node} a {to_node}: '{message_text}'")
+            print(f"Mensaje enviado desde {from_node} a {to_node}: '{message_text}' (id {message['id']})")
             print("Revisa los logs para ver el trayecto del mensaje...")
+            return message["id"]
             
         except Exception as e:
             print(f"Error enviando mensaje: {e}")
@@ -157,35 +295,128 @@ class NetworkManager:
         print("-" * 40)
         
         for node_id, process in self.processes.items():
-            status = "ACTIVO" if process.poll() is None else "INACTIVO"
-            print(f"{node_id}: {status}")
+            if process.poll() is not None:
+                status = "INACTIVO"
+            elif node_id not in self.ready:
+                status = "INICIANDO"
+            elif self.ready[node_id] is not None:
+                status = f"ERROR ({self.ready[node_id]})"
+            else:
+                status = "ACTIVO"
+            print(f"{node_id}: {status} [PID {process.pid}]")
         
         print("-" * 40)
     
+    def show_metrics(self, directory=METRICS_DIR):
+        """Tablas de throughput y latencia de toda la red a partir de los snapshots"""
+        snapshots = load_snapshots(directory)
+        if not snapshots:
+            print(f"No hay snapshots de métricas en {directory}")
+            return
+        summary = aggregate(snapshots)
+
+        print("\nMÉTRICAS POR NODO:")
+        print(f"{'nodo':>6} {'msg in':>8} {'msg out':>8} {'KB in':>8} {'KB out':>8} {'out/s':>7} "
+              f"{'dup':>6} {'ttl':>5} {'drops':>6} {'reconx':>6} {'fwd p50':>9} {'fwd p99':>9}")
+        for row in summary["nodes"]:
+            print(f"{row['node']:>6} {row['messages_in']:>8} {row['messages_out']:>8} "
+                  f"{row['bytes_in'] / 1024:>8.1f} {row['bytes_out'] / 1024:>8.1f} {row['out_per_sec']:>7.1f} "
+                  f"{row['duplicates']:>6} {row['ttl_expired']:>5} {row['send_drops']:>6} {row['reconnects']:>6} "
+                  f"{format_seconds(row['forward_p50']):>9} {format_seconds(row['forward_p99']):>9}")
+
+        totals = summary["totals"]
+        print(f"\nRED: {totals.get('messages_out', 0)} mensajes enviados, "
+              f"{totals.get('bytes_out', 0) / 1024:.1f} KB, "
+              f"{totals.get('duplicates_dropped', 0)} duplicados, "
+              f"{totals.get('ttl_expired', 0)} TTL agotados, "
+              f"{totals.get('send_drops', 0)} descartes por cola llena")
+        print(f"\n{'histograma':>22} {'n':>8} {'p50':>9} {'p99':>9} {'max':>9}")
+        for name, latency in sorted(summary["latencies"].items()):
+            print(f"{name:>22} {latency['count']:>8} {format_seconds(latency['p50']):>9} "
+                  f"{format_seconds(latency['p99']):>9} {format_seconds(latency['max']):>9}")
+
     def show_recent_logs(self, node_id, lines=5):
         """Muestra los logs recientes de un nodo"""
-        if node_id in self.logs and self.logs[node_id]:
+        recent = self.logs.tail(node_id, lines) if self.logs else []
+        if recent:
             print(f"\nÚltimos {lines} logs de {node_id}:")
             print("-" * 50)
-            for log in self.logs[node_id][-lines:]:
+            for log in recent:
                 print(log)
             print("-" * 50)
         else:
             print(f"No hay logs disponibles para {node_id}")
 
+    def show_trace(self, key, lines=50):
+        """Recorrido de un mensaje por id, o los últimos mensajes hacia un nodo destino"""
+        if self.logs is None:
+            self.logs = LogStore(LOG_STORE_DIR)
+        start = time.perf_counter()
+        if key in self.node_addresses:
+            entries = self.logs.to_destination(key, lines)
+            title = f"Últimas {len(entries)} líneas de mensajes hacia {key}"
+        else:
+            entries = self.logs.trace(key)
+            title = f"Recorrido de {key}: {len(entries)} líneas en {len(set(node for node, _ in entries))} nodos"
+        elapsed = time.perf_counter() - start
+
+        if not entries:
+            print(f"No hay líneas de log para {key}")
+            return
+        print(f"\n{title} (consulta en {format_seconds(elapsed)}):")
+        print("-" * 50)
+        for node_id, line in entries:
+            print(f"[{node_id}] {line}")
+        print("-" * 50)
+        if self.log_rate:
+            print(f"Los eventos por mensaje se muestrean a {self.log_rate:g}/s por tipo en cada nodo: con carga "
+                  f"pueden faltar saltos. Para un recorrido completo, levantar la red con --log-rate 0.")
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    if value < 1e-3:
+        return f"{value * 1e6:.0f}us"
+    if value < 1:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value:.2f}s"
+
 def main():
     # Configurar argumentos de línea de comandos
     parser = argparse.ArgumentParser(description='Gestor de red para Laboratorio 3')
     parser.add_argument('--algorithm', '-a', default='flooding', 
                        choices=['flooding', 'dijkstra', 'lsr', 'dvr'],
                        help='Algoritmo de enrutamiento a usar')
+    parser.add_argument('--engine', '-e', default='threads',
+                       choices=['threads', 'asyncio'],
+                       help='Motor de cada nodo (hilos o event loop asyncio)')
     parser.add_argument('--send', action='store_true',
                        help='Modo de envío rápido de mensajes')
     parser.add_argument('--from-node', help='Nodo origen para envío rápido')
     parser.add_argument('--to-node', help='Nodo destino para envío rápido')
     parser.add_argument('--message', help='Mensaje para envío rápido')
+    parser.add_argument('--metrics', action='store_true',
+                       help='Mostrar las métricas agregadas de la última corrida y salir')
+    parser.add_argument('--transport', '-t', default='tcp', choices=['tcp', 'udp', 'xmpp'],
+                       help='Transporte de los nodos (udp: hellos, LSAs y vectores por datagramas; '
+                            'xmpp: todo por un servidor XMPP local que se levanta aquí)')
+    parser.add_argument('--xmpp-port', type=int, default=XMPP_PORT,
+                       help='Puerto del servidor XMPP local con --transport xmpp')
+    parser.add_argument('--workers', '-w', type=int,
+                       help='Procesos entre los que se reparten los nodos (por defecto uno por core)')
+    parser.add_argument('--topo', default=TOPO_PATH, help='Archivo de topología')
+    parser.add_argument('--names', default=NAMES_PATH, help='Archivo de nombres')
+    parser.add_argument('--trace', metavar='ID_O_NODO',
+                       help='Recorrido de un mensaje (o mensajes hacia un nodo) en los logs de la última corrida y salir')
+    parser.add_argument('--log-rate', type=float, default=DATA_LOG_RATE,
+                       help='Eventos por mensaje por segundo en el log de cada nodo (0: sin límite; '
+                            'usar el mismo valor con --trace)')
+    parser.add_argument('--ready-timeout', type=float, default=READY_TIMEOUT,
+                       help='Segundos de espera a que todos los nodos estén escuchando')
     
     args = parser.parse_args()
+    if args.transport == 'xmpp' and args.engine != 'threads':
+        parser.error("--transport xmpp solo funciona con --engine threads")
     
     # Agregar el path para los imports
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -197,12 +428,20 @@ def main():
             print("Error: Modo send requiere --from-node, --to-node y --message")
             sys.exit(1)
         
-        manager = NetworkManager()
+        manager = NetworkManager(args.topo, args.names, args.workers)
         manager.send_test_message(args.from_node, args.to_node, args.message, args.algorithm)
         return
     
+    if args.metrics:
+        NetworkManager(args.topo, args.names, args.workers).show_metrics()
+        return
+    
+    if args.trace:
+        NetworkManager(args.topo, args.names, args.workers, log_rate=args.log_rate).show_trace(args.trace)
+        return
+    
     # Modo completo: iniciar todos los nodos
-    manager = NetworkManager()
+    manager = NetworkManager(args.topo, args.names, args.workers, args.xmpp_port, args.log_rate)
     
     def signal_handler(sig, frame):
         print("\n\nSeñal de interrupción recibida...")
@@ -212,10 +451,7 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     
     # Iniciar todos los nodos con el algoritmo especificado
-    manager.start_all_nodes(args.algorithm)
-    
-    # Pequeña pausa para que los nodos se inicialicen
-    time.sleep(5)
+    manager.start_all_nodes(args.algorithm, args.engine, args.ready_timeout, args.transport)
     
     # Menú interactivo
     try:
@@ -229,10 +465,12 @@ def main():
             print("3. Ver logs de un nodo específico")
             print("4. Ejecutar prueba automática")
             print("5. Cambiar algoritmo (requiere reinicio)")
-            print("6. Salir y detener todos los nodos")
+            print("6. Ver métricas de la red")
+            print("7. Rastrear un mensaje (por ID o por nodo destino)")
+            print("8. Salir y detener todos los nodos")
             print("="*60)
             
-            choice = input("Selecciona una opción (1-6): ").strip()
+            choice = input("Selecciona una opción (1-8): ").strip()
             
             if choice == '1':
                 print("\n--- ENVIAR MENSAJE ---")
@@ -259,9 +497,11 @@ def main():
             elif choice == '4':
                 print("\n--- PRUEBA AUTOMÁTICA ---")
                 print("Enviando mensaje de prueba de A a G...")
-                manager.send_test_message('A', 'G', 'Mensaje de prueba automática', args.algorithm)
+                message_id = manager.send_test_message('A', 'G', 'Mensaje de prueba automática', args.algorithm)
                 time.sleep(2)
-                print("Prueba completada. Revisa los logs.")
+                print("Prueba completada.")
+                if message_id:
+                    manager.show_trace(message_id)
                 
             elif choice == '5':
                 print("\n--- CAMBIAR ALGORITMO ---")
@@ -271,18 +511,25 @@ def main():
                     print(f"Reiniciando con algoritmo: {new_algorithm}")
                     manager.stop_all_nodes()
                     args.algorithm = new_algorithm
-                    manager = NetworkManager()
-                    manager.start_all_nodes(args.algorithm)
-                    time.sleep(5)
+                    manager = NetworkManager(args.topo, args.names, args.workers, args.xmpp_port, args.log_rate)
+                    manager.start_all_nodes(args.algorithm, args.engine, args.ready_timeout, args.transport)
                 else:
                     print("Algoritmo no válido")
                     
             elif choice == '6':
+                manager.show_metrics()
+                
+            elif choice == '7':
+                key = input("ID del mensaje o nodo destino: ").strip()
+                if key:
+                    manager.show_trace(key.upper() if key.upper() in manager.node_addresses else key)
+                    
+            elif choice == '8':
                 print("Saliendo...")
                 break
                 
             else:
-                print("Opción no válida. Por favor elige 1-6.")
+                print("Opción no válida. Por favor elige 1-8.")
                 
     except KeyboardInterrupt:
         print("\nInterrupción recibida...")
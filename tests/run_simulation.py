@@ -0,0 +1,193 @@
+import sys
+import os
+import time
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.config_loader import load_config
+from src.utils.helpers import new_message_id
+from src.utils.topology_generator import ring_topology, grid_topology
+from src.network.virtual import VirtualNetwork, ALGORITHMS
+
+
+def load_topology(args):
+    if args.ring:
+        return ring_topology(args.ring)
+    if args.grid:
+        return grid_topology(args.grid, seed=args.seed)
+    return load_config(os.path.join(project_root, args.topo))
+
+
+def network_links(network):
+    return sorted({
+        tuple(sorted((node_id, neighbor_id)))
+        for node_id, node in network.nodes.items()
+        for neighbor_id in node.neighbors
+        if neighbor_id in network.nodes
+    })
+
+
+def schedule_churn(network, changes, duration, rng):
+    """Programa cambios de costo aleatorios repartidos a lo largo de la simulación"""
+    links = network_links(network)
+    times = []
+    for _ in range(changes):
+        a, b = rng.choice(links)
+        cost = rng.randint(1, 10)
+        delay = rng.uniform(0, duration)
+        times.append(network.now() + delay)
+        network.call_later(delay, network.change_link_cost, a, b, cost)
+    return times
+
+
+def schedule_failures(network, failures, duration, repair, rng):
+    """
+    Programa caídas de enlaces al azar durante la simulación; cada enlace
+    vuelve `repair` segundos después. Devuelve los instantes de caída y de
+    vuelta, que son los eventos tras los que se mide la convergencia.
+    """
+    links = network_links(network)
+    down = set()
+
+    def fail():
+        candidates = [link for link in links if link not in down]
+        if not candidates:
+            return
+        link = rng.choice(candidates)
+        down.add(link)
+        network.fail_link(*link)
+        network.call_later(repair, restore, link)
+
+    def restore(link):
+        down.discard(link)
+        network.restore_link(*link)
+
+    times = []
+    for _ in range(failures):
+        delay = rng.uniform(0, duration)
+        times += [network.now() + delay, network.now() + delay + repair]
+        network.call_later(delay, fail)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simula una red completa en un solo proceso, con reloj virtual')
+    parser.add_argument('--algorithm', '-a', default='flooding', choices=ALGORITHMS,
+                        help='Algoritmo de enrutamiento a usar')
+    parser.add_argument('--topo', default='config/topo-ejemplo.json',
+                        help='Archivo de topología')
+    parser.add_argument('--ring', type=int, help='Usar un anillo generado de N nodos')
+    parser.add_argument('--grid', type=int, help='Usar una grilla generada de N x N nodos')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla de la simulación')
+    parser.add_argument('--link-delay', type=float, default=0.001,
+                        help='Segundos de demora por unidad de costo de enlace')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Jitter máximo por enlace (s)')
+    parser.add_argument('--warmup', type=float, default=60.0,
+                        help='Segundos simulados antes de enviar mensajes (convergencia inicial)')
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help='Segundos simulados de operación con churn después del warmup')
+    parser.add_argument('--churn', type=int, default=0,
+                        help='Cambios de costo de enlace aleatorios durante --duration')
+    parser.add_argument('--failures', type=int, default=0,
+                        help='Caídas de enlace aleatorias durante --duration')
+    parser.add_argument('--repair', type=float, default=30.0,
+                        help='Segundos que tarda en volver un enlace caído')
+    parser.add_argument('--liveness', action='store_true',
+                        help='Detectar las caídas con hellos y dead interval en lugar de avisar al instante')
+    parser.add_argument('--dynamic-costs', action='store_true',
+                        help='Costos de enlace según el RTT medido con los hellos (activa --liveness)')
+    parser.add_argument('--slow-link', metavar='A:B:SEGUNDOS',
+                        help='Después del warmup, agregar esa demora a un enlace y esperar --settle')
+    parser.add_argument('--settle', type=float, default=30.0,
+                        help='Segundos simulados después de --slow-link antes de enviar mensajes')
+    parser.add_argument('--codec', default='json', choices=['json', 'binary'],
+                        help='Codec de los frames entre nodos')
+    parser.add_argument('--from-node', help='Nodo origen (por defecto el primero)')
+    parser.add_argument('--to-node', help='Nodo destino (por defecto el último)')
+    parser.add_argument('--messages', type=int, default=100, help='Mensajes a enviar')
+    args = parser.parse_args()
+    if args.dynamic_costs:
+        args.liveness = True
+
+    topo_config = load_topology(args)
+    names = list(topo_config['config'])
+    from_node = args.from_node or names[0]
+    to_node = args.to_node or names[-1]
+
+    wall_start = time.perf_counter()
+    network = VirtualNetwork.from_config(topo_config, args.algorithm, seed=args.seed,
+                                         cost_delay=args.link_delay, jitter=args.jitter,
+                                         liveness=args.liveness, codec=args.codec,
+                                         dynamic_costs=args.dynamic_costs)
+    network.start()
+    network.run(duration=args.warmup)
+    initial_convergence = network.last_route_change
+    warmup_frames = dict(network.frames_by_type)
+
+    churn_times = []
+    failure_times = []
+    if args.duration:
+        rng = network.scheduler.random
+        churn_times = schedule_churn(network, args.churn, args.duration, rng)
+        failure_times = schedule_failures(network, args.failures, args.duration, args.repair, rng)
+        # Deja terminar las reparaciones programadas cerca del final
+        network.run(duration=args.duration + (args.repair if args.failures else 0))
+    event_times = sorted(churn_times + failure_times)
+    slow_convergence = None
+    if args.slow_link:
+        a, b, delay = args.slow_link.split(':')
+        slowed_at = network.now()
+        network.slow_link(a, b, float(delay))
+        network.run(duration=args.settle)
+        slow_convergence = network.convergence_times([slowed_at])[0]
+    convergence = network.convergence_times(event_times)
+
+    data_start_frames = network.frames_by_type.get("message", 0)
+    for i in range(args.messages):
+        network.inject({
+            "proto": args.algorithm,
+            "type": "message",
+            "id": new_message_id(from_node),
+            "from": from_node,
+            "to": to_node,
+            "ttl": len(names),
+            "headers": [],
+            "payload": f"mensaje {i}"
+        })
+        network.run()
+    wall_time = time.perf_counter() - wall_start
+    network.shutdown()
+
+    latencies = sorted(network.delivery_latencies())
+    data_frames = network.frames_by_type.get("message", 0) - data_start_frames
+
+    print(f"Algoritmo: {args.algorithm}  nodos: {len(names)}  semilla: {args.seed}")
+    if initial_convergence is not None:
+        print(f"Convergencia inicial: {initial_convergence:.3f} s simulados")
+    print(f"Frames de control en el warmup: {warmup_frames}")
+    if convergence:
+        print(f"Churn: {args.churn} cambios y {args.failures} caídas en {args.duration:.0f} s, "
+              f"convergencia por evento: media {sum(convergence) / len(convergence):.3f} s, "
+              f"max {max(convergence):.3f} s")
+    if slow_convergence is not None:
+        cost_changes = sum(node.metrics.snapshot()["counters"].get("link_cost_changes", 0)
+                           for node in network.nodes.values())
+        print(f"Enlace lento {args.slow_link}: {cost_changes} cambios de costo, "
+              f"última ruta cambiada {slow_convergence:.3f} s después")
+    print(f"Frames por tipo: {network.frames_by_type}")
+    print(f"Bytes enviados ({args.codec}): {network.bytes_sent}")
+    print(f"Mensajes entregados {from_node} -> {to_node}: {len(latencies)}/{args.messages}")
+    if latencies:
+        print(f"Latencia simulada: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"max {latencies[-1] * 1000:.2f} ms")
+    if args.messages:
+        print(f"Frames por mensaje: {data_frames / args.messages:.1f}")
+    print(f"Tiempo simulado: {network.now():.1f} s en {wall_time:.2f} s reales "
+          f"({network.scheduler.processed} eventos)")
+
+
+if __name__ == '__main__':
+    main()
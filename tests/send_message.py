@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 
 # Agregar el directorio raíz del proyecto al path de Python
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -7,60 +8,75 @@ sys.path.insert(0, project_root)
 
 # Ahora importamos los módulos de src
 from src.utils.config_loader import load_config, get_node_addresses
+from src.utils.helpers import encode_frame, new_message_id
+from src.transport.socket_client import ConnectionPool
 
-import socket
 import json
 import time
 
-def send_message(target_node, message_data):
+# Conexiones reutilizables: varios mensajes al mismo nodo van por una sola
+pool = ConnectionPool()
+
+def send_message(target_node, message_data, node_addresses=None, quiet=False):
     """Envía un mensaje a un nodo específico"""
     try:
         # Cargar configuración
-        names_config = load_config('config/names-ejemplo.json')
-        node_addresses = get_node_addresses(names_config)
-        
+        if node_addresses is None:
+            names_config = load_config('config/names-ejemplo.json')
+            node_addresses = get_node_addresses(names_config)
+
         if target_node not in node_addresses:
             print(f"Error: Nodo {target_node} no encontrado")
             return False
-        
-        target_address = node_addresses[target_node]
-        host, port_str = target_address.split(':')
-        port = int(port_str)
-        
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.connect((host, port))
-        sock.send(json.dumps(message_data).encode())
-        sock.close()
-        
-        print(f"Mensaje enviado a {target_node} ({host}:{port})")
+
+        pool.send(node_addresses[target_node], encode_frame(message_data))
+
+        if not quiet:
+            print(f"Mensaje enviado a {target_node} ({node_addresses[target_node]})")
         return True
-        
+
     except Exception as e:
         print(f"Error enviando mensaje: {e}")
         return False
 
 def main():
-    if len(sys.argv) < 4:
-        print("Uso: python tests/send_message.py <nodo_origen> <nodo_destino> <mensaje>")
-        print("Ejemplo: python tests/send_message.py A G 'Hola mundo'")
-        sys.exit(1)
-    
-    from_node = sys.argv[1]
-    to_node = sys.argv[2]
-    message_text = ' '.join(sys.argv[3:])
-    
-    message = {
-        "proto": "flooding",
-        "type": "message",
-        "from": from_node,
-        "to": to_node,
-        "ttl": 10,
-        "headers": [],
-        "payload": message_text,
-        "timestamp": int(time.time())
-    }
-    
-    send_message(from_node, message)
+    parser = argparse.ArgumentParser(
+        description='Envía un mensaje a la red a través del nodo origen',
+        epilog="Ejemplo: python tests/send_message.py A G 'Hola mundo'")
+    parser.add_argument('from_node', help='Nodo origen')
+    parser.add_argument('to_node', help='Nodo destino')
+    parser.add_argument('message', nargs='+', help='Mensaje')
+    parser.add_argument('--count', '-n', type=int, default=1,
+                        help='Mensajes a enviar por la misma conexión')
+    args = parser.parse_args()
+
+    from_node = args.from_node
+    to_node = args.to_node
+    message_text = ' '.join(args.message)
+
+    node_addresses = get_node_addresses(load_config('config/names-ejemplo.json'))
+    start = time.perf_counter()
+    sent = 0
+    for _ in range(args.count):
+        message = {
+            "proto": "flooding",
+            "type": "message",
+            "id": new_message_id(from_node),
+            "from": from_node,
+            "to": to_node,
+            "ttl": 10,
+            "headers": [],
+            "payload": message_text
+        }
+
+        if not send_message(from_node, message, node_addresses, quiet=args.count > 1):
+            break
+        sent += 1
+    pool.close()
+
+    if args.count > 1:
+        elapsed = time.perf_counter() - start
+        print(f"{sent} mensajes en {elapsed:.2f} s ({sent / elapsed:.0f}/s)")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,139 @@
+import sys
+import os
+
+import pytest
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.codec import BinaryCodec, CodecError, decode_body, patch_ttl, names_digest, MAGIC
+from src.utils.helpers import encode_frame, FRAME_HEADER
+
+NAMES = ["A", "B", "C", "D", "E", "F", "G", "H", "I"]
+
+
+def data_message(**fields):
+    message = {
+        "proto": "lsr",
+        "type": "message",
+        "id": "A-1f3a",
+        "from": "A",
+        "to": "H",
+        "ttl": 10,
+        "headers": [],
+        "payload": "hola",
+    }
+    message.update(fields)
+    return message
+
+
+@pytest.mark.parametrize("message", [
+    data_message(),
+    data_message(payload="ñandú ✓ " * 100),
+    data_message(payload={"n": [1, 2.5, None], "ok": True}),
+    data_message(payload=""),
+    data_message(id="externo sin formato"),
+    data_message(id="A-0001f"),
+    data_message(id=42),
+    data_message(**{"from": "Z", "to": "Y"}),
+    data_message(**{"from": "Z" * 300}),
+    data_message(ttl=100000),
+    data_message(ttl="5"),
+    data_message(type="otro", proto="nuevo"),
+    data_message(headers=[{"flow": "abc"}]),
+    data_message(timestamp=1700000000),
+    {"type": "hello", "from": "B", "headers": [{"codec": "bin1", "names": "x"}]},
+    {"type": "lsa", "from": "C", "seq": 7, "neighbors": {"A": 1, "D": 3}, "id": "C-7"},
+    {},
+])
+def test_round_trip_is_lossless(message):
+    codec = BinaryCodec(NAMES)
+    body = codec.encode(message)
+    assert body[0] == MAGIC
+    assert codec.decode(body) == message
+    assert decode_body(memoryview(body), codec) == message
+
+
+def test_interned_fields_are_compact():
+    codec = BinaryCodec(NAMES)
+    message = data_message()
+    assert len(codec.encode(message)) < len(encode_frame(message)) - FRAME_HEADER.size
+
+
+def test_routing_header_reads_a_plain_data_message():
+    codec = BinaryCodec(NAMES)
+    body = codec.encode(data_message())
+    assert codec.routing_header(body) == ("A", "H", 10)
+    assert codec.message_id(body) == "A-1f3a"
+
+
+@pytest.mark.parametrize("message", [
+    # Campos fuera de la cabecera (extra, nombres en línea) obligan a decodificar
+    data_message(timestamp=1),
+    data_message(headers=[{"flow": "abc"}]),
+    data_message(to="Z"),
+    data_message(ttl="5"),
+    data_message(type="echo"),
+    {"type": "message", "from": "A", "ttl": 3},
+])
+def test_routing_header_needs_the_full_header(message):
+    codec = BinaryCodec(NAMES)
+    assert codec.routing_header(codec.encode(message)) is None
+
+
+def test_routing_header_ignores_json_and_short_bodies():
+    codec = BinaryCodec(NAMES)
+    assert codec.routing_header(b'{"type": "message"}') is None
+    assert codec.routing_header(codec.encode(data_message())[:5]) is None
+
+
+def test_message_id_of_a_string_id():
+    codec = BinaryCodec(NAMES)
+    assert codec.message_id(codec.encode(data_message(id="sin-formato-X"))) == "sin-formato-X"
+
+
+def test_patch_ttl_rewrites_in_place():
+    codec = BinaryCodec(NAMES)
+    frame = bytearray(FRAME_HEADER.pack(0) + codec.encode(data_message(payload="x" * 1000)))
+    body = memoryview(frame)[FRAME_HEADER.size:]
+    before = bytes(frame)
+    patch_ttl(body, 9)
+    assert codec.routing_header(body) == ("A", "H", 9)
+    assert codec.decode(body) == data_message(payload="x" * 1000, ttl=9)
+    # Solo cambian los dos bytes del TTL
+    assert sum(a != b for a, b in zip(before, frame)) <= 2
+
+
+def test_decode_rejects_malformed_bodies():
+    codec = BinaryCodec(NAMES)
+    body = codec.encode(data_message(**{"from": "Z"}))
+    with pytest.raises(CodecError):
+        codec.decode(body[:3])
+    with pytest.raises(CodecError):
+        codec.decode(bytes([0xB2]) + body[1:])
+    with pytest.raises(CodecError):
+        # Nombre en línea cortado
+        codec.decode(body[:12])
+
+
+def test_decode_body_without_codec():
+    codec = BinaryCodec(NAMES)
+    assert decode_body(b'{"a": 1}') == {"a": 1}
+    with pytest.raises(CodecError):
+        decode_body(codec.encode(data_message()))
+    with pytest.raises(ValueError):
+        decode_body(b"basura")
+
+
+def test_hello_offer_requires_the_same_names():
+    codec = BinaryCodec(NAMES)
+    assert codec.accepts([{"codec": "bin1", "names": names_digest(NAMES)}])
+    assert not codec.accepts([{"codec": "bin1", "names": names_digest(NAMES + ["J"])}])
+    assert not codec.accepts([{"codec": "bin2", "names": codec.digest}])
+    assert not codec.accepts(None)
+    assert BinaryCodec(NAMES).accepts([BinaryCodec(list(NAMES)).offer()])
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
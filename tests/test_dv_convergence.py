@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.config_loader import load_config
+from src.utils.topology_generator import ring_topology, grid_topology
+from src.network.routing import Graph
+from src.network.virtual import VirtualNetwork
+from src.algorithms.distance_vector import DV_HOLD_DOWN, DV_FLUSH_INTERVAL
+
+# Segundos simulados para converger después de una caída: hold-down más
+# unas rondas de updates disparados
+CONVERGENCE_BOUND = DV_HOLD_DOWN + 20.0
+
+
+def without_link(topology, a, b):
+    config = {node_id: dict(neighbors) for node_id, neighbors in topology['config'].items()}
+    del config[a][b]
+    del config[b][a]
+    return config
+
+
+def fail_and_settle(topology, a, b, duration):
+    network = VirtualNetwork.from_config(topology, 'dvr', seed=1, cost_delay=0.001)
+    network.start()
+    network.run(duration=60)
+    network.fail_link(a, b)
+    failed_at = network.now()
+    dv_before = network.frames_by_type.get('dv', 0)
+    network.run(duration=duration)
+    return network, failed_at, network.frames_by_type.get('dv', 0) - dv_before
+
+
+def assert_shortest_routes(network, config):
+    """Cada nodo tiene exactamente las rutas y costos de la SPF sobre la topología que quedó"""
+    graph = Graph.from_topology(config)
+    for node_id, node in network.nodes.items():
+        expected = {
+            destination: route['cost']
+            for destination, route in graph.shortest_paths(node_id).routes().items()
+            if destination != node_id
+        }
+        table = node.routing_algorithm.routing_table
+        actual = {destination: route['cost'] for destination, route in table.items() if route['next_hop']}
+        assert actual == expected, f"{node_id}: {actual} != {expected}"
+
+
+def test_ring_failure_converges():
+    topology = ring_topology(8)
+    network, failed_at, _ = fail_and_settle(topology, 'N0', 'N1', 2 * CONVERGENCE_BOUND)
+    assert_shortest_routes(network, without_link(topology, 'N0', 'N1'))
+    assert network.last_route_change - failed_at < CONVERGENCE_BOUND
+
+
+def test_grid_failure_converges():
+    topology = grid_topology(6, max_cost=5, seed=3)
+    network, failed_at, _ = fail_and_settle(topology, 'N14', 'N15', 2 * CONVERGENCE_BOUND)
+    assert_shortest_routes(network, without_link(topology, 'N14', 'N15'))
+    assert network.last_route_change - failed_at < CONVERGENCE_BOUND
+
+
+def test_isolated_destination_is_withdrawn():
+    # H solo cuelga de F: al caer el enlace nadie debe contar a infinito por un lazo
+    topology = load_config(os.path.join(project_root, 'config', 'topo-ejemplo.json'))
+    network, failed_at, dv_frames = fail_and_settle(topology, 'F', 'H', DV_FLUSH_INTERVAL + CONVERGENCE_BOUND)
+    for node_id, node in network.nodes.items():
+        assert 'H' not in node.routing_algorithm.routing_table, node_id
+    assert network.last_route_change - failed_at < CONVERGENCE_BOUND
+    assert dv_frames < 500
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
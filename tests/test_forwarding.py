@@ -0,0 +1,122 @@
+import sys
+import os
+from collections import Counter
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.network.forwarding import ForwardingTable, MAX_UNKNOWN_DESTINATIONS, header_value, message_flow
+
+
+class RecordingLogger:
+    """Guarda los warnings en lugar de escribirlos"""
+
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, msg, *args):
+        self.warnings.append(msg % args)
+
+
+ROUTES = {
+    "B": {"next_hop": "B", "cost": 1},
+    "D": {"next_hop": "B", "next_hops": ["B", "C"], "cost": 2},
+    "E": {"next_hop": "B", "next_hops": ["B", "C", "F"], "cost": 3},
+    "Z": {"next_hop": None, "cost": float("inf")},
+}
+
+
+def table(seed="A"):
+    fib = ForwardingTable(seed=seed)
+    fib.publish(ROUTES)
+    return fib
+
+
+def test_single_path_lookup():
+    fib = table()
+    assert fib.lookup("B") == "B"
+    assert fib.lookup("B", "X", "flujo") == "B"
+    assert "Z" not in fib
+    assert len(fib) == 3
+
+
+def test_flow_keeps_its_next_hop():
+    fib = table()
+    first = fib.lookup("E", "A", "flujo-1")
+    assert all(fib.lookup("E", "A", "flujo-1") == first for _ in range(100))
+    # Republicar la misma tabla, o armarla de nuevo con la misma semilla, no mueve el flujo
+    fib.publish(ROUTES)
+    assert fib.lookup("E", "A", "flujo-1") == first
+    assert table().lookup("E", "A", "flujo-1") == first
+
+
+def test_flows_spread_over_equal_cost_hops():
+    fib = table()
+    counts = Counter(fib.lookup("E", "A", f"flujo-{i}") for i in range(3000))
+    assert set(counts) == {"B", "C", "F"}
+    assert min(counts.values()) > 3000 / 3 * 0.8
+
+
+def test_source_is_part_of_the_flow():
+    fib = table()
+    hops = {fib.lookup("D", f"N{i}") for i in range(50)}
+    assert hops == {"B", "C"}
+
+
+def test_seed_changes_the_choice_per_node():
+    flows = [f"flujo-{i}" for i in range(200)]
+    a = [table("A").lookup("E", "S", flow) for flow in flows]
+    b = [table("B").lookup("E", "S", flow) for flow in flows]
+    assert a != b
+
+
+def test_missing_destination_is_reported_once_per_version():
+    logger = RecordingLogger()
+    fib = ForwardingTable(logger, seed="A")
+    fib.publish(ROUTES)
+    for _ in range(5):
+        assert fib.lookup("Q") is None
+        assert fib.lookup("Z") is None
+    assert len(logger.warnings) == 2
+    # Una tabla nueva puede tener ruta: se vuelve a avisar
+    fib.publish(ROUTES)
+    fib.lookup("Q")
+    assert len(logger.warnings) == 3
+    assert fib.stats()["misses"] == 11
+
+
+def test_negative_cache_is_bounded():
+    logger = RecordingLogger()
+    fib = ForwardingTable(logger)
+    for i in range(MAX_UNKNOWN_DESTINATIONS + 100):
+        fib.lookup(f"N{i}")
+    assert len(fib.unknown) == MAX_UNKNOWN_DESTINATIONS
+    assert len(logger.warnings) == MAX_UNKNOWN_DESTINATIONS
+
+
+def test_publish_reports_changes_and_stats():
+    changes = []
+    fib = ForwardingTable(seed="A")
+    fib.on_publish = changes.append
+    fib.publish(ROUTES)
+    fib.publish(ROUTES)
+    fib.publish_next_hops({"B": "B"})
+    assert changes == [True, False, True]
+    fib.lookup("B")
+    assert fib.stats() == {"version": 3, "entries": 1, "multipath": 0, "hits": 1, "misses": 0}
+
+
+def test_flow_header():
+    message = {"headers": [{"reply_to": "x"}, "basura", {"flow": 7}]}
+    assert message_flow(message) == 7
+    assert header_value(message, "reply_to") == "x"
+    assert message_flow({"headers": None}) is None
+    assert message_flow({}) is None
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,64 @@
+import sys
+import os
+
+import pytest
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.helpers import FrameDecoder, FrameError, FRAME_HEADER, encode_frame, pack_frame, decode_message
+
+
+def test_frames_split_across_reads():
+    frames = pack_frame(b'{"a": 1}') + pack_frame(b'{"b": 2}')
+    decoder = FrameDecoder()
+    received = []
+    # Un byte por lectura: ninguna lectura trae un frame entero
+    for i in range(len(frames)):
+        received.extend(decoder.feed(frames[i:i + 1]))
+    assert received == [b'{"a": 1}', b'{"b": 2}']
+    assert decoder.buffer == bytearray()
+
+
+def test_incomplete_frame_waits_for_more_data():
+    frame = pack_frame(b"payload")
+    decoder = FrameDecoder()
+    assert decoder.feed(frame[:FRAME_HEADER.size + 3]) == []
+    assert decoder.feed(frame[FRAME_HEADER.size + 3:]) == [b"payload"]
+
+
+def test_several_frames_in_one_read():
+    messages = [{"id": str(i), "payload": "x" * i} for i in range(5)]
+    data = b"".join(encode_frame(message) for message in messages)
+    assert [decode_message(body) for body in FrameDecoder().feed(data)] == messages
+
+
+def test_with_header_keeps_the_length_prefix():
+    frame = pack_frame(b"hola")
+    (received,) = FrameDecoder(with_header=True).feed(frame + pack_frame(b"x")[:2])
+    assert isinstance(received, bytearray)
+    assert received == frame
+
+
+def test_empty_body():
+    assert FrameDecoder().feed(pack_frame(b"")) == [b""]
+
+
+def test_oversized_frame_is_rejected_from_the_header():
+    decoder = FrameDecoder(max_frame_size=16)
+    # Basta la cabecera para cortar: no se espera a recibir el cuerpo
+    with pytest.raises(FrameError):
+        decoder.feed(FRAME_HEADER.pack(17))
+
+
+def test_frame_at_the_limit_is_accepted():
+    decoder = FrameDecoder(max_frame_size=16)
+    assert decoder.feed(pack_frame(b"x" * 16)) == [b"x" * 16]
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
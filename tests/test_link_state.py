@@ -0,0 +1,145 @@
+import sys
+import os
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.config_loader import load_config
+from src.network.simulator import EventScheduler
+from src.network.virtual import VirtualNetwork
+from src.algorithms.link_state import (LinkStateDatabase, SpfThrottle, LSA_MAX_AGE, LSA_REFRESH_INTERVAL,
+                                       LSDB_AGE_CHECK_INTERVAL)
+
+
+class FakeClock:
+    """Reloj manual: los tests avanzan el tiempo con advance()"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+
+def test_lsdb_installs_only_newer_sequences():
+    lsdb = LinkStateDatabase(clock=FakeClock())
+    assert lsdb.install("A", 1, {"B": 1}) == (True, True)
+    assert lsdb.install("A", 1, {"B": 5}) == (False, False)
+    assert lsdb.install("A", 0, {"B": 5}) == (False, False)
+    # Secuencia nueva con los mismos enlaces: se acepta pero la SPF no cambia
+    assert lsdb.install("A", 2, {"B": 1}) == (True, False)
+    assert lsdb.install("A", 3, {"B": 2}) == (True, True)
+    assert lsdb.sequence_of("A") == 3
+    assert lsdb.sequence_of("Z") is None
+
+
+def test_lsdb_expires_stale_origins():
+    clock = FakeClock()
+    lsdb = LinkStateDatabase(max_age=100, clock=clock)
+    lsdb.install("A", 1, {"B": 1})
+    clock.advance(50)
+    lsdb.install("B", 1, {"A": 1})
+    clock.advance(60)
+    assert lsdb.expire() == ["A"]
+    assert len(lsdb) == 1
+    assert lsdb.sequence_of("A") is None
+
+
+def test_lsdb_refresh_restarts_the_age():
+    clock = FakeClock()
+    lsdb = LinkStateDatabase(max_age=100, clock=clock)
+    lsdb.install("A", 1, {"B": 1})
+    for seq in range(2, 6):
+        clock.advance(80)
+        lsdb.install("A", seq, {"B": 1})
+        assert lsdb.expire() == []
+    clock.advance(101)
+    assert lsdb.expire() == ["A"]
+
+
+def test_lsdb_lsas_rebuild_installed_state():
+    lsdb = LinkStateDatabase(clock=FakeClock())
+    lsdb.install("A", 4, {"B": 1})
+    lsdb.install("B", 2, {"A": 1, "C": 3})
+    lsas = {lsa["from"]: lsa for lsa in lsdb.lsas()}
+    assert lsas["A"]["seq"] == 4 and lsas["A"]["id"] == "A-4"
+    assert lsas["B"]["neighbors"] == {"A": 1, "C": 3}
+
+
+def throttle(max_hold=1.0):
+    # El planificador tiene now() y call_later(): hace de nodo con reloj virtual
+    scheduler = EventScheduler()
+    runs = []
+    spf = SpfThrottle(scheduler, lambda: runs.append(scheduler.now()), initial_delay=0.05, max_hold=max_hold)
+    return scheduler, spf, runs
+
+
+def test_spf_throttle_coalesces_a_burst():
+    scheduler, spf, runs = throttle()
+    for _ in range(10):
+        spf.request()
+    scheduler.run()
+    assert runs == [0.05]
+    assert (spf.requests, spf.runs) == (10, 1)
+
+
+def test_spf_throttle_backs_off_exponentially():
+    scheduler, spf, runs = throttle(max_hold=1.0)
+    # Un cambio apenas termina cada corrida: la espera se duplica hasta max_hold
+    spf.request()
+    for _ in range(6):
+        scheduler.run()
+        spf.request()
+    scheduler.run()
+    gaps = [round(b - a, 6) for a, b in zip(runs, runs[1:])]
+    assert gaps == [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+
+
+def test_spf_throttle_resets_after_a_quiet_period():
+    scheduler, spf, runs = throttle(max_hold=1.0)
+    for _ in range(5):
+        spf.request()
+        scheduler.run()
+    assert spf.hold == 1.0
+    scheduler.run(until=scheduler.now() + 2.0)
+    spf.request()
+    scheduler.run()
+    assert round(runs[-1] - 2.0 - runs[-2], 6) == 0.05
+
+
+def test_spf_throttle_cancel():
+    scheduler, spf, runs = throttle()
+    spf.request()
+    spf.cancel()
+    scheduler.run()
+    assert runs == []
+
+
+def test_lsas_are_refreshed_and_stale_origins_age_out():
+    topology = load_config(os.path.join(project_root, 'config', 'topo-ejemplo.json'))
+    network = VirtualNetwork.from_config(topology, 'lsr', seed=1)
+    network.start()
+    # Varias veces max_age: el refresco mantiene las LSAs de todos los demás
+    network.run(duration=3 * LSA_MAX_AGE)
+    for node_id, node in network.nodes.items():
+        assert set(node.routing_algorithm.lsdb.entries) == set(network.nodes) - {node_id}
+    assert network.nodes['A'].routing_algorithm.lsdb.sequence_of('H') > 3 * LSA_MAX_AGE // LSA_REFRESH_INTERVAL
+
+    # H deja de reoriginar su LSA: los demás la sacan al superar max_age
+    network.nodes['H'].shutdown()
+    network.run(duration=LSA_MAX_AGE + LSA_REFRESH_INTERVAL + LSDB_AGE_CHECK_INTERVAL)
+    for node_id, node in network.nodes.items():
+        if node_id != 'H':
+            assert node.routing_algorithm.lsdb.sequence_of('H') is None, node_id
+            assert 'H' not in node.routing_algorithm.topology_snapshot(), node_id
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
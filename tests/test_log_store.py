@@ -0,0 +1,109 @@
+import sys
+import os
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.log_store import LogStore, SEGMENT_PREFIX
+
+
+def received(message_id, destination, payload="hola"):
+    return ("12:00:00 - data - INFO - Mensaje recibido: {'proto': 'lsr', 'type': 'message', "
+            f"'id': '{message_id}', 'from': 'A', 'to': '{destination}', 'ttl': 5, 'payload': '{payload}'}}")
+
+
+def transit(message_id, destination):
+    return (f"12:00:00 - data - INFO - Mensaje en tránsito: {{'id': '{message_id}', "
+            f"'from': 'A', 'to': '{destination}', 'ttl': 4}}")
+
+
+def segment_names(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(SEGMENT_PREFIX))
+
+
+def test_trace_follows_a_message_across_nodes(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.append("A", received("A-1", "H"))
+    store.append("A", received("A-2", "G"))
+    store.append("I", transit("A-1", "H"))
+    store.append("D", "12:00:00 - D - INFO - Conectado a E en localhost:8004")
+    store.append("H", received("A-1", "H"))
+    assert [node_id for node_id, _ in store.trace("A-1")] == ["A", "I", "H"]
+    assert "Mensaje en tránsito" in store.trace("A-1")[1][1]
+    assert store.trace("A-9") == []
+    store.close()
+
+
+def test_destination_index_and_limit(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=400)
+    for i in range(10):
+        store.append("A", received(f"A-{i}", "G" if i % 2 else "H"))
+    lines = store.to_destination("G")
+    assert [line.split("'id': '")[1][:3] for _, line in lines] == ["A-1", "A-3", "A-5", "A-7", "A-9"]
+    # Con limit, las últimas aunque estén repartidas en varios segmentos
+    assert store.stats()["segments"] > 1
+    assert store.to_destination("G", limit=3) == lines[-3:]
+    store.close()
+
+
+def test_rotation_bounds_disk_and_drops_old_index(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=1000, max_segments=3)
+    for i in range(100):
+        store.append("A", received(f"A-{i}", "H", payload="x" * 50))
+    assert len(segment_names(tmp_path)) == 3
+    stats = store.stats()
+    assert stats["segments"] == 3
+    assert stats["bytes"] <= 3 * 1000
+    # Lo del segmento borrado ya no se encuentra; lo último sí
+    assert store.trace("A-0") == []
+    assert len(store.trace("A-99")) == 1
+    assert stats["message_ids"] == len(store.to_destination("H"))
+    store.close()
+
+
+def test_line_larger_than_a_segment_gets_its_own(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=100)
+    store.append("A", received("A-1", "H", payload="x" * 500))
+    store.append("A", received("A-2", "H"))
+    assert store.stats()["segments"] == 2
+    assert len(store.trace("A-1")) == 1
+    store.close()
+
+
+def test_tail_keeps_recent_lines_per_node(tmp_path):
+    store = LogStore(str(tmp_path), recent_lines=5)
+    for i in range(20):
+        store.append("A", f"linea {i}")
+    store.append("B", "otra")
+    assert store.tail("A", 3) == ["linea 17", "linea 18", "linea 19"]
+    assert store.tail("A", 100) == [f"linea {i}" for i in range(15, 20)]
+    assert store.tail("B") == ["otra"]
+    assert store.tail("Z") == []
+    store.close()
+
+
+def test_reopen_rebuilds_the_index(tmp_path):
+    store = LogStore(str(tmp_path), segment_size=500)
+    for i in range(10):
+        store.append("A", received(f"A-{i}", "H"))
+    store.append("H", received("A-4", "H"))
+    store.close()
+
+    reopened = LogStore(str(tmp_path), segment_size=500)
+    assert [node_id for node_id, _ in reopened.trace("A-4")] == ["A", "H"]
+    assert reopened.tail("H") == [received("A-4", "H")]
+    # Lo nuevo sigue en un segmento posterior, no pisa los anteriores
+    reopened.append("B", received("B-1", "H"))
+    assert reopened.to_destination("H", limit=1)[0][0] == "B"
+    reopened.close()
+
+    reset = LogStore(str(tmp_path), reset=True)
+    assert reset.trace("A-4") == []
+    assert segment_names(tmp_path) == []
+    reset.close()
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,144 @@
+import sys
+import os
+
+import pytest
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.message_cache import DuplicateCache, BloomDuplicateCache, make_duplicate_cache
+
+
+class FakeClock:
+    """Reloj manual: los tests avanzan el tiempo con advance()"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+
+def test_lru_reports_duplicates():
+    cache = DuplicateCache(clock=FakeClock())
+    assert cache.check_and_add("A-1") is False
+    assert cache.check_and_add("A-1") is True
+    assert "A-1" in cache
+    assert "A-2" not in cache
+
+
+def test_lru_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = DuplicateCache(ttl=10, clock=clock)
+    cache.check_and_add("A-1")
+    clock.advance(9)
+    assert "A-1" in cache
+    clock.advance(2)
+    assert "A-1" not in cache
+    assert cache.check_and_add("A-1") is False
+
+
+def test_lru_duplicate_renews_its_window():
+    clock = FakeClock()
+    cache = DuplicateCache(ttl=10, clock=clock)
+    cache.check_and_add("A-1")
+    clock.advance(8)
+    assert cache.check_and_add("A-1") is True
+    clock.advance(8)
+    assert "A-1" in cache
+
+
+def test_lru_is_bounded_and_evicts_the_oldest():
+    cache = DuplicateCache(max_entries=3, clock=FakeClock())
+    for i in range(3):
+        cache.check_and_add(f"A-{i}")
+    # Un hit mueve A-0 al final: el que sale es A-1
+    cache.check_and_add("A-0")
+    cache.check_and_add("A-3")
+    assert len(cache) == 3
+    assert "A-1" not in cache
+    assert "A-0" in cache and "A-3" in cache
+
+
+def test_lru_stats():
+    clock = FakeClock()
+    cache = DuplicateCache(max_entries=2, ttl=10, clock=clock)
+    for key in ("A-1", "A-1", "A-2", "A-3"):
+        cache.check_and_add(key)
+    clock.advance(11)
+    cache.check_and_add("A-4")
+    stats = cache.stats()
+    assert stats["mode"] == "lru"
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+    # Una por el límite de tamaño y dos por expiración
+    assert stats["evictions"] == 3
+    assert stats["size"] == 1
+
+
+def test_bloom_has_no_false_negatives():
+    cache = BloomDuplicateCache(max_entries=1000, clock=FakeClock())
+    keys = [f"N{i}-{i * 7}" for i in range(500)]
+    for key in keys:
+        cache.check_and_add(key)
+    assert all(key in cache for key in keys)
+    assert all(cache.check_and_add(key) for key in keys)
+
+
+def test_bloom_false_positive_rate_is_bounded():
+    cache = BloomDuplicateCache(max_entries=2000, false_positive_rate=0.01, clock=FakeClock())
+    for i in range(1000):
+        cache.check_and_add(f"A-{i}")
+    false_positives = sum(f"B-{i}" in cache for i in range(5000))
+    assert false_positives < 5000 * 0.03
+
+
+def test_bloom_forgets_after_all_generations_rotate():
+    clock = FakeClock()
+    cache = BloomDuplicateCache(ttl=10, generations=2, clock=clock)
+    cache.check_and_add("A-1")
+    # Una rotación: A-1 sigue en el filtro anterior
+    clock.advance(6)
+    cache.check_and_add("A-2")
+    assert "A-1" in cache
+    # Otra más: su filtro se descarta
+    clock.advance(6)
+    cache.check_and_add("A-3")
+    assert "A-1" not in cache
+    assert cache.stats()["evictions"] == 2
+
+
+def test_bloom_rotates_when_full():
+    cache = BloomDuplicateCache(max_entries=20, generations=2, clock=FakeClock())
+    for i in range(25):
+        cache.check_and_add(f"A-{i}")
+    assert cache.stats()["evictions"] >= 2
+    assert len(cache) <= cache.per_filter_capacity
+
+
+def test_bloom_stats():
+    cache = BloomDuplicateCache(max_entries=100, clock=FakeClock())
+    cache.check_and_add("A-1")
+    cache.check_and_add("A-1")
+    stats = cache.stats()
+    assert stats["mode"] == "bloom"
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["bytes"] == len(cache.filters[0]) * cache.generations
+
+
+def test_make_duplicate_cache():
+    assert isinstance(make_duplicate_cache("lru"), DuplicateCache)
+    assert isinstance(make_duplicate_cache("bloom", max_entries=10), BloomDuplicateCache)
+    with pytest.raises(ValueError):
+        make_duplicate_cache("otro")
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,33 @@
+import sys
+import os
+import asyncio
+import logging
+import argparse
+
+# Agregar el directorio raíz del proyecto al path de Python
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.transport.xmpp_client import XMPP_DOMAIN, XMPP_PORT
+from src.transport.xmpp_server import LocalXmppServer
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Servidor XMPP local para correr nodos con --transport xmpp sin red externa',
+        epilog="Ejemplo: python tests/xmpp_server.py & python main.py A --transport xmpp")
+    parser.add_argument('--host', default='localhost', help='Dirección donde escuchar')
+    parser.add_argument('--port', type=int, default=XMPP_PORT, help='Puerto donde escuchar')
+    parser.add_argument('--domain', default=XMPP_DOMAIN, help='Dominio de los JIDs de los nodos')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(message)s')
+    server = LocalXmppServer(args.host, args.port, args.domain)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print(f"\n{server.routed} stanzas ruteados, {server.dropped} descartados")
+
+
+if __name__ == '__main__':
+    main()